@@ -6,6 +6,7 @@ import sys
 
 from pysollib.gamedb import GAME_DB
 from pysollib.gamedb import GI
+from pysollib.gamedb import loadAllGames
 from pysollib.mfxutil import latin1_normalize
 from pysollib.mygettext import fix_gettext
 from pysollib.settings import VERSION
@@ -16,10 +17,7 @@ pysollib_dir = '../'
 builtins._ = lambda x: x
 builtins.n_ = lambda x: x
 
-import pysollib.games  # noqa: E402,F402,I100,I202
-import pysollib.games.mahjongg  # noqa: E402,F402
-import pysollib.games.special  # noqa: E402,F401,F402
-import pysollib.games.ultra  # noqa: E402,F401,F402
+loadAllGames()
 
 try:
     os.mkdir('html')
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# ---------------------------------------------------------------------------##
+#
+# PySol -- a Python Solitaire game
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; see the file COPYING.
+# If not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+# ---------------------------------------------------------------------------##
+
+# Survey the solvability of a range of deals without starting the GUI,
+# e.g.:  ./pysol_survey.py --game=FreeCell --seeds=1-1000 --jobs=4
+
+import sys
+
+from pysollib.survey import main
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -118,6 +118,16 @@ class AbstractCard:
     def unhide(self):
         pass
 
+    def isAnimating(self):
+        # the canvas item is still moving to the place of the card
+        animator = getattr(self.game, 'animator', None)
+        return animator is not None and animator.isAnimating(self)
+
+    def rehide(self):
+        # Hide the item again if the card is hidden, after it was
+        # shown by an animation.
+        pass
+
     def setSelected(self, s, group=None):
         pass
 
@@ -22,6 +22,7 @@
 # ---------------------------------------------------------------------------##
 
 
+import copy
 import os
 import re
 import sys
@@ -33,9 +34,13 @@ from pysollib.actions import PysolMenubar
 from pysollib.actions import PysolToolbar
 from pysollib.app_stat_result import GameStatResult
 from pysollib.app_statistics import Statistics
+from pysollib.app_statsdb import StatisticsDB, sqlite3
 from pysollib.cardsetparser import read_cardset_config
+from pysollib.game.journal import MoveJournal
+from pysollib.game.savefile import SaveFileReader
 from pysollib.gamedb import GAME_DB, GI, loadGame
 from pysollib.help import destroy_help_html, help_about
+from pysollib.imagecache import ScaledImageCache
 from pysollib.images import Images, SubsampledImages
 from pysollib.mfxutil import Struct, destruct
 from pysollib.mfxutil import USE_PIL
@@ -54,13 +59,15 @@ from pysollib.pysoltk import SelectCardsetDialogWithPreview
 from pysollib.pysoltk import SelectDialogTreeData
 from pysollib.pysoltk import destroy_find_card_dialog
 from pysollib.pysoltk import loadImage, wm_withdraw
-from pysollib.resource import CSI, CardsetManager
-from pysollib.resource import Music, MusicManager
+from pysollib.resource import CSI, Cardset, CardsetManager
+from pysollib.resource import Music, MusicManager, ResourceIndex
 from pysollib.resource import Sample, SampleManager
 from pysollib.resource import Tile, TileManager
 from pysollib.settings import DEBUG
 from pysollib.settings import PACKAGE, VERSION_TUPLE  # , WIN_SYSTEM
 from pysollib.settings import TOOLKIT
+from pysollib.solvercache import SolverCache
+from pysollib.startupprofiler import StartupProfiler
 from pysollib.util import IMAGE_EXTENSIONS
 from pysollib.winsystems import TkSettings
 if TOOLKIT == 'tk':
@@ -91,6 +98,7 @@ class Application:
         self.opt = Options()
         self.startup_opt = self.opt.copy()
         self.stats = Statistics()
+        self.stats_loaded = False
         self.splashscreen = 1
         # visual components
         self.top = None                 # the root toplevel window
@@ -144,7 +152,10 @@ class Application:
             opt=os.path.join(self.dn.config, "options.dat"),
             opt_cfg=os.path.join(self.dn.config, "options.cfg"),
             stats=os.path.join(self.dn.config, "statistics.dat"),
+            stats_db=os.path.join(self.dn.config, "statistics.sqlite"),
             holdgame=os.path.join(self.dn.config, "holdgame.dat"),
+            journal=os.path.join(self.dn.config, "journal.dat"),
+            resources=os.path.join(self.dn.config, "resources.dat"),
             comments=os.path.join(self.dn.config, "comments.dat"),
         )
         for k, v in self.dn.__dict__.items():
@@ -152,6 +163,18 @@ class Application:
                 v = os.path.normcase(v)
             v = os.path.normpath(v)
             self.fn.__dict__[k] = v
+        # solver results
+        self.solver_cache = SolverCache(
+            os.path.join(self.dn.config, "solver"))
+        # the card images scaled to the size of the window
+        self.scaled_image_cache = ScaledImageCache(
+            os.path.join(self.dn.config, "scaled"))
+        # the game in progress, for recovery after a crash
+        self.journal = MoveJournal(self.fn.journal)
+        # the cardsets, tiles, samples and music found on the last run
+        self.resource_index = ResourceIndex(self.fn.resources)
+        # see --profile-startup
+        self.startup_profiler = StartupProfiler()
         # random generators
         self.gamerandom = PysolRandom()
         self.miscrandom = PysolRandom()
@@ -170,6 +193,7 @@ class Application:
             cardset=None,             # use this cardset
             holdgame=0,               # hold this game on exit ?
             bookmark=None,            # goto this bookmark (load new cardset)
+            journal=None,             # replay these journal records
         )
         self.commandline = Struct(
             loadgame=None,            # load a game ?
@@ -213,6 +237,28 @@ class Application:
                     game.destruct()
                     destruct(game)
 
+    def _load_journal(self, tmpgame):
+        """Recover the game in progress if the last session crashed;
+        a game asked for on the command line comes first."""
+        cl = self.commandline
+        if cl.loadgame or cl.game is not None or cl.gameid is not None:
+            return
+        journal = self.journal.read()
+        if journal is None:
+            return
+        base, records = journal
+        try:
+            game = tmpgame._undumpGame(SaveFileReader(base), self)
+        except Exception:
+            traceback.print_exc()
+            return
+        if not self.getGameClass(game.id):
+            destruct(game)
+            return
+        self.nextgame.id = game.id
+        self.nextgame.loadedgame = game
+        self.nextgame.journal = records
+
     def _main_loop(self):
         """docstring for _main_loop"""
         try:
@@ -257,6 +303,7 @@ class Application:
                 self.freeGame()
                 #
                 if self.nextgame.id <= 0:
+                    self.journal.close(remove=True)
                     break
                 # load new cardset
                 if self.nextgame.cardset is not self.cardset:
@@ -291,6 +338,12 @@ class Application:
             except Exception:
                 traceback.print_exc()
                 pass
+            if self.stats.db:
+                try:
+                    self.stats.db.close()
+                except Exception:
+                    traceback.print_exc()
+                self.stats.db = None
             # shut down audio
             try:
                 self.audio.destroy()
@@ -307,16 +360,18 @@ class Application:
         # copy startup options
         self.startup_opt = self.opt.copy()
         # try to load statistics
-        try:
-            self.loadStatistics()
-        except Exception:
-            traceback.print_exc()
-            pass
+        with self.startup_profiler.phase('statistics'):
+            try:
+                self.loadStatistics()
+            except Exception:
+                traceback.print_exc()
+                pass
         # startup information
         if self.getGameClass(self.opt.last_gameid):
             self.nextgame.id = self.opt.last_gameid
         # load a holded or saved game
         tmpgame = self.constructGame(self.gdb.getGamesIdSortedByName()[0])
+        self._load_journal(tmpgame)
         self._load_held_or_saved_game(tmpgame)
         if not self.nextgame.loadedgame:
             if self.commandline.loadgame:
@@ -351,8 +406,9 @@ class Application:
         # create the menubar
         if self.intro.progress:
             self.intro.progress.update(step=1)
-        self.menubar = PysolMenubar(self, self.top,
-                                    progress=self.intro.progress)
+        with self.startup_profiler.phase('menubar'):
+            self.menubar = PysolMenubar(self, self.top,
+                                        progress=self.intro.progress)
         # create the statusbar(s)
         self.statusbar = PysolStatusbar(self.top)
         self.statusbar.show(self.opt.statusbar)
@@ -405,7 +461,9 @@ class Application:
         self.gdb.setSelected(id_)
         self.game.busy = 1
         # create stacks and layout
-        self.game.create(self)
+        with self.startup_profiler.phase('game'):
+            self.game.create(self)
+        self.startup_profiler.finish()
         # connect with game
         self.menubar.connectGame(self.game)
         if self.toolbar:  # ~
@@ -433,6 +491,9 @@ class Application:
             self.stats.gameid_balance = 0
             self.game.restoreGame(self.nextgame.loadedgame)
             destruct(self.nextgame.loadedgame)
+            if self.nextgame.journal is not None:
+                self.game.replayJournal(self.nextgame.journal)
+                self.nextgame.journal = None
         elif self.nextgame.bookmark is not None:
             self.game.restoreGameFromBookmark(self.nextgame.bookmark)
         else:
@@ -698,6 +759,7 @@ class Application:
                                         images=self.progress_images)
         images = Images(self.dataloader, cs)
         images.cardset_bottoms = self.opt.use_cardset_bottoms
+        images.scaled_cache = self.scaled_image_cache
         try:
             if not images.load(app=self, progress=progress):
                 raise Exception("Invalid or damaged cardset")
@@ -710,7 +772,7 @@ class Application:
             # if self.opt.save_cardsets:
             c = self.cardsets_cache.get(cs.type)
             if c:
-                # c[1].destruct()
+                c[1].destruct()
                 destruct(c[1])
             self.cardsets_cache[cs.type] = (cs.ident, images, simages)
             if not tocache:
@@ -735,7 +797,7 @@ class Application:
             self.nextgame.cardset = self.cardset
             if self.cardset:
                 self.cardset_manager.setSelected(self.cardset.index)
-            # images.destruct()
+            images.destruct()
             destruct(images)
             MfxExceptionDialog(
                 self.top, ex, title=_("Cardset load error"),
@@ -908,19 +970,34 @@ class Application:
                 pass
         self.opt.load(self.fn.opt_cfg)
         self.opt.setConstants()
+        self.scaled_image_cache.max_size = \
+            self.opt.scaled_images_cache_size * 1024 * 1024
 
     def loadStatistics(self):
-        if not os.path.exists(self.fn.stats):
-            return
-        stats = unpickle(self.fn.stats)
-        if stats:
+        if sqlite3 is not None:
+            self._loadStatisticsDB()
+        elif os.path.exists(self.fn.stats):
+            stats = unpickle(self.fn.stats)
+            if not stats:
+                return
             # print "loaded:", stats.__dict__
             self.stats.__dict__.update(stats.__dict__)
+        self.stats_loaded = True
         # start a new session
         self.stats.session_games = {}
         self.stats.session_balance = {}
         self.stats.gameid_balance = 0
 
+    def _loadStatisticsDB(self):
+        db = StatisticsDB(self.fn.stats_db)
+        if db.isNew() and os.path.exists(self.fn.stats):
+            # first run: take over the pickled statistics
+            stats = unpickle(self.fn.stats)
+            if stats:
+                db.migrate(stats)
+        db.load(self.stats)
+        self.stats.db = db
+
     def __saveObject(self, obj, fn):
         obj.version_tuple = VERSION_TUPLE
         obj.saved += 1
@@ -930,6 +1007,15 @@ class Application:
         self.opt.save(self.fn.opt_cfg)
 
     def saveStatistics(self):
+        if not self.stats_loaded:
+            # do not write the empty statistics over the ones that
+            # failed to load
+            return
+        if self.stats.db:
+            # everything but this is written when a game is finished
+            self.stats.saved += 1
+            self.stats.db.setSaved(self.stats.saved)
+            return
         self.__saveObject(self.stats, self.fn.stats)
 
     #
@@ -950,70 +1036,30 @@ class Application:
 
     ##
     def getGamesIdSortedByPlayed(self, player=''):
-        if player == '':
-            player = self.opt.player
-
-        def _key(a):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            return wa+la
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(key=_key)
-        return games[::-1]
+        return self._getGamesIdSortedByStats(player, 'played')
 
     def getGamesIdSortedByWon(self, player=''):
-        if player == '':
-            player = self.opt.player
-
-        def _key(a):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            return wa
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(key=_key)
-        return games[::-1]
+        return self._getGamesIdSortedByStats(player, 'won')
 
     def getGamesIdSortedByLost(self, player=''):
-        if player == '':
-            player = self.opt.player
-
-        def _key(a):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            return la
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(key=_key)
-        return games[::-1]
+        return self._getGamesIdSortedByStats(player, 'lost')
 
     def getGamesIdSortedByPercent(self, player=''):
-        if player == '':
-            player = self.opt.player
-
-        def _key(a):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            return float(wa)/(1 if wa+la == 0 else wa+la)
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(key=_key)
-        return games[::-1]
+        return self._getGamesIdSortedByStats(player, 'percent')
 
     def getGamesIdSortedByPlayingTime(self, player=''):
-        if player == '':
-            player = self.opt.player
-
-        def _key(a):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            return ta
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(key=_key)
-        return games[::-1]
+        return self._getGamesIdSortedByStats(player, 'time')
 
     def getGamesIdSortedByMoves(self, player=''):
+        return self._getGamesIdSortedByStats(player, 'moves')
+
+    def getStatsIndex(self, player=''):
         if player == '':
             player = self.opt.player
+        return self.stats.getIndex(player, self.gdb.getGamesIdSortedByName())
 
-        def _key(a):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            return ma
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(key=_key)
-        return games[::-1]
+    def _getGamesIdSortedByStats(self, player, sort_by):
+        return list(self.getStatsIndex(player).getSorted(sort_by))
 
     def getGameInfo(self, id):
         return self.gdb.get(id)
@@ -1102,13 +1148,26 @@ class Application:
     # init cardsets
     #
 
-    # read & parse a cardset config.txt file - see class Cardset in resource.py
-    def _readCardsetConfig(self, dirname, filename):
-        cs = read_cardset_config(dirname, filename)
-        # set offsets from options.cfg
-        if cs.ident in self.opt.offsets:
-            cs.CARD_XOFFSET, cs.CARD_YOFFSET = self.opt.offsets[cs.ident]
-        return cs
+    # read & parse the config.txt file of a cardset directory - see class
+    # Cardset in resource.py; returns the config and whether the images
+    # are there, or None (this is kept in the resource index)
+    def _readCardsetDir(self, dirname, config_txt_path):
+        if not os.path.isfile(config_txt_path):
+            return None
+        try:
+            cs = read_cardset_config(dirname, config_txt_path)
+        except Exception:
+            traceback.print_exc()
+            cs = None
+        if not cs:
+            print_err('failed to parse cardset file: %s'
+                      % config_txt_path)
+            return None
+        back = cs.backnames[cs.backindex]
+        back_im_path = os.path.join(dirname, back)
+        shade_im_path = os.path.join(dirname, "shade" + cs.ext)
+        return (cs.__dict__, os.path.isfile(back_im_path) and
+                os.path.isfile(shade_im_path))
 
     def initCardsets(self):
         """Load all valid cardset config.txt files and ignore invalid ones.
@@ -1121,10 +1180,11 @@ class Application:
             dirs += manager.getSearchDirs(self, "cardsets-*")
         found = []
         found_names = []  # (to check for duplicates)
+        index = self.resource_index
         for dirname in dirs:
             try:
                 subdirs = [os.path.join(dirname, subdir)
-                           for subdir in os.listdir(dirname)
+                           for subdir, isfile in index.listDir(dirname)
                            if subdir.startswith('cardset-')]
             except EnvironmentError:
                 traceback.print_exc()
@@ -1132,25 +1192,21 @@ class Application:
             subdirs.sort()
             for d in subdirs:
                 config_txt_path = os.path.join(d, "config.txt")
-                if not os.path.isfile(config_txt_path):
+                # only read again when the directory or config.txt changed
+                entry = index.get(('cardset', d), (d, config_txt_path),
+                                  self._readCardsetDir)
+                if not entry:
                     continue
-                try:
-                    cs = self._readCardsetConfig(d, config_txt_path)
-                except Exception:
-                    traceback.print_exc()
-                    cs = None
-                if not cs:
-                    print_err('failed to parse cardset file: %s'
-                              % config_txt_path)
-                    continue
-                back = cs.backnames[cs.backindex]
-                back_im_path = os.path.join(d, back)
-                shade_im_path = os.path.join(d, "shade" + cs.ext)
+                config, images = entry
+                cs = Cardset()
+                cs.__dict__.update(copy.deepcopy(config))
+                # set offsets from options.cfg
+                if cs.ident in self.opt.offsets:
+                    cs.CARD_XOFFSET, cs.CARD_YOFFSET = \
+                        self.opt.offsets[cs.ident]
                 if (cs.name not in found_names and
                         cs.ext in IMAGE_EXTENSIONS and
-                        cs.CARDD <= screendepth and
-                        os.path.isfile(back_im_path) and
-                        os.path.isfile(shade_im_path)):
+                        cs.CARDD <= screendepth and images):
                     found.append(cs)
                     found_names.append(cs.name)
 
@@ -1167,13 +1223,11 @@ class Application:
         """docstring for _init_tiles_process_die"""
         names = []
         if dirname and os.path.isdir(dirname):
-            names = os.listdir(dirname)
-        for name in names:
-            if not name or not image_ext_re.search(name):
+            names = self.resource_index.listDir(dirname)
+        for name, isfile in names:
+            if not name or not image_ext_re.search(name) or not isfile:
                 continue
             f = os.path.join(dirname, name)
-            if not os.path.isfile(f):
-                continue
             tile = Tile()
             tile.filename = f
             n = image_ext_re.sub("", name)
@@ -1234,13 +1288,14 @@ class Application:
             if dirname:
                 dirname = os.path.normpath(dirname)
             try:
-                for name in self._my_list_dir(dirname):
-                    if not name or not ext_re.search(name):
+                names = sorted([(os.path.normcase(name), isfile)
+                                for name, isfile in
+                                self.resource_index.listDir(dirname)])
+                for name, isfile in names:
+                    if not name or not ext_re.search(name) or not isfile:
                         continue
                     f = os.path.join(dirname, name)
                     f = os.path.normpath(f)
-                    if not os.path.isfile(f):
-                        continue
                     obj = Resource_Class()
                     obj.filename = f
                     n = ext_re.sub("", name.strip())
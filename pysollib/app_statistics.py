@@ -21,10 +21,82 @@
 #
 # ---------------------------------------------------------------------------##
 
+from datetime import date
+
 from pysollib.app_stat import GameStat
 from pysollib.settings import VERSION_TUPLE
 
 
+class PlayerStatsIndex:
+    # the full stats (see Statistics.getFullStats()) of the games of
+    # one player in columns, and the games sorted by each of them
+    def __init__(self, stats, player, games):
+        self.games = games
+        self.pos = dict((gameid, i) for i, gameid in enumerate(games))
+        self.won, self.lost, self.time, self.moves = [], [], [], []
+        for gameid in games:
+            self.__set(len(self.won), stats.getFullStats(player, gameid))
+        self._sorted = {}
+
+    def __set(self, i, full_stats):
+        for column, value in zip((self.won, self.lost, self.time,
+                                  self.moves), full_stats):
+            if i < len(column):
+                column[i] = value
+            else:
+                column.append(value)
+
+    def update(self, gameid, full_stats):
+        i = self.pos.get(gameid)
+        if i is not None:
+            self.__set(i, full_stats)
+            self._sorted = {}
+
+    def getFullStats(self, gameid):
+        i = self.pos.get(gameid)
+        if i is None:
+            return (0, 0, 0, 0)
+        return self.won[i], self.lost[i], self.time[i], self.moves[i]
+
+    def getSorted(self, sort_by):
+        # sort_by: played, won, lost, percent, time or moves; the
+        # games are in descending order, ties in reversed games order
+        games = self._sorted.get(sort_by)
+        if games is None:
+            if sort_by == 'played':
+                column = [w + lo for w, lo in zip(self.won, self.lost)]
+            elif sort_by == 'percent':
+                column = [float(w) / (1 if w + lo == 0 else w + lo)
+                          for w, lo in zip(self.won, self.lost)]
+            else:
+                column = getattr(self, sort_by)
+            order = sorted(range(len(self.games)), key=column.__getitem__)
+            games = tuple(self.games[i] for i in reversed(order))
+            self._sorted[sort_by] = games
+        return games
+
+
+class DailyHistogram:
+    # the games played and won per day (a date ordinal, see
+    # date.toordinal()), of all games and of each game
+    def __init__(self):
+        self.all = {}       # key: day;  value: [played, won]
+        self.games = {}     # key: gameid;  value: as self.all
+
+    def add(self, gameid, day, played, won):
+        for days in (self.all, self.games.setdefault(gameid, {})):
+            if day in days:
+                days[day][0] += played
+                days[day][1] += won
+            else:
+                days[day] = [played, won]
+
+    def addGame(self, log):
+        # log: an entry of Statistics.prev_games
+        day = date.fromtimestamp(log[3]).toordinal()
+        self.add(log[0], day, 1, int(log[2] > 0))
+
+
 class Statistics:
     def __init__(self):
         self.version_tuple = VERSION_TUPLE
@@ -39,6 +111,19 @@ class Statistics:
         self.total_balance = {}     # a dictionary of integers
         self.session_balance = {}   # reset per session
         self.gameid_balance = 0     # reset when changing the gameid
+        # a StatisticsDB that keeps the statistics; the logs of the
+        # players are then only in the database
+        self.db = None
+        # a PlayerStatsIndex and a DailyHistogram per player
+        self.indexes = {}
+        self.histograms = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['db'] = None
+        state['indexes'] = {}
+        state['histograms'] = {}
+        return state
 
     def new(self):
         return Statistics()
@@ -50,6 +135,10 @@ class Statistics:
     def resetStats(self, player, gameid):
         self.__resetPrevGames(player, self.prev_games, gameid)
         self.__resetPrevGames(player, self.session_games, gameid)
+        if self.db:
+            self.db.resetStats(player, gameid)
+        self.indexes.pop(player, None)
+        self.histograms.pop(player, None)
         if player not in self.games_stats:
             return
         if gameid == 0:
@@ -87,6 +176,34 @@ class Statistics:
                     s.moves_result.average,)
         return (0, 0, 0, 0)
 
+    def getPrevGames(self, player):
+        # return the log of player (or None)
+        if self.db:
+            return self.db.getPrevGames(player) or None
+        return self.prev_games.get(player)
+
+    def getIndex(self, player, games):
+        # return the PlayerStatsIndex of the games (a tuple) of player
+        index = self.indexes.get(player)
+        if index is None or index.games is not games:
+            index = PlayerStatsIndex(self, player, games)
+            self.indexes[player] = index
+        return index
+
+    def getHistogram(self, player):
+        # return the DailyHistogram of the log of player
+        histogram = self.histograms.get(player)
+        if histogram is None:
+            histogram = DailyHistogram()
+            if self.db:
+                for row in self.db.getDailyResults(player):
+                    histogram.add(*row)
+            else:
+                for log in self.prev_games.get(player, ()):
+                    histogram.addGame(log)
+            self.histograms[player] = histogram
+        return histogram
+
     def getSessionStats(self, player, gameid):
         games = self.session_games.get(player, [])
         games = [g for g in games if g[0] == gameid]
@@ -102,9 +219,13 @@ class Statistics:
                game.GAME_VERSION)
         # full log
         if status >= 0:
+            if player is not None and player in self.histograms:
+                self.histograms[player].addGame(log)
             if player is None:
                 # demo
                 ret = self.updateGameStat(player, game, status)
+            elif self.db:
+                ret = self.updateGameStat(player, game, status, log)
             else:
                 # player
                 if player not in self.prev_games:
@@ -120,7 +241,7 @@ class Statistics:
         self.session_games[player].append(log)
         return ret
 
-    def updateGameStat(self, player, game, status):
+    def updateGameStat(self, player, game, status, log=None):
         #
         if player not in self.games_stats:
             self.games_stats[player] = {}
@@ -135,7 +256,25 @@ class Statistics:
         else:
             all_games_stat = self.games_stats[player]['all']
         all_games_stat.update(game, status)
-        return game_stat.update(game, status)
+        ret = game_stat.update(game, status)
+        if player in self.indexes:
+            self.indexes[player].update(
+                game.id, self.getFullStats(player, game.id))
+        if self.db:
+            if log:
+                self.db.addGame(player, log, game_stat, all_games_stat)
+            else:
+                self.db.saveGameStat(player, game_stat, all_games_stat)
+        return ret
+
+    def updateBalance(self, gameid, balance):
+        self.total_balance[gameid] = \
+            self.total_balance.get(gameid, 0) + balance
+        self.session_balance[gameid] = \
+            self.session_balance.get(gameid, 0) + balance
+        self.gameid_balance = self.gameid_balance + balance
+        if self.db:
+            self.db.updateBalance(gameid, self.total_balance[gameid])
 
 #      def __setstate__(self, state):      # for backward compatible
 #          if 'gameid' not in state:
@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+#  Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+#  Copyright (C) 2003 Mt. Hood Playing Card Co.
+#  Copyright (C) 2005-2009 Skomoroh
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# The statistics in a SQLite database: one row per finished game (the
+# log) and one row per player and game with the fields of the GameStat,
+# which is replaced whenever a game is finished.  Nothing is written on exit
+# and only the GameStat rows and the balances are read at startup; the
+# log is read when it is asked for.
+
+from pysollib.app_stat import GameStat
+from pysollib.mfxutil import Struct
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+
+# the fields of a log entry (see Statistics.updateStats()); old
+# entries have only the first 5, 7 or 8 of them
+LOG_FIELDS = ('gameid', 'game_number', 'status', 'start_time',
+              'elapsed_time', 'version', 'score', 'score_casino',
+              'game_version')
+
+# the counters of a GameStat
+STAT_FIELDS = ('num_total', 'num_lost', 'num_won', 'num_perfect')
+
+# the GameStatResult fields of a GameStat (without the "_result") and
+# the columns kept of each; the average is total / num
+RESULTS = ('time', 'moves', 'total_moves', 'score', 'score_casino')
+RESULT_FIELDS = ('min', 'max', 'num', 'total')
+
+# the columns of game_stats after player and gameid
+GAME_STAT_COLUMNS = STAT_FIELDS + tuple(
+    '%s_%s' % (result, field)
+    for result in RESULTS for field in RESULT_FIELDS)
+
+# the fields of an entry in the top of a GameStatResult
+TOP_FIELDS = ('value', 'game_number', 'game_start_time')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS log (
+    id INTEGER PRIMARY KEY,
+    player TEXT,
+    gameid INTEGER NOT NULL,
+    game_number TEXT,
+    status INTEGER NOT NULL,
+    start_time REAL,
+    elapsed_time REAL,
+    version TEXT,
+    score INTEGER,
+    score_casino INTEGER,
+    game_version INTEGER,
+    fields INTEGER NOT NULL,
+    -- 0 once the statistics of the player/game were reset
+    prev INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS log_player ON log (player, prev);
+CREATE TABLE IF NOT EXISTS game_stats (
+    player TEXT,
+    -- a game id or "all"
+    gameid TEXT NOT NULL,
+    %s
+);
+CREATE INDEX IF NOT EXISTS game_stats_player ON game_stats (player);
+-- the best results of a game_stats row
+CREATE TABLE IF NOT EXISTS game_stats_top (
+    player TEXT,
+    gameid TEXT NOT NULL,
+    result TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    -- the game the result was reached in
+    top_gameid INTEGER NOT NULL,
+    value NUMERIC NOT NULL,
+    game_number TEXT,
+    game_start_time REAL
+);
+CREATE INDEX IF NOT EXISTS game_stats_top_player ON game_stats_top (player);
+CREATE TABLE IF NOT EXISTS balance (
+    gameid INTEGER PRIMARY KEY,
+    total INTEGER NOT NULL
+);
+''' % ',\n    '.join(
+    '%s %s NOT NULL DEFAULT 0' % (
+        column, 'INTEGER' if column.startswith('num_') or
+        column.endswith('_num') else 'NUMERIC')
+    for column in GAME_STAT_COLUMNS)
+
+
+class StatisticsDB:
+    VERSION = 1
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def isNew(self):
+        """True if the database was neither loaded nor migrated to yet."""
+        return self._getMeta('version') is None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    #
+    # loading
+    #
+
+    def load(self, stats):
+        """Load the per game statistics and the balances into stats."""
+        games_stats = {}
+        for row in self.conn.execute(
+                'SELECT player, gameid, %s FROM game_stats' %
+                ', '.join(GAME_STAT_COLUMNS)):
+            stat = self._gameStat(row[1], row[2:])
+            games_stats.setdefault(row[0], {})[stat.gameid] = stat
+        for row in self.conn.execute(
+                'SELECT player, gameid, result, top_gameid, %s '
+                'FROM game_stats_top ORDER BY position' %
+                ', '.join(TOP_FIELDS)):
+            stat = games_stats.get(row[0], {}).get(self._gameId(row[1]))
+            if stat is not None:
+                top = Struct(gameid=row[3], **dict(zip(TOP_FIELDS, row[4:])))
+                getattr(stat, row[2] + '_result').top.append(top)
+        stats.games_stats = games_stats
+        stats.total_balance = dict(self.conn.execute(
+            'SELECT gameid, total FROM balance'))
+        stats.saved = self._getMeta('saved') or 0
+        if self.isNew():
+            with self.conn:
+                self._setMeta('version', self.VERSION)
+
+    def getPrevGames(self, player, gameid=None):
+        """Return the log of player (of gameid only, if given)."""
+        sql = ('SELECT %s, fields FROM log WHERE player IS ? AND prev = 1' %
+               ', '.join(LOG_FIELDS))
+        args = [player]
+        if gameid is not None:
+            sql += ' AND gameid = ?'
+            args.append(gameid)
+        return [self._logEntry(row)
+                for row in self.conn.execute(sql + ' ORDER BY id', args)]
+
+    def getDailyResults(self, player):
+        """Yield (gameid, day, played, won) for the log of player, day
+        being the date ordinal (see date.toordinal()) of the local
+        date; the days are counted by SQLite."""
+        for row in self.conn.execute(
+                'SELECT gameid, day, COUNT(*), SUM(status > 0) FROM '
+                '(SELECT gameid, status, CAST(julianday(date(start_time, '
+                "'unixepoch', 'localtime')) - 1721424.5 AS INTEGER) AS day "
+                'FROM log WHERE player IS ? AND prev = 1) '
+                'WHERE day IS NOT NULL GROUP BY gameid, day', (player,)):
+            yield row
+
+    #
+    # updating
+    #
+
+    def addGame(self, player, log, *game_stats):
+        """Add a finished game to the log and replace the GameStat of
+        the game and of all games of player."""
+        with self.conn:
+            self._addLog(player, log)
+            for game_stat in game_stats:
+                self._saveGameStat(player, game_stat)
+
+    def saveGameStat(self, player, *game_stats):
+        with self.conn:
+            for game_stat in game_stats:
+                self._saveGameStat(player, game_stat)
+
+    def updateBalance(self, gameid, total):
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO balance (gameid, total) '
+                'VALUES (?, ?)', (gameid, total))
+
+    def resetStats(self, player, gameid):
+        """Reset the statistics of player and gameid (0 for all)."""
+        with self.conn:
+            if gameid == 0:
+                for table in ('game_stats', 'game_stats_top'):
+                    self.conn.execute(
+                        'DELETE FROM %s WHERE player IS ?' % table,
+                        (player,))
+                self.conn.execute(
+                    'UPDATE log SET prev = 0 WHERE player IS ?', (player,))
+            else:
+                self._deleteGameStat(player, gameid)
+                self.conn.execute(
+                    'UPDATE log SET prev = 0 WHERE player IS ? AND gameid = ?',
+                    (player, gameid))
+
+    def setSaved(self, saved):
+        with self.conn:
+            self._setMeta('saved', saved)
+
+    def migrate(self, stats):
+        """Store the statistics loaded from an old pickled file."""
+        with self.conn:
+            all_prev_games = stats.all_prev_games
+            for player, prev_games in stats.prev_games.items():
+                # the entries of prev_games are the last ones of
+                # all_prev_games; older ones were reset
+                log = all_prev_games.get(player, [])
+                n = len(log) - len(prev_games)
+                if n < 0 or log[n:] != prev_games:
+                    log, n = prev_games, 0
+                for i, entry in enumerate(log):
+                    self._addLog(player, entry, prev=(i >= n))
+            for player, log in all_prev_games.items():
+                if player not in stats.prev_games:
+                    for entry in log:
+                        self._addLog(player, entry, prev=False)
+            for player, games in stats.games_stats.items():
+                for game_stat in games.values():
+                    self._saveGameStat(player, game_stat)
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO balance (gameid, total) '
+                'VALUES (?, ?)', stats.total_balance.items())
+            self._setMeta('saved', stats.saved)
+            self._setMeta('version', self.VERSION)
+
+    def _addLog(self, player, log, prev=True):
+        if not isinstance(log, tuple) or len(log) < 5:
+            return
+        row = list(log[:len(LOG_FIELDS)])
+        fields = len(row)
+        row += [None] * (len(LOG_FIELDS) - fields)
+        if isinstance(row[5], tuple):
+            row[5] = '.'.join(str(v) for v in row[5])
+        self.conn.execute(
+            'INSERT INTO log (player, %s, fields, prev) '
+            'VALUES (?, %s, ?, ?)' % (', '.join(LOG_FIELDS),
+                                      ', '.join('?' * len(LOG_FIELDS))),
+            [player] + row + [fields, int(prev)])
+
+    def _logEntry(self, row):
+        fields = row[-1]
+        log = list(row[:fields])
+        if fields > 5 and log[5] is not None:
+            log[5] = tuple(int(v) if v.isdigit() else v
+                           for v in log[5].split('.'))
+        return tuple(log)
+
+    def _gameId(self, gameid):
+        return int(gameid) if gameid.isdigit() else gameid
+
+    def _gameStat(self, gameid, row):
+        stat = GameStat(self._gameId(gameid))
+        values = dict(zip(GAME_STAT_COLUMNS, row))
+        for field in STAT_FIELDS:
+            setattr(stat, field, values[field])
+        for result in RESULTS:
+            r = getattr(stat, result + '_result')
+            for field in RESULT_FIELDS:
+                setattr(r, field, values['%s_%s' % (result, field)])
+            if r.num:
+                r.average = float(r.total) / r.num
+        return stat
+
+    def _deleteGameStat(self, player, gameid):
+        for table in ('game_stats', 'game_stats_top'):
+            self.conn.execute(
+                'DELETE FROM %s WHERE player IS ? AND gameid = ?' % table,
+                (player, str(gameid)))
+
+    def _saveGameStat(self, player, game_stat):
+        gameid = str(game_stat.gameid)
+        self._deleteGameStat(player, gameid)
+        row = [getattr(game_stat, field) for field in STAT_FIELDS]
+        for result in RESULTS:
+            r = getattr(game_stat, result + '_result')
+            row += [getattr(r, field) for field in RESULT_FIELDS]
+            self.conn.executemany(
+                'INSERT INTO game_stats_top (player, gameid, result, '
+                'position, top_gameid, %s) VALUES (?, ?, ?, ?, ?, %s)' %
+                (', '.join(TOP_FIELDS), ', '.join('?' * len(TOP_FIELDS))),
+                [[player, gameid, result, i, top.gameid] +
+                 [getattr(top, field) for field in TOP_FIELDS]
+                 for i, top in enumerate(r.top)])
+        self.conn.execute(
+            'INSERT INTO game_stats (player, gameid, %s) VALUES (?, ?, %s)' %
+            (', '.join(GAME_STAT_COLUMNS),
+             ', '.join('?' * len(GAME_STAT_COLUMNS))),
+            [player, gameid] + row)
+
+    def _getMeta(self, key):
+        row = self.conn.execute(
+            'SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row and row[0]
+
+    def _setMeta(self, key, value):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            (key, value))
@@ -25,14 +25,20 @@
 import math
 import time
 import traceback
-from pickle import Pickler, Unpickler, UnpicklingError
+from pickle import Unpickler, UnpicklingError
 
 import attr
 
 from pysol_cards.cards import ms_rearrange
 from pysol_cards.random import random__int2str
 
+from pysollib.game.animation import CardAnimator
 from pysollib.game.dump import pysolDumpGame
+from pysollib.game.journal import iterJournal
+from pysollib.game.occlusion import StackOcclusion
+from pysollib.game.savefile import MAGIC, SaveFileReader
+from pysollib.game.snapshots import SnapshotStore
+from pysollib.game.stackindex import StackGrid
 from pysollib.gamedb import GI
 from pysollib.help import help_about
 from pysollib.hint import DefaultHint
@@ -52,6 +58,7 @@ from pysollib.move import ASingleCardMove
 from pysollib.move import ASingleFlipMove
 from pysollib.move import ATurnStackMove
 from pysollib.move import AUpdateStackMove
+from pysollib.move import hashCards
 from pysollib.mygettext import _
 from pysollib.mygettext import ungettext
 from pysollib.pysolrandom import LCRandom31, PysolRandom, construct_random
@@ -85,6 +92,8 @@ assert getattr(attr, '__version_info__', (0, 0, 0)) >= (18, 2, 0), (
 
 
 PLAY_TIME_TIMEOUT = 200
+STUCK_TIMEOUT = 300
+JOURNAL_SYNC_TIMEOUT = 1000
 S_PLAY = 0x40
 
 # ************************************************************************
@@ -297,6 +306,9 @@ class StackRegions(NewStruct):
     data = attr.ib(factory=list)
     # init info (at the start)
     init_info = attr.ib(factory=list)
+    # StackGrid of the stacks of each region and of the remaining ones,
+    # by id() of the tuple of stacks
+    index = attr.ib(factory=dict)
 
     def calc_info(self, xf, yf, widthpad=0, heightpad=0):
         """docstring for calc_info"""
@@ -308,6 +320,8 @@ class StackRegions(NewStruct):
                        int(round((rect[3] + heightpad) * yf)))
             info.append((stacks, newrect))
         self.info = tuple(info)
+        # the stacks were moved
+        self._buildIndex()
 
     def optimize(self, remaining):
         """docstring for optimize"""
@@ -326,6 +340,20 @@ class StackRegions(NewStruct):
                     remaining.remove(stack)
         self.remaining = tuple(remaining)
         self.init_info = self.info
+        self._buildIndex()
+
+    def _buildIndex(self):
+        self.index = {}
+        for stacks, rect in self.info:
+            self.index[id(stacks)] = StackGrid(stacks)
+        self.index[id(self.remaining)] = StackGrid(self.remaining)
+
+    def getIndex(self, stacks):
+        """Return the StackGrid of stacks, or None."""
+        grid = self.index.get(id(stacks))
+        if grid is not None and grid.stacks is stacks:
+            return grid
+        return None
 
 
 @attr.s
@@ -358,6 +386,10 @@ class GameDrag(NewStruct):
     canshade_stacks = attr.ib(factory=list)
     noshade_stacks = attr.ib(factory=list)
     shadows = attr.ib(factory=list)
+    # time spent handling the mouse motion events of a drag (in seconds)
+    motion_events = attr.ib(default=0)
+    motion_time = attr.ib(default=0.0)
+    motion_max = attr.ib(default=0.0)
 
 
 @attr.s
@@ -375,6 +407,8 @@ class GameHints(NewStruct):
     list = attr.ib(default=None)
     index = attr.ib(default=-1)
     level = attr.ib(default=-1)
+    # HintCache by (hint class, level), see DefaultHint.step010()
+    caches = attr.ib(factory=dict)
 
 
 @attr.s
@@ -511,6 +545,8 @@ class Game(object):
     def __init__(self, gameinfo):
         self.preview = 0
         self.random = None
+        self.journal = None
+        self.journal_timer = None
         self.gameinfo = gameinfo
         self.id = gameinfo.id
         assert self.id > 0
@@ -518,14 +554,16 @@ class Game(object):
         self.pause = False
         self.finished = False
         self.stuck = False
+        self.stuck_timer = None
         self.version = VERSION
         self.version_tuple = VERSION_TUPLE
         self.cards = []
         self.stackmap = {}              # dict with (x,y) tuples as key
         self.allstacks = []
         self.sn_groups = []  # snapshot groups; list of list of similar stacks
-        self.snapshots = []
-        self.failed_snapshots = []
+        self.snapshots = SnapshotStore()
+        self.failed_snapshots = SnapshotStore()
+        self.position_hash = 0          # see getSnapshot()
         self.stackdesc_list = []
         self.demo_logo = None
         self.pause_logo = None
@@ -535,6 +573,8 @@ class Game(object):
         self.init_size = (0, 0)
         self.center_offset = (0, 0)
         self.event_handled = False      # if click event handled by Stack (???)
+        self.animator = None            # see animatedMoveTo()
+        self.occlusion = None           # see getOcclusionStacks()
         self.reset()
 
     # main constructor
@@ -566,6 +606,7 @@ class Game(object):
         if DEBUG:
             self._checkGame()
         self.optimizeRegions()
+        self.createOcclusion()
         # create cards
         if not self.cards:
             self.cards = self.createCards(progress=self.app.intro.progress)
@@ -696,6 +737,7 @@ class Game(object):
         self.app = app
         self.top = app.top
         self.canvas = app.canvas
+        self.animator = CardAnimator(self.canvas, stopped=self._cardStopped)
         self.filename = ""
         self.drag = GameDrag()
         if self.gstats.start_player is None:
@@ -721,6 +763,7 @@ class Game(object):
             stack.prepareStack()
             stack.assertStack()
         self.optimizeRegions()
+        self.createOcclusion()
         # create cards
         self.cards = self.createCards()
         #
@@ -728,6 +771,9 @@ class Game(object):
         self.busy = old_busy
 
     def destruct(self):
+        self.cancelStuck()
+        self.syncJournal()
+        self.finishAnimations()
         # help breaking circular references
         for obj in self.cards:
             destruct(obj)
@@ -737,14 +783,15 @@ class Game(object):
 
     # Do not destroy game structure (like stacks and cards) here !
     def reset(self, restart=0):
+        self.cancelStuck()
         self.filename = ""
         self.demo = None
         self.solver = None
         self.hints = GameHints()
         self.saveinfo = GameSaveInfo()
         self.loadinfo = GameLoadInfo()
-        self.snapshots = []
-        self.failed_snapshots = []
+        self.snapshots = SnapshotStore()
+        self.failed_snapshots = SnapshotStore()
         # local statistics are reset on each game restart
         self.stats = GameStatsStruct()
         self.startMoves()
@@ -823,6 +870,7 @@ class Game(object):
             if not self.preview:
                 self.resizeGame()
             self.startGame()
+        self.initPositionHash()
         self.startMoves()
         for stack in self.allstacks:
             stack.updateText()
@@ -831,6 +879,7 @@ class Game(object):
         self.updateStatus(moves=(0, 0))
         self.updateMenus()
         self.stopSamples()
+        self.startJournal()
         if autoplay:
             self.autoPlay()
             self.stats.player_moves = 0
@@ -879,6 +928,7 @@ class Game(object):
             self.allstacks[stack_id].cap.update(cap.__dict__)
         # 5) subclass settings
         self._restoreGameHook(game)
+        self.initPositionHash()
         # 6) update view
         for stack in self.allstacks:
             stack.updateText()
@@ -893,6 +943,7 @@ class Game(object):
             wm_map(self.top, maximized=self.app.opt.wm_maximized)
         self.setCursor(cursor=self.app.top_cursor)
         self.stats.update_time = time.time()
+        self.startJournal()
         self.busy = old_busy
         # wait for canvas is mapped
         after(self.top, 200, self._configureHandler)
@@ -905,22 +956,21 @@ class Game(object):
 
     def restoreGameFromBookmark(self, bookmark):
         old_busy, self.busy = self.busy, 1
-        file = BytesIO(bookmark)
-        p = Unpickler(file)
-        game = self._undumpGame(p, self.app)
+        game = self._undumpGame(self._openSaveFile(bookmark), self.app)
         assert game.id == self.id
         self.restoreGame(game, reset=0)
         destruct(game)
         self.busy = old_busy
 
     def resetGame(self):
-        self.hints.list = None
+        self.invalidateHints()
         self.s.talon.removeAllCards()
         for stack in self.allstacks:
             stack.resetGame()
             if TOOLKIT == 'gtk':
                 # FIXME (pyramid like games)
                 stack.group.tkraise()
+        self.position_hash = 0
         if self.preview <= 1:
             for t in (self.texts.score, self.texts.base_rank,):
                 if t:
@@ -946,7 +996,7 @@ class Game(object):
         if bookmark:
             id, random = self.id, self.random
             f = BytesIO()
-            self._dumpGame(Pickler(f, 1), bookmark=1)
+            self._dumpGame(f, bookmark=1)
             self.app.nextgame.bookmark = f.getvalue()
         if id > 0:
             self.setCursor(cursor=CURSOR_WATCH)
@@ -975,21 +1025,16 @@ class Game(object):
                 self.gstats.restarted += 1
             return
         self.updateStats()
-        stats = self.app.stats
         if self.shallUpdateBalance():
             b = self.getGameBalance()
             if b:
-                stats.total_balance[self.id] = \
-                    stats.total_balance.get(self.id, 0) + b
-                stats.session_balance[self.id] = \
-                    stats.session_balance.get(self.id, 0) + b
-                stats.gameid_balance = stats.gameid_balance + b
+                self.app.stats.updateBalance(self.id, b)
 
     def restartGame(self):
         self.endGame(restart=1)
         self.newGame(restart=1, random=self.random)
 
-    def resizeImages(self, manually=False):
+    def resizeImages(self, manually=False, draft=False):
         self.center_offset = (0, 0)
         if self.canvas.winfo_ismapped():
             # apparent size of canvas
@@ -1020,7 +1065,12 @@ class Game(object):
         self.center_offset = self.getCenterOffset(vw, vh, iw, ih, xf, yf)
         if (not self.app.opt.spread_stacks or manually):
             # images
-            self.app.images.resize(xf, yf, resample=self.app.opt.resampling)
+            if draft:
+                self.app.images.resize(xf, yf, resample=self.DRAFT_RESAMPLE,
+                                       draft=True)
+            else:
+                self.app.images.resize(xf, yf,
+                                       resample=self.app.opt.resampling)
         # cards
         for card in self.cards:
             card.update(card.id, card.deck, card.suit, card.rank, self)
@@ -1040,52 +1090,56 @@ class Game(object):
         else:
             return 0, 0
 
-    def resizeGame(self, card_size_manually=False):
+    def resizeGame(self, card_size_manually=False, draft=False):
         # if self.busy:
         # return
         if not USE_PIL:
             return
         self.deleteStackDesc()
-        xf, yf, xf0, yf0 = \
-            self.resizeImages(manually=card_size_manually)
-        cw, ch = self.center_offset[0], self.center_offset[1]
-        for stack in self.allstacks:
-
-            if (self.app.opt.spread_stacks):
-                # Do not move Talons
-                # (because one would need to reposition
-                # 'empty cross' and 'redeal' figures)
-                # But in that case,
-                # games with talon not placed top-left corner
-                # will get it misplaced when auto_scale
-                # e.g. Suit Elevens
-                # => player can fix that issue by setting auto_scale false
-                if stack is self.s.talon:
-                    # stack.init_coord=(x, y)
-                    if card_size_manually:
-                        stack.resize(xf, yf0, widthpad=cw, heightpad=ch)
+        # the cards, stacks and texts are moved in one go
+        with self.canvas.batch():
+            xf, yf, xf0, yf0 = \
+                self.resizeImages(manually=card_size_manually, draft=draft)
+            cw, ch = self.center_offset[0], self.center_offset[1]
+            for stack in self.allstacks:
+
+                if (self.app.opt.spread_stacks):
+                    # Do not move Talons
+                    # (because one would need to reposition
+                    # 'empty cross' and 'redeal' figures)
+                    # But in that case,
+                    # games with talon not placed top-left corner
+                    # will get it misplaced when auto_scale
+                    # e.g. Suit Elevens
+                    # => player can fix that issue by setting auto_scale false
+                    if stack is self.s.talon:
+                        # stack.init_coord=(x, y)
+                        if card_size_manually:
+                            stack.resize(xf, yf0, widthpad=cw, heightpad=ch)
+                        else:
+                            stack.resize(xf0, yf0, widthpad=cw, heightpad=ch)
                     else:
-                        stack.resize(xf0, yf0, widthpad=cw, heightpad=ch)
+                        stack.resize(xf, yf0, widthpad=cw, heightpad=ch)
                 else:
-                    stack.resize(xf, yf0, widthpad=cw, heightpad=ch)
-            else:
-                stack.resize(xf, yf, widthpad=cw, heightpad=ch)
-            stack.updatePositions()
-        self.regions.calc_info(xf, yf, widthpad=cw, heightpad=ch)
-        # texts
-        for t in ('info', 'help', 'misc', 'score', 'base_rank'):
-            init_coord = getattr(self.init_texts, t)
-            if init_coord:
-                item = getattr(self.texts, t)
+                    stack.resize(xf, yf, widthpad=cw, heightpad=ch)
+                stack.updatePositions()
+            self.regions.calc_info(xf, yf, widthpad=cw, heightpad=ch)
+            if self.occlusion:
+                self.occlusion.build()
+            # texts
+            for t in ('info', 'help', 'misc', 'score', 'base_rank'):
+                init_coord = getattr(self.init_texts, t)
+                if init_coord:
+                    item = getattr(self.texts, t)
+                    x, y = int(round((init_coord[0] + cw) * xf)), \
+                        int(round((init_coord[1] + ch) * yf))
+                    self.canvas.coords(item, x, y)
+            for i in range(len(self.texts.list)):
+                init_coord = self.init_texts.list[i]
+                item = self.texts.list[i]
                 x, y = int(round((init_coord[0] + cw) * xf)), \
                     int(round((init_coord[1] + ch) * yf))
                 self.canvas.coords(item, x, y)
-        for i in range(len(self.texts.list)):
-            init_coord = self.init_texts.list[i]
-            item = self.texts.list[i]
-            x, y = int(round((init_coord[0] + cw) * xf)), \
-                int(round((init_coord[1] + ch) * yf))
-            self.canvas.coords(item, x, y)
 
     def createRandom(self, random):
         if random is None:
@@ -1112,21 +1166,17 @@ class Game(object):
     def leaveState(self, old_state):
         self.moves.state = old_state
 
-    def getSnapshotHash(self):
-        # generate hash (unique string) of current move
-        sn = []
+    # recompute the position hash after cards were placed by other
+    # means than the atomic moves (shuffle, startGame, restoreGame)
+    def initPositionHash(self):
+        h = 0
         for stack in self.allstacks:
-            s = []
-            for card in stack.cards:
-                s.append('%d%03d%d' % (card.suit, card.rank, card.face_up))
-            sn.append(''.join(s))
-        sn = '-'.join(sn)
-        return sn
+            h ^= hashCards(stack)
+        self.position_hash = h
 
     def getSnapshot(self):
-        # optimisation
-        sn = hash(self.getSnapshotHash())
-        return sn
+        # the moves keep the position hash up to date, see pysollib/move.py
+        return self.position_hash
 
     def createSnGroups(self):
         # group stacks by class and cap
@@ -1145,13 +1195,7 @@ class Game(object):
         self.sn_groups = sg
 
     def updateSnapshots(self):
-        sn = self.getSnapshot()
-        if sn in self.snapshots:
-            # self.updateStatus(snapshot=True)
-            pass
-        else:
-            self.snapshots.append(sn)
-            # self.updateStatus(snapshot=False)
+        self.snapshots.add(self.getSnapshot())
 
     # Create all cards for the game.
     def createCards(self, progress=None):
@@ -1254,12 +1298,14 @@ class Game(object):
         return 0
 
     def _cancelDrag(self, break_pause=True):
+        self.delayStuck()
         self.stopWinAnimation()
         if self.demo:
             self.stopDemo()
         if break_pause and self.pause:
             self.doPause()
         self.interruptSleep()
+        self.finishAnimations()
         self.deleteStackDesc()
         if self.busy:
             return 1
@@ -1278,6 +1324,7 @@ class Game(object):
     def _defaultHandler(self, event):
         if not self.app:
             return True                 # FIXME (GTK)
+        self.delayStuck()
         if not self.app.opt.mouse_undo:
             return True
         if self.pause:
@@ -1327,12 +1374,29 @@ class Game(object):
         if self.app and not self.pause:
             self.app.menubar.mPause()
 
+    # While the window is being resized the game is redrawn every
+    # RESIZE_DRAFT_DELAY ms at most, with the cheap DRAFT_RESAMPLE filter;
+    # RESIZE_DELAY ms after the last change it is drawn with the
+    # resampling option.
+    RESIZE_DRAFT_DELAY = 100
+    RESIZE_DELAY = 250
+    DRAFT_RESAMPLE = 0                  # Image.NEAREST
     _resizeHandlerID = None
+    _resizeDraftHandlerID = None
 
     def _resizeHandler(self):
         self._resizeHandlerID = None
+        self.finishAnimations()
+        if self._resizeDraftHandlerID:
+            self.canvas.after_cancel(self._resizeDraftHandlerID)
+            self._resizeDraftHandlerID = None
         self.resizeGame()
 
+    def _resizeDraftHandler(self):
+        self._resizeDraftHandlerID = None
+        self.finishAnimations()
+        self.resizeGame(draft=True)
+
     def _configureHandler(self, event=None):
         if False:  # if not USE_PIL:
             return
@@ -1348,7 +1412,12 @@ class Game(object):
             return
         if self._resizeHandlerID:
             self.canvas.after_cancel(self._resizeHandlerID)
-        self._resizeHandlerID = self.canvas.after(250, self._resizeHandler)
+            # a burst of events: show the sizes in between as drafts
+            if not self._resizeDraftHandlerID:
+                self._resizeDraftHandlerID = self.canvas.after(
+                    self.RESIZE_DRAFT_DELAY, self._resizeDraftHandler)
+        self._resizeHandlerID = self.canvas.after(
+            self.RESIZE_DELAY, self._resizeHandler)
 
     def playSample(self, name, priority=0, loop=0):
 
@@ -1427,15 +1496,15 @@ class Game(object):
         # 10 - used internally in game preview
         if self.app.opt.animations == 0 or frames == 0:
             return
-        # init timer - need a high resolution for this to work
-        clock, delay, skip = None, 1, 1
-        if self.app.opt.animations >= 2:
-            clock = uclock
         SPF = 0.15 / 8          # animation speed - seconds per frame
         if frames < 0:
             frames = 8
         assert frames >= 2
-        if self.app.opt.animations == 3:        # medium
+        if self.app.opt.animations == 1:        # very fast
+            # the frames used to be drawn without waiting in between;
+            # half the time of "fast" comes close to that
+            SPF /= 2
+        elif self.app.opt.animations == 3:      # medium
             frames *= 3
             SPF /= 2
         elif self.app.opt.animations == 4:      # slow
@@ -1466,48 +1535,35 @@ class Game(object):
         if tkraise:
             for card in cards:
                 card.tkraise()
+        if shadow and from_stack and \
+                not [c for c in cards if self.animator.isAnimating(c)]:
+            sx, sy = self.app.images.SHADOW_XOFFSET, \
+                self.app.images.SHADOW_YOFFSET
+            shadows = from_stack.createShadows(cards, sx, sy)
+        # the cards are moved now and shown moving by the animator, so
+        # the game goes on while the animation runs
+        starts = [(card.x, card.y) for card in cards]
         c0 = cards[0]
-        dx, dy = (x - c0.x) / float(frames), (y - c0.y) / float(frames)
-        tx, ty = 0, 0
-        i = 1
-        if clock:
-            starttime = clock()
-        while i < frames:
-            mx, my = int(round(dx * i)) - tx, int(round(dy * i)) - ty
-            tx, ty = tx + mx, ty + my
-            if i == 1 and shadow and from_stack:
-                # create shadows in the first frame
-                sx, sy = self.app.images.SHADOW_XOFFSET, \
-                    self.app.images.SHADOW_YOFFSET
-                shadows = from_stack.createShadows(cards, sx, sy)
-            for s in shadows:
-                s.move(mx, my)
-            for card in cards:
-                card.moveBy(mx, my)
-            self.canvas.update_idletasks()
-            step = 1
-            if clock:
-                endtime = starttime + i*SPF
-                sleep = endtime - clock()
-                if delay and sleep >= 0.005:
-                    # we're fast - delay
-                    # print "Delay frame", i, sleep
-                    usleep(sleep)
-                elif skip and sleep <= -0.75*SPF:
-                    # we're slow - skip 1 or 2 frames
-                    # print "Skip frame", i, sleep
-                    step += 1
-                    if frames > 4 and sleep < -1.5*SPF:
-                        step += 1
-                # print i, step, mx, my; time.sleep(0.5)
-            i += step
-        # last frame: delete shadows, move card to final position
-        for s in shadows:
-            s.delete()
         dx, dy = x - c0.x, y - c0.y
         for card in cards:
             card.moveBy(dx, dy)
-        self.canvas.update_idletasks()
+        self.animator.add(cards, starts, frames * SPF, shadows)
+
+    def finishAnimations(self):
+        # show the cards in their places before a new action
+        if self.animator:
+            self.animator.finish()
+
+    def createOcclusion(self):
+        stacks = self.getOcclusionStacks()
+        # (kivy moves the cards on its own, so they are left alone)
+        if stacks and TOOLKIT != 'kivy':
+            self.occlusion = StackOcclusion(stacks)
+
+    def _cardStopped(self, card):
+        # the card now covers the cards below it
+        if self.occlusion:
+            self.occlusion.cardStopped()
 
     def doAnimatedFlipAndMove(self, from_stack, to_stack=None, frames=-1):
         if self.app.opt.animations == 0 or frames == 0:
@@ -1521,6 +1577,8 @@ class Game(object):
 
         canvas = self.canvas
         card = from_stack.cards[-1]
+        if self.animator.isAnimating(card):
+            self.finishAnimations()
         im1 = card._active_image._pil_image
         if card.face_up:
             im2 = card._back_image._pil_image
@@ -1742,6 +1800,8 @@ class Game(object):
             self.win_animation.tk_images = []  # delete all images
             self.saved_images = {}
             self.canvas.showAllItems()
+            for card in self.cards:
+                card.rehide()
             return True
         return False
 
@@ -1754,6 +1814,7 @@ class Game(object):
             return
         if not Image:
             return
+        self.finishAnimations()
         self.canvas.hideAllItems()
         # select some random cards
         cards = self.cards[:]
@@ -1847,6 +1908,9 @@ class Game(object):
         return self.app.images.getShade()
 
     def _getClosestStack(self, cx, cy, stacks, dragstack):
+        grid = self.regions.getIndex(stacks)
+        if grid is not None:
+            return grid.closest(cx, cy)
         closest, cdist = None, 999999999
         # Since we only compare distances,
         # we don't bother to take the square root.
@@ -2260,6 +2324,11 @@ class Game(object):
                         info.append((s, c, c, col))
         return self._highlightCards(info, 0)
 
+    # the stacks whose cards may be covered by the cards of the others,
+    # in their stacking order (see StackOcclusion)
+    def getOcclusionStacks(self):
+        return ()
+
     # highlight all moveable piles
     def getHighlightPilesStacks(self):
         # default: dropstacks with min pile length = 2
@@ -2571,13 +2640,14 @@ class Game(object):
             mixed=mixed,
             sleep=self.app.opt.timeouts['demo'],
             last_deal=[],
-            snapshots=[],
+            snapshots=SnapshotStore(),
             hint=None,
             keypress=None,
             start_demo_moves=self.stats.demo_moves,
             info_text=None,
         )
         self.hints.list = None
+        self.startJournal()
         self.createDemoInfoText()
         self.createDemoLogo()
         after_idle(self.top, self.demoEvent)  # schedule first move
@@ -2588,6 +2658,7 @@ class Game(object):
         self.canvas.setTopImage(None)
         self.demo_logo = None
         self.demo = None
+        self.startJournal()
         self.updateMenus()
 
     # demo event - play one demo move and check for win/loss
@@ -2742,11 +2813,9 @@ class Game(object):
                 demo.last_deal.append(c)
             else:                       # new version, based on snapshots
                 # check snapshot
-                sn = self.getSnapshot()
-                if sn in demo.snapshots:
+                if not demo.snapshots.add(self.getSnapshot()):
                     # not unique
                     return 1
-                demo.snapshots.append(sn)
         elif from_stack == to_stack:
             # a flip-move
             from_stack.flipMove(animation=True)
@@ -2836,23 +2905,45 @@ class Game(object):
         self.canvas.setTopImage(self.demo_logo)
 
     def getStuck(self):
-        h = self.Stuck_Class.getHints(None)
-        if h:
-            self.failed_snapshots = []
+        if self.Stuck_Class.hasHints():
+            self.failed_snapshots.clear()
             return True
         if not self.canDealCards():
             return False
         # can deal cards: do we have any hints in previous deals ?
-        sn = self.getSnapshot()
-        if sn in self.failed_snapshots:
-            return False
-        self.failed_snapshots.append(sn)
-        return True
+        return self.failed_snapshots.add(self.getSnapshot())
 
+    # The stuck check needs a hint computation, so it runs when the game
+    # is idle; the next move cancels it, and any other input puts it off
+    # (see delayStuck()).  The null toolkit has no timers, so there it
+    # runs at once.
     def updateStuck(self):
-        # stuck
+        self.cancelStuck()
+        if self.finished or self.Stuck_Class is None:
+            return
+        if TOOLKIT == 'null':
+            self.stuckEvent()
+            return
+        self.stuck_timer = after(self.top, STUCK_TIMEOUT, self.stuckEvent)
+
+    def delayStuck(self):
+        if self.stuck_timer:
+            self.updateStuck()
+
+    def cancelStuck(self):
+        if self.stuck_timer:
+            after_cancel(self.stuck_timer)
+            self.stuck_timer = None
+
+    def stuckEvent(self):
+        self.stuck_timer = None
         if self.finished or self.Stuck_Class is None or self.isGameWon() != 0:
             return
+        if (self.drag.stack or self.busy) and TOOLKIT != 'null':
+            # do not get in the way of a drag or a move; check later
+            self.stuck_timer = after(
+                self.top, STUCK_TIMEOUT, self.stuckEvent)
+            return
         if self.getStuck():
             text = ''
             self.stuck = False
@@ -2899,6 +2990,16 @@ class Game(object):
         self.moves = GameMoves()
         self.stats._reset_statistics()
 
+    # Forget the hint list. The hint caches only forget the hints
+    # involving the stacks changed by the atomic move am (or all of them
+    # if am is None).
+    def invalidateHints(self, am=None):
+        self.cancelStuck()
+        self.hints.list = None
+        stack_ids = None if am is None else am.getStackIds()
+        for cache in self.hints.caches.values():
+            cache.touch(stack_ids)
+
     def __storeMove(self, am):
         if self.S_DEAL <= self.moves.state <= self.S_PLAY:
             self.moves.current.append(am)
@@ -2910,7 +3011,7 @@ class Game(object):
         am = AMoveMove(ncards, from_stack, to_stack, frames, shadow)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     # move type 2
     def flipMove(self, stack):
@@ -2918,7 +3019,7 @@ class Game(object):
         am = AFlipMove(stack)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     def singleFlipMove(self, stack):
         # flip with animation (without "moveMove" in this move)
@@ -2926,14 +3027,14 @@ class Game(object):
         am = ASingleFlipMove(stack)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     def flipAndMoveMove(self, from_stack, to_stack, frames=-1):
         assert from_stack and to_stack and (from_stack is not to_stack)
         am = AFlipAndMoveMove(from_stack, to_stack, frames)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     # move type 3
     def turnStackMove(self, from_stack, to_stack):
@@ -2942,7 +3043,7 @@ class Game(object):
         am = ATurnStackMove(from_stack, to_stack)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     # move type 4
     def nextRoundMove(self, stack):
@@ -2950,7 +3051,7 @@ class Game(object):
         am = ANextRoundMove(stack)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     # move type 5
     def saveSeedMove(self):
@@ -2965,7 +3066,7 @@ class Game(object):
         am = AShuffleStackMove(stack, self)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     # move type 7
     def updateStackMove(self, stack, flags):
@@ -2973,7 +3074,7 @@ class Game(object):
         am = AUpdateStackMove(stack, flags)
         self.__storeMove(am)
         am.do(self)
-        # #self.hints.list = None
+        self.invalidateHints(am)
 
     # move type 8
     def flipAllMove(self, stack):
@@ -2981,14 +3082,14 @@ class Game(object):
         am = AFlipAllMove(stack)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     # move type 9
     def saveStateMove(self, flags):
         am = ASaveStateMove(self, flags)
         self.__storeMove(am)
         am.do(self)
-        # self.hints.list = None
+        self.invalidateHints(am)
 
     # for ArbitraryStack
     def singleCardMove(self, from_stack, to_stack, position,
@@ -2996,7 +3097,7 @@ class Game(object):
         am = ASingleCardMove(from_stack, to_stack, position, frames, shadow)
         self.__storeMove(am)
         am.do(self)
-        self.hints.list = None
+        self.invalidateHints(am)
 
     # Finish the current move.
     def finishMove(self):
@@ -3056,6 +3157,13 @@ class Game(object):
             assert moves.index == len(moves.history)
 
         moves.current = []
+        if self.journal:
+            if self.canUndo():
+                self.journal.addMove(current, replace=redo)
+            else:
+                # the move cannot be replayed
+                self.startJournal()
+            self.updateJournal()
         self.updateSnapshots()
         # update view
         self.updateText()
@@ -3076,18 +3184,23 @@ class Game(object):
             return
         self.moves.index -= 1
         self.moves.state = self.S_UNDO
-        for atomic_move in reversed(self.moves.history[self.moves.index]):
-            atomic_move.undo(self)
+        with self.canvas.batch():
+            for atomic_move in reversed(
+                    self.moves.history[self.moves.index]):
+                atomic_move.undo(self)
+                self.invalidateHints(atomic_move)
         self.moves.state = self.S_PLAY
         self.stats.undo_moves += 1
         self.stats.total_moves += 1
-        self.hints.list = None
+        if self.journal:
+            self.journal.addUndo()
+            self.updateJournal()
         self.updateSnapshots()
         self.updateText()
         self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
         self.updateMenus()
         self.updateStatus(stuck='')
-        self.failed_snapshots = []
+        self.failed_snapshots.clear()
         reset_solver_dialog()
 
     def redo(self):
@@ -3099,12 +3212,16 @@ class Game(object):
         m = self.moves.history[self.moves.index]
         self.moves.index += 1
         self.moves.state = self.S_REDO
-        for atomic_move in m:
-            atomic_move.redo(self)
+        with self.canvas.batch():
+            for atomic_move in m:
+                atomic_move.redo(self)
+                self.invalidateHints(atomic_move)
         self.moves.state = self.S_PLAY
         self.stats.redo_moves += 1
         self.stats.total_moves += 1
-        self.hints.list = None
+        if self.journal:
+            self.journal.addRedo()
+            self.updateJournal()
         self.updateSnapshots()
         self.updateText()
         self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
@@ -3141,7 +3258,7 @@ class Game(object):
                 return 0
         f = BytesIO()
         try:
-            self._dumpGame(Pickler(f, 1), bookmark=2)
+            self._dumpGame(f, bookmark=2)
             bm = (f.getvalue(), self.moves.index)
         except Exception:
             pass
@@ -3164,9 +3281,7 @@ class Game(object):
         try:
             s, moves_index = bm
             self.setCursor(cursor=CURSOR_WATCH)
-            file = BytesIO(s)
-            p = Unpickler(file)
-            game = self._undumpGame(p, self.app)
+            game = self._undumpGame(self._openSaveFile(s), self.app)
             assert game.id == self.id
             # save state for undoGotoBookmark
             self.setBookmark(-1, confirm=0)
@@ -3234,11 +3349,11 @@ class Game(object):
                 self.endGame()
                 self.quitGame(game.id, loadedgame=game)
 
-    def saveGame(self, filename, protocol=-1):
+    def saveGame(self, filename):
         self.finishMove()       # just in case
         self.setCursor(cursor=CURSOR_WATCH)
         try:
-            self._saveGame(filename, protocol)
+            self._saveGame(filename)
         except Exception as ex:
             self.setCursor(cursor=self.app.top_cursor)
             MfxExceptionDialog(self.top, ex, title=_("Save game error"),
@@ -3254,7 +3369,7 @@ class Game(object):
     def _loadGame(self, filename, app):
         game = None
         with open(filename, "rb") as f:
-            game = self._undumpGame(Unpickler(f), app)
+            game = self._undumpGame(self._openSaveFile(f.read()), app)
             game.gstats.loaded += 1
         return game
 
@@ -3313,6 +3428,9 @@ class Game(object):
         #
         initial_seed = random__int2str(pload(int))
         game.random = construct_random(initial_seed)
+        if isinstance(p, SaveFileReader):
+            # the saved states of the random refer to this one
+            p.random = game.random
         state = pload()
         if (game.random is not None and
                 not isinstance(game.random, random2.Random) and
@@ -3344,8 +3462,16 @@ class Game(object):
             game.gsaveinfo.__dict__.update(gsaveinfo.__dict__)
         moves = pload(GameMoves)
         game.moves.__dict__.update(moves.__dict__)
-        snapshots = pload(list)
-        game.snapshots = snapshots
+        snapshots = pload()
+        # older versions saved a list
+        validate(isinstance(snapshots, (bytes, list)), err_txt)
+        try:
+            if isinstance(snapshots, bytes):
+                game.snapshots = SnapshotStore.loads(snapshots)
+            else:
+                game.snapshots = SnapshotStore(snapshots)
+        except (TypeError, ValueError):
+            raise UnpicklingError(err_txt)
         if 0 <= bookmark <= 1:
             gstats = pload(GameGlobalStatsStruct)
             game.gstats.__dict__.update(gstats.__dict__)
@@ -3362,13 +3488,80 @@ class Game(object):
             game.gsaveinfo = self.gsaveinfo
         return game
 
-    def _saveGame(self, filename, protocol=-1):
+    def _saveGame(self, filename):
         if self.canSaveGame():
             with open(filename, "wb") as f:
-                self._dumpGame(Pickler(f, protocol))
-
-    def _dumpGame(self, p, bookmark=0):
-        return pysolDumpGame(self, p, bookmark)
+                self._dumpGame(f)
+
+    def _dumpGame(self, f, bookmark=0):
+        return pysolDumpGame(self, f, bookmark)
+
+    # the move journal (see pysollib.game.journal); it is started
+    # again with the whole game whenever a game is dealt or restored
+    def startJournal(self):
+        self.syncJournal()
+        self.journal = None
+        # the preview games of the select dialogs have no journal
+        journal = getattr(self.app, "journal", None)
+        if journal is None or not self.canSaveGame():
+            return
+        if self.demo:
+            # the demo moves are not journaled: the journal keeps the
+            # game from before the demo and starts again when it stops
+            return
+        f = BytesIO()
+        try:
+            self._dumpGame(f, bookmark=1)
+        except Exception:
+            traceback.print_exc()
+            journal.close()
+            return
+        journal.start(f.getvalue())
+        self.journal = journal
+
+    # the journal syncs its records to disk in batches; the rest is
+    # synced when the game has been idle for a moment
+    def updateJournal(self):
+        if self.journal_timer:
+            after_cancel(self.journal_timer)
+        self.journal_timer = after(
+            self.top, JOURNAL_SYNC_TIMEOUT, self.syncJournal)
+
+    def syncJournal(self):
+        if self.journal_timer:
+            after_cancel(self.journal_timer)
+            self.journal_timer = None
+        if self.journal:
+            self.journal.sync()
+
+    # replay the records of a journal on the restored base
+    def replayJournal(self, records):
+        self.journal = None
+        moves, stats = self.moves, self.stats
+        try:
+            for kind, group in iterJournal(records, self.random):
+                if kind == b'U':
+                    self.undo()
+                    continue
+                if kind == b'M':
+                    moves.history[moves.index:] = [group]
+                elif kind == b'm':
+                    moves.history[moves.index:moves.index+1] = [group]
+                if kind != b'R':
+                    # a move played, not redone
+                    stats.redo_moves -= 1
+                    stats.player_moves += 1
+                self.redo()
+        except Exception:
+            traceback.print_exc()
+        self.startJournal()
+
+    # the values of a save file or bookmark; files from older versions
+    # are pickled
+    def _openSaveFile(self, data):
+        if data.startswith(MAGIC):
+            return SaveFileReader(data)
+        return Unpickler(BytesIO(data))
 
     def startPlayTimer(self):
         self.updateStatus(time=None)
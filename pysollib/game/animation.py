@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# The card animations.  The cards (card.x, card.y) are moved at once by
+# Game.animatedMoveTo(); only the canvas items follow later, from their
+# old place to the new one, on after() timers.  Every frame places the
+# items by the time elapsed since the start of the move, so a slow
+# frame is dropped instead of slowing the move down.  Any number of
+# cards can move at the same time; a card that is moved again while it
+# is still moving goes on from where the first move ends.  A card that
+# is hidden while it moves (see Card.hide()) is hidden when it stops,
+# and then stopped(card) is called, if given.
+
+from pysollib.mfxutil import print_err, uclock
+from pysollib.settings import DEBUG
+
+
+class _Leg:
+    # one move of one card, from start to target (None for the position
+    # of the card)
+    def __init__(self, start, target, starttime, duration, shadows=()):
+        self.start = start
+        self.target = target
+        self.starttime = starttime
+        self.duration = duration
+        self.shadows = shadows
+
+    def getPosition(self, card, now):
+        if self.target is None:
+            tx, ty = card.x, card.y
+        else:
+            tx, ty = self.target
+        if self.duration <= 0:
+            p = 1.0
+        else:
+            p = min(1.0, max(0.0, (now - self.starttime) / self.duration))
+        sx, sy = self.start
+        return sx + (tx - sx) * p, sy + (ty - sy) * p
+
+    def isDone(self, now):
+        return now >= self.starttime + self.duration
+
+
+class CardAnimator:
+    FRAME = 0.15 / 8                    # seconds per frame
+
+    def __init__(self, widget, clock=uclock, stopped=None):
+        self.widget = widget
+        self.clock = clock
+        self.stopped = stopped
+        self._legs = {}                 # key: card, the moves to come
+        self._offsets = {}              # key: card, item - card position
+        self._timer = None
+        self._last = None
+        # the frames drawn and dropped, in all and since the animations
+        # were last idle
+        self.frames = 0
+        self.dropped = 0
+        self._run = (0, 0)
+
+    def isAnimating(self, card=None):
+        if card is None:
+            return bool(self._legs)
+        return card in self._legs
+
+    def add(self, cards, starts, duration, shadows=()):
+        """Show cards, which have been moved, moving from starts (their
+        positions before the move) to their places in duration seconds.
+        The shadows follow the first card."""
+        now = self.clock()
+        for i, card in enumerate(cards):
+            legs = self._legs.get(card)
+            if legs:
+                # after the moves to come, which now end where the card
+                # was before this move
+                prev = legs[-1]
+                prev.target = starts[i]
+                starttime = max(now, prev.starttime + prev.duration)
+                legs.append(_Leg(starts[i], None, starttime, duration))
+            else:
+                self._legs[card] = [_Leg(starts[i], None, now, duration)]
+        # the first frame now, before the cards are drawn in their place
+        self._draw(now)
+        # the shadows are already drawn at the start
+        legs = self._legs.get(cards[0])
+        if legs:
+            legs[-1].shadows = shadows
+        else:
+            for s in shadows:
+                s.delete()
+        if self._timer is None and self._legs:
+            self._last = now
+            self._run = (self.frames - 1, self.dropped)
+            self._timer = self.widget.after(int(self.FRAME * 1000),
+                                            self._tick)
+
+    def finish(self):
+        """Show all the cards in their places now."""
+        if self._timer is not None:
+            self.widget.after_cancel(self._timer)
+            self._timer = None
+        cards, self._legs = self._legs, {}
+        for card, legs in cards.items():
+            for leg in legs:
+                for s in leg.shadows:
+                    s.delete()
+            self._moveItem(card, card.x, card.y, ())
+            self._stop(card)
+        self._offsets = {}
+
+    def _tick(self):
+        self._timer = None
+        now = self.clock()
+        late = now - self._last - self.FRAME
+        if late >= self.FRAME:
+            self.dropped += int(late / self.FRAME)
+        self._last = now
+        self._draw(now)
+        if self._legs:
+            self._timer = self.widget.after(int(self.FRAME * 1000),
+                                            self._tick)
+        elif DEBUG:
+            print_err('animation: %d frames, %d dropped' % (
+                self.frames - self._run[0], self.dropped - self._run[1]),
+                level=2)
+
+    def _draw(self, now):
+        self.frames += 1
+        for card, legs in list(self._legs.items()):
+            while len(legs) > 1 and legs[0].isDone(now):
+                self._deleteShadows(legs.pop(0))
+            leg = legs[0]
+            if now < leg.starttime:
+                continue
+            x, y = leg.getPosition(card, now)
+            self._moveItem(card, x, y, leg.shadows)
+            if len(legs) == 1 and leg.isDone(now):
+                self._deleteShadows(leg)
+                del self._legs[card]
+                self._stop(card)
+
+    def _stop(self, card):
+        card.rehide()
+        if self.stopped is not None:
+            self.stopped(card)
+
+    def _deleteShadows(self, leg):
+        for s in leg.shadows:
+            s.delete()
+        leg.shadows = ()
+
+    def _moveItem(self, card, x, y, shadows):
+        ox, oy = self._offsets.get(card, (0, 0))
+        nx, ny = int(round(x - card.x)), int(round(y - card.y))
+        dx, dy = nx - ox, ny - oy
+        if dx or dy:
+            card.item.move(dx, dy)
+            for s in shadows:
+                s.move(dx, dy)
+        if nx or ny:
+            self._offsets[card] = (nx, ny)
+        else:
+            self._offsets.pop(card, None)
@@ -17,40 +17,28 @@
 #
 from pysol_cards.random import random__str2int
 
+from pysollib.game.savefile import RandomState, SaveFileWriter
 from pysollib.settings import PACKAGE
 from pysollib.settings import VERSION, VERSION_TUPLE
 
 
-def pysolDumpGame(game_, p, bookmark=0):
+def pysolDumpGame(game_, f, bookmark=0):
     game_.updateTime()
     assert 0 <= bookmark <= 2
-    p.dump(PACKAGE)
-    p.dump(VERSION)
-    p.dump(VERSION_TUPLE)
-    p.dump(bookmark)
-    p.dump(game_.GAME_VERSION)
-    p.dump(game_.id)
-    #
-    p.dump(random__str2int(game_.random.getSeedStr()))
-    p.dump(game_.random.getstate())
-    #
-    p.dump(len(game_.allstacks))
-    for stack in game_.allstacks:
-        p.dump(len(stack.cards))
-        for card in stack.cards:
-            p.dump(card.id)
-            p.dump(card.face_up)
-    p.dump(game_.s.talon.round)
-    p.dump(game_.finished)
+    w = SaveFileWriter()
+    w.addValues(b'HEAD', PACKAGE, VERSION, VERSION_TUPLE, bookmark,
+                game_.GAME_VERSION, game_.id,
+                random__str2int(game_.random.getSeedStr()),
+                RandomState(game_.random.getstate()), game_.s.talon.round,
+                game_.finished)
+    w.addStacks(b'CARD', game_.allstacks)
     if 0 <= bookmark <= 1:
-        p.dump(game_.saveinfo)
-        p.dump(game_.gsaveinfo)
-    p.dump(game_.moves)
-    p.dump(game_.snapshots)
+        w.addValues(b'SAVE', game_.saveinfo.__dict__, game_.gsaveinfo.__dict__)
+    w.addMoves(b'MOVE', game_.moves)
+    w.addData(b'SNAP', game_.snapshots.dumps())
     if 0 <= bookmark <= 1:
         if bookmark == 0:
             game_.gstats.saved += 1
-        p.dump(game_.gstats)
-        p.dump(game_.stats)
-    game_._saveGameHook(p)
-    p.dump("EOF")
+        w.addValues(b'STAT', game_.gstats.__dict__, game_.stats.__dict__)
+    game_._saveGameHook(w)
+    f.write(w.getvalue())
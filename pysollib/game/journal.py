@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# The move journal: an append-only file with the game in progress, so
+# that it can be recovered after a crash.  It starts with the whole
+# game in the save file format (the "base", written when a game is
+# dealt or restored), followed by one small record per finished move,
+# undo and redo.  Records are flushed at once and synced to disk in
+# batches, and the game syncs the rest when it goes idle (see
+# Game.updateJournal()), so a crash loses at most the last few moves.
+#
+# The records are not of a fixed size: a move is a group of atomic
+# moves of several kinds, some of them with a whole random state, and
+# there is no upper bound on their number.  The move table interns the
+# atomic moves, so the common ones take a few bytes each.
+#
+# A record is a 1 byte kind, a 4 byte length and the data:
+#
+#   B  the base, see pysolDumpGame()
+#   C  new entries of the move table, see MoveTable
+#   M  a finished move, the atomic moves as in MoveTable.encodeGroup()
+#   m  the same, for a move that replaced the next move of the history
+#      instead of cutting it off (see Game.finishMove())
+#   U  undo
+#   R  redo
+
+import os
+import struct
+import time
+
+from pysollib.game.savefile import MoveTable, ValueDecoder, \
+    decodeMoveGroup, encodeValues, resolveMoveTable
+from pysollib.mfxutil import print_err
+
+MAGIC = b'PySolFC-journal\n'
+FORMAT_VERSION = 1
+
+
+class MoveJournal:
+    # sync to disk after this many records or seconds
+    SYNC_RECORDS = 16
+    SYNC_INTERVAL = 2.0
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = None
+
+    def start(self, base):
+        """Start a new journal with the saved game base."""
+        self.close()
+        self._table = MoveTable()
+        self._pending = 0
+        self._synced = time.time()
+        try:
+            self._file = open(self.filename, "wb")
+            self._file.write(MAGIC + struct.pack('<H', FORMAT_VERSION))
+        except EnvironmentError as ex:
+            self._error(ex)
+            return
+        self._write(b'B', base)
+        self._sync()
+
+    def addMove(self, group, replace=False):
+        if self._file is None:
+            return
+        n = len(self._table.entries)
+        out = []
+        self._table.encodeGroup(out, group)
+        if len(self._table.entries) > n:
+            self._write(b'C', encodeValues(self._table.entries[n:]))
+        self._write(b'm' if replace else b'M', b''.join(out))
+
+    def addUndo(self):
+        self._write(b'U')
+
+    def addRedo(self):
+        self._write(b'R')
+
+    def sync(self):
+        """Sync the records that are not synced yet."""
+        if self._file is not None and self._pending:
+            self._sync()
+
+    def close(self, remove=False):
+        if self._file is not None:
+            self.sync()
+            try:
+                self._file.close()
+            except EnvironmentError:
+                pass
+            self._file = None
+        if remove and os.path.exists(self.filename):
+            try:
+                os.remove(self.filename)
+            except EnvironmentError as ex:
+                print_err("cannot remove %s: %s" % (self.filename, ex))
+
+    def read(self):
+        """Return the base and the records of the journal, or None if
+        there is no (valid) journal."""
+        try:
+            with open(self.filename, "rb") as f:
+                data = f.read()
+        except EnvironmentError:
+            return None
+        if not data.startswith(MAGIC):
+            return None
+        pos = len(MAGIC)
+        if struct.unpack('<H', data[pos:pos+2])[0] > FORMAT_VERSION:
+            return None
+        pos += 2
+        records = []
+        while pos + 5 <= len(data):
+            kind, n = struct.unpack('<cI', data[pos:pos+5])
+            if pos + 5 + n > len(data):
+                # the last record was cut off by the crash
+                break
+            records.append((kind, data[pos+5:pos+5+n]))
+            pos += 5 + n
+        if not records or records[0][0] != b'B':
+            return None
+        return records[0][1], records[1:]
+
+    def _write(self, kind, data=b''):
+        if self._file is None:
+            return
+        try:
+            self._file.write(struct.pack('<cI', kind, len(data)) + data)
+            self._file.flush()
+        except EnvironmentError as ex:
+            self._error(ex)
+            return
+        self._pending += 1
+        if (self._pending >= self.SYNC_RECORDS or
+                time.time() - self._synced >= self.SYNC_INTERVAL):
+            self._sync()
+
+    def _sync(self):
+        self._pending = 0
+        self._synced = time.time()
+        try:
+            os.fsync(self._file.fileno())
+        except (AttributeError, EnvironmentError):
+            pass
+
+    def _error(self, ex):
+        print_err("move journal disabled: %s" % ex)
+        self.close()
+
+
+def iterJournal(records, random=None):
+    """Yield (kind, group) for the records of a journal; group is the
+    list of atomic moves of M and m records and None otherwise."""
+    table = []
+    for kind, data in records:
+        if kind == b'C':
+            table.extend(resolveMoveTable(ValueDecoder(data).decode()))
+        elif kind in (b'M', b'm'):
+            yield kind, decodeMoveGroup(ValueDecoder(data, random), table)
+        elif kind in (b'U', b'R'):
+            yield kind, None
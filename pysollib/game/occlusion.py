@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# The cards that are fully covered by the cards of other stacks, for the
+# layouts where stacks lie on top of each other, like the levels of
+# Mahjongg.  A covered card is hidden, so its item is not drawn, and it
+# is shown again as soon as it is no longer covered.
+#
+# The stacks are given in their stacking order: the cards of a stack
+# may cover the cards of the stacks before it.  A card is a tile, whose
+# 3D edge is as deep as the card offset of its stack: the corners of the
+# image which the edge leaves out are not drawn, so they cover nothing,
+# and they need not be covered.  A card that is still moving (see
+# CardAnimator) covers nothing until it stops.
+
+
+def _shape(card, w, h, ox, oy):
+    # the card as two rectangles: the face, and the face moved along
+    # the edge
+    x0, y0 = card.x + max(ox, 0), card.y + max(oy, 0)
+    x1, y1 = card.x + w + min(ox, 0), card.y + h + min(oy, 0)
+    return ((x0, y0, x1, y1), (x0 - ox, y0 - oy, x1 - ox, y1 - oy))
+
+
+def _isCovered(rect, rects):
+    # whether rect is inside the union of rects
+    x0, y0, x1, y1 = rect
+    rects = [r for r in rects
+             if r[0] < x1 and r[2] > x0 and r[1] < y1 and r[3] > y0]
+    if not rects:
+        return False
+    xs = sorted(set([x0, x1] + [r[0] for r in rects if r[0] > x0] +
+                    [r[2] for r in rects if r[2] < x1]))
+    # each strip between two edges must be covered from top to bottom
+    for i in range(len(xs) - 1):
+        left, right = xs[i], xs[i + 1]
+        y = y0
+        for top, bottom in sorted((r[1], r[3]) for r in rects
+                                  if r[0] <= left and r[2] >= right):
+            if top > y:
+                break
+            y = max(y, bottom)
+        if y < y1:
+            return False
+    return True
+
+
+class StackOcclusion:
+    def __init__(self, stacks):
+        self.stacks = tuple(stacks)
+        # key: stack, the stacks after/before it which it overlaps
+        self.above = {}
+        self.below = {}
+        # the stacks with a card that a moving card is going to cover
+        self.pending = set()
+        for stack in self.stacks:
+            stack.occlusion = self
+        self.build()
+
+    def build(self):
+        """Find the stacks which overlap; to be called when the stacks
+        were moved."""
+        if not self.stacks:
+            return
+        self.w, self.h = self.stacks[0].game.app.images.getSize()
+        area = []
+        for stack in self.stacks:
+            dx = abs(stack.CARD_XOFFSET[0])
+            dy = abs(stack.CARD_YOFFSET[0])
+            area.append((stack.x - dx, stack.y - dy,
+                         stack.x + self.w + dx, stack.y + self.h + dy))
+        self.above = dict((stack, []) for stack in self.stacks)
+        self.below = dict((stack, []) for stack in self.stacks)
+        for i, a in enumerate(area):
+            for j in range(i + 1, len(area)):
+                b = area[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    self.above[self.stacks[i]].append(self.stacks[j])
+                    self.below[self.stacks[j]].append(self.stacks[i])
+        self.update(self.stacks)
+
+    def changed(self, stack):
+        """The cards of stack were changed."""
+        self.update([stack] + self.below[stack])
+
+    def cardStopped(self):
+        """A card stopped moving."""
+        if self.pending:
+            stacks, self.pending = self.pending, set()
+            self.update(stacks)
+
+    def update(self, stacks):
+        for stack in stacks:
+            self._updateStack(stack)
+
+    def _shapes(self, stack, cards):
+        ox, oy = stack.CARD_XOFFSET[0], stack.CARD_YOFFSET[0]
+        return [_shape(card, self.w, self.h, ox, oy) for card in cards]
+
+    def _updateStack(self, stack):
+        cards = stack.cards
+        if not cards:
+            return
+        # the cards which cover the cards of stack, but the ones of stack
+        covering = []
+        moving = False
+        for other in self.above[stack]:
+            for card in other.cards:
+                if card.isAnimating():
+                    moving = True
+                else:
+                    covering.append((other, card))
+        shapes = self._shapes(stack, cards)
+        rects = []
+        for other, card in covering:
+            rects.extend(self._shapes(other, [card])[0])
+        for i in range(len(cards) - 1, -1, -1):
+            card = cards[i]
+            if (_isCovered(shapes[i][0], rects) and
+                    _isCovered(shapes[i][1], rects)):
+                card.hide(stack)
+            else:
+                if moving:
+                    self.pending.add(stack)
+                card.unhide()
+            # the cards above it in its stack cover it too
+            rects.extend(shapes[i])
@@ -0,0 +1,396 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# The binary save game format.
+#
+# A save file is the magic string, the format version and a list of
+# sections, each a 4 byte tag, a 4 byte length and the data:
+#
+#   HEAD  package, versions, bookmark flag, game id, seed, random state,
+#         talon round and finished flag
+#   CARD  the cards of each stack, packed as 16-bit (id << 1 | face_up)
+#   SAVE  saveinfo and gsaveinfo (not in bookmarks)
+#   MOVE  the move history; each atomic move is a class index and the
+#         values of its fields, the field names are stored once per class
+#   SNAP  the snapshots, see SnapshotStore.dumps()
+#   STAT  gstats and stats (not in bookmarks)
+#   HOOK  the values written by Game._saveGameHook()
+#
+# Values use a small tagged encoding of None, booleans, numbers,
+# strings, lists, tuples, dicts, Structs and the states of game.random
+# (see RandomState), so loading a file never runs code from it, unlike
+# pickle.  Old (pickled) save files are
+# still read, see Game._undumpGame().
+
+import struct
+from pickle import UnpicklingError
+
+from pysollib.mfxutil import Struct
+from pysollib.move import AtomicMove
+
+import six
+
+MAGIC = b'PySolFC-save\n'
+FORMAT_VERSION = 2
+
+
+class SaveFileError(UnpicklingError):
+    pass
+
+
+class RandomState:
+    """A state of game.random (getstate()), to be saved.
+
+    The state of a Mersenne Twister random starts with the seed method
+    of the random; it is not saved but taken from the random of the
+    loaded game.
+    """
+
+    def __init__(self, state):
+        self.state = state
+
+
+# ************************************************************************
+# * values
+# ************************************************************************
+
+def _encode(out, v):
+    if v is None:
+        out.append(b'N')
+    elif v is True:
+        out.append(b'T')
+    elif v is False:
+        out.append(b'F')
+    elif isinstance(v, six.integer_types):
+        if 0 <= v <= 0xff:
+            out.append(b'B' + struct.pack('<B', v))
+        elif -0x80000000 <= v <= 0x7fffffff:
+            out.append(b'i' + struct.pack('<i', v))
+        elif -0x8000000000000000 <= v <= 0x7fffffffffffffff:
+            out.append(b'q' + struct.pack('<q', v))
+        else:
+            _encodeBytes(out, b'I', str(v).encode('ascii'))
+    elif isinstance(v, float):
+        out.append(b'd' + struct.pack('<d', v))
+    elif isinstance(v, six.text_type):
+        _encodeBytes(out, b's', v.encode('utf-8'))
+    elif isinstance(v, bytes):
+        _encodeBytes(out, b'b', v)
+    elif isinstance(v, (list, tuple)):
+        out.append((b'l' if isinstance(v, list) else b't') +
+                   struct.pack('<I', len(v)))
+        for x in v:
+            _encode(out, x)
+    elif isinstance(v, dict):
+        _encodeDict(out, b'm', v)
+    elif isinstance(v, Struct):
+        _encodeDict(out, b'S', v.__dict__)
+    elif isinstance(v, RandomState):
+        state = v.state
+        if isinstance(state, tuple) and state and callable(state[0]):
+            out.append(b'r' + struct.pack('<B', 1))
+            _encode(out, state[1:])
+        else:
+            out.append(b'r' + struct.pack('<B', 0))
+            _encode(out, state)
+    else:
+        raise TypeError("cannot save %r" % (v,))
+
+
+def _encodeBytes(out, tag, data):
+    out.append(tag + struct.pack('<I', len(data)))
+    out.append(data)
+
+
+def _encodeDict(out, tag, d):
+    out.append(tag + struct.pack('<I', len(d)))
+    for k in d:
+        _encode(out, k)
+        _encode(out, d[k])
+
+
+def encodeValues(*values):
+    out = []
+    for v in values:
+        _encode(out, v)
+    return b''.join(out)
+
+
+class ValueDecoder:
+    def __init__(self, data, random=None):
+        self.data = data
+        self.pos = 0
+        self.random = random
+
+    def atEnd(self):
+        return self.pos == len(self.data)
+
+    def take(self, n):
+        pos = self.pos
+        if pos + n > len(self.data):
+            raise SaveFileError("truncated save file")
+        self.pos = pos + n
+        return self.data[pos:pos+n]
+
+    def unpack(self, fmt):
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))
+
+    def _randomSeed(self):
+        if self.random is None:
+            return None
+        return self.random.getstate()[0]
+
+    def decode(self):
+        tag = self.take(1)
+        if tag == b'N':
+            return None
+        if tag == b'T':
+            return True
+        if tag == b'F':
+            return False
+        if tag == b'B':
+            return self.unpack('<B')[0]
+        if tag == b'i':
+            return self.unpack('<i')[0]
+        if tag == b'q':
+            return self.unpack('<q')[0]
+        if tag == b'd':
+            return self.unpack('<d')[0]
+        if tag in (b'I', b's', b'b'):
+            data = self.take(self.unpack('<I')[0])
+            if tag == b'I':
+                return int(data.decode('ascii'))
+            if tag == b's':
+                return data.decode('utf-8')
+            return data
+        if tag in (b'l', b't'):
+            n = self.unpack('<I')[0]
+            v = [self.decode() for i in range(n)]
+            return v if tag == b'l' else tuple(v)
+        if tag in (b'm', b'S'):
+            n = self.unpack('<I')[0]
+            d = {}
+            for i in range(n):
+                k = self.decode()
+                d[k] = self.decode()
+            return d if tag == b'm' else Struct(**d)
+        if tag == b'r':
+            kind = self.unpack('<B')[0]
+            state = self.decode()
+            if kind == 0:
+                return state
+            if kind == 1 and isinstance(state, tuple):
+                return (self._randomSeed(),) + state
+        elif tag == b'R':
+            # version 1: the seed method in a state of a random
+            return self._randomSeed()
+        raise SaveFileError("invalid value in save file")
+
+
+# ************************************************************************
+# * moves
+# ************************************************************************
+
+# a plain value in the move history (see LarasGame.finishMove())
+_VALUE = 0xffff
+
+
+class MoveTable:
+    """The class and field names of the atomic moves written so far; a
+    move is written as its index in the table and its field values."""
+
+    def __init__(self):
+        self.entries = []
+        self._index = {}
+
+    def encodeGroup(self, out, group):
+        out.append(struct.pack('<I', len(group)))
+        for am in group:
+            if not isinstance(am, AtomicMove):
+                out.append(struct.pack('<H', _VALUE))
+                _encode(out, am)
+                continue
+            key = (am.__class__.__name__, tuple(sorted(am.__dict__)))
+            i = self._index.get(key)
+            if i is None:
+                i = self._index[key] = len(self.entries)
+                self.entries.append(key)
+            out.append(struct.pack('<H', i))
+            random_fields = getattr(am, 'RANDOM_STATE_FIELDS', ())
+            for name in key[1]:
+                v = am.__dict__[name]
+                if name in random_fields:
+                    v = RandomState(v)
+                _encode(out, v)
+
+
+def resolveMoveTable(entries):
+    classes = {}
+    todo = [AtomicMove]
+    while todo:
+        for cls in todo.pop().__subclasses__():
+            classes[cls.__name__] = cls
+            todo.append(cls)
+    try:
+        return [(classes[name], fields) for name, fields in entries]
+    except (KeyError, TypeError, ValueError):
+        raise SaveFileError("unknown move in save file")
+
+
+def decodeMoveGroup(dec, table):
+    group = []
+    for j in range(dec.unpack('<I')[0]):
+        i = dec.unpack('<H')[0]
+        if i == _VALUE:
+            group.append(dec.decode())
+            continue
+        try:
+            cls, fields = table[i]
+        except IndexError:
+            raise SaveFileError("invalid move in save file")
+        am = cls.__new__(cls)
+        for name in fields:
+            am.__dict__[name] = dec.decode()
+        group.append(am)
+    return group
+
+
+def _encodeMoves(moves):
+    table = MoveTable()
+    body = [struct.pack('<I', len(moves.history))]
+    for group in moves.history + [moves.current]:
+        table.encodeGroup(body, group)
+    return (encodeValues(moves.index, moves.state, table.entries) +
+            b''.join(body))
+
+
+def _decodeMoves(dec):
+    index, state, entries = dec.decode(), dec.decode(), dec.decode()
+    table = resolveMoveTable(entries)
+    groups = [decodeMoveGroup(dec, table)
+              for i in range(dec.unpack('<I')[0] + 1)]
+    return Struct(history=groups[:-1], current=groups[-1],
+                  index=index, state=state)
+
+
+# ************************************************************************
+# * save file
+# ************************************************************************
+
+class SaveFileWriter:
+    def __init__(self):
+        self._sections = []
+        self._hook = []
+
+    def addData(self, tag, data):
+        self._sections.append(tag + struct.pack('<I', len(data)))
+        self._sections.append(data)
+
+    def addValues(self, tag, *values):
+        self.addData(tag, encodeValues(*values))
+
+    def addStacks(self, tag, stacks):
+        data = [struct.pack('<H', len(stacks))]
+        for stack in stacks:
+            n = len(stack.cards)
+            data.append(struct.pack('<H%dH' % n, n, *[
+                c.id << 1 | bool(c.face_up) for c in stack.cards]))
+        self.addData(tag, b''.join(data))
+
+    def addMoves(self, tag, moves):
+        self.addData(tag, _encodeMoves(moves))
+
+    # for Game._saveGameHook()
+    def dump(self, obj):
+        self._hook.append(obj)
+
+    def getvalue(self):
+        if self._hook is not None:
+            self.addValues(b'HOOK', *self._hook)
+            self._hook = None
+        return b''.join([MAGIC, struct.pack('<H', FORMAT_VERSION)] +
+                        self._sections)
+
+
+class SaveFileReader:
+    """Read a binary save file; load() returns the saved values in the
+    order of the old pickled format, see Game._undumpGame()."""
+
+    def __init__(self, data):
+        if not data.startswith(MAGIC):
+            raise SaveFileError("not a save file")
+        dec = ValueDecoder(data)
+        dec.take(len(MAGIC))
+        if dec.unpack('<H')[0] > FORMAT_VERSION:
+            raise SaveFileError("saved by a newer version")
+        self.sections = {}
+        while not dec.atEnd():
+            tag = dec.take(4)
+            self.sections[tag] = dec.take(dec.unpack('<I')[0])
+        # the random of the loaded game; set it before loading the moves
+        self.random = None
+        self._values = self._iterValues()
+
+    def load(self):
+        try:
+            return next(self._values)
+        except StopIteration:
+            raise EOFError
+
+    def _decoder(self, tag):
+        try:
+            return ValueDecoder(self.sections[tag], self.random)
+        except KeyError:
+            raise SaveFileError("missing section %r" % tag)
+
+    def _iterValues(self):
+        dec = self._decoder(b'HEAD')
+        head = [dec.decode() for i in range(10)]
+        bookmark = head[3]
+        for v in head[:8]:
+            yield v
+        dec = self._decoder(b'CARD')
+        nstacks = dec.unpack('<H')[0]
+        yield nstacks
+        for i in range(nstacks):
+            n = dec.unpack('<H')[0]
+            yield n
+            for c in dec.unpack('<%dH' % n):
+                yield c >> 1
+                yield c & 1
+        for v in head[8:]:
+            yield v
+        if 0 <= bookmark <= 1:
+            dec = self._decoder(b'SAVE')
+            yield Struct(**dec.decode())
+            yield Struct(**dec.decode())
+        yield _decodeMoves(self._decoder(b'MOVE'))
+        yield self.sections.get(b'SNAP', b'')
+        if 0 <= bookmark <= 1:
+            dec = self._decoder(b'STAT')
+            yield Struct(**dec.decode())
+            yield Struct(**dec.decode())
+        dec = self._decoder(b'HOOK')
+        while not dec.atEnd():
+            yield dec.decode()
+        yield "EOF"
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# The position hashes (see Game.getSnapshot()) seen in a game, kept in
+# a hash set.  Only the newest max_size hashes are remembered, and the
+# store is saved as a packed array of 64-bit integers.
+
+import struct
+from collections import OrderedDict
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+class SnapshotStore:
+    MAX_SIZE = 1000
+
+    def __init__(self, snapshots=(), max_size=None):
+        if max_size is None:
+            max_size = self.MAX_SIZE
+        self.max_size = max_size
+        self._snapshots = OrderedDict()
+        for sn in snapshots:
+            self.add(sn)
+
+    def __contains__(self, sn):
+        return (sn & _MASK64) in self._snapshots
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def __iter__(self):
+        return iter(self._snapshots)
+
+    def add(self, sn):
+        """Remember sn; return False if it was already known."""
+        sn &= _MASK64
+        if sn in self._snapshots:
+            return False
+        self._snapshots[sn] = None
+        if self.max_size and len(self._snapshots) > self.max_size:
+            # forget the oldest
+            self._snapshots.popitem(last=False)
+        return True
+
+    def clear(self):
+        self._snapshots.clear()
+
+    def dumps(self):
+        return struct.pack('<%dQ' % len(self._snapshots), *self._snapshots)
+
+    @classmethod
+    def loads(cls, data, max_size=None):
+        if len(data) % 8:
+            raise ValueError("invalid snapshot data")
+        return cls(struct.unpack('<%dQ' % (len(data) // 8), data), max_size)
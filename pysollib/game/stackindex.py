@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# The closest stack to a point, for Game.getClosestStack(), which is
+# called on every mouse motion while dragging.  The stacks (stack.x,
+# stack.y) are put in the cells of a uniform grid, and the cells are
+# searched in rings around the point, so only the stacks near the
+# point are looked at.  The result is the same as the one of a search
+# of all the stacks: the closest one, and of two at the same distance
+# the first one.
+
+import math
+
+
+class StackGrid:
+    def __init__(self, stacks):
+        self.stacks = stacks
+        self.cells = {}
+        self.size = 1
+        self.x0 = self.y0 = 0
+        self.ncols = self.nrows = 0
+        if not stacks:
+            return
+        xs = [s.x for s in stacks]
+        ys = [s.y for s in stacks]
+        self.x0, self.y0 = min(xs), min(ys)
+        w = max(1, max(xs) - self.x0)
+        h = max(1, max(ys) - self.y0)
+        # about one stack per cell
+        n = len(stacks)
+        self.size = max(1, math.sqrt(w * h / float(n)), max(w, h) / float(n))
+        for i, s in enumerate(stacks):
+            cell = self._cell(s.x, s.y)
+            self.cells.setdefault(cell, []).append((i, s))
+            self.ncols = max(self.ncols, cell[0] + 1)
+            self.nrows = max(self.nrows, cell[1] + 1)
+
+    def _cell(self, x, y):
+        return (int((x - self.x0) // self.size),
+                int((y - self.y0) // self.size))
+
+    def _ring(self, ci, cj, r):
+        # the cells of the grid at distance r (in cells) from (ci, cj)
+        i0, i1 = max(0, ci - r), min(self.ncols - 1, ci + r)
+        j0, j1 = max(0, cj - r), min(self.nrows - 1, cj + r)
+        for j in (cj - r, cj + r):
+            if j0 <= j <= j1:
+                for i in range(i0, i1 + 1):
+                    yield (i, j)
+            if r == 0:
+                return
+        for i in (ci - r, ci + r):
+            if i0 <= i <= i1:
+                for j in range(max(j0, cj - r + 1), min(j1, cj + r - 1) + 1):
+                    yield (i, j)
+
+    def closest(self, cx, cy, accept=None):
+        """Return the closest stack to (cx, cy), or None.
+
+        If accept is given, only the stacks for which
+        accept(stack, dist) is true count; dist is the square
+        of the distance.
+        """
+        if not self.cells:
+            return None
+        ci, cj = self._cell(cx, cy)
+        # the rings closer than this do not reach the grid
+        r = max(0, -ci, ci - self.ncols + 1, -cj, cj - self.nrows + 1)
+        rmax = max(ci, self.ncols - 1 - ci, cj, self.nrows - 1 - cj)
+        best = None
+        while r <= rmax:
+            for cell in self._ring(ci, cj, r):
+                for i, s in self.cells.get(cell, ()):
+                    dist = (s.x - cx)**2 + (s.y - cy)**2
+                    if best is not None and (dist, i) >= best[:2]:
+                        continue
+                    if accept is None or accept(s, dist):
+                        best = (dist, i, s)
+            # the stacks in the next rings are at least r cells away
+            if best is not None and best[0] < (r * self.size)**2:
+                break
+            r += 1
+        if best is None:
+            return None
+        return best[2]
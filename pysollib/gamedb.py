@@ -23,6 +23,9 @@
 
 
 import imp
+import importlib
+import json
+import os
 
 import pysollib.settings
 from pysollib.mfxutil import Struct, print_err
@@ -612,15 +615,16 @@ class GameInfo(Struct):
         en_name = name                  # for app.getGameRulesFilename
         if pysollib.settings.TRANSLATE_GAME_NAMES:
             name = _(name)
+        en_short_name = None            # for the game index
         if not short_name:
             short_name = name
         else:
-            short_name = to_unicode(short_name)
+            short_name = en_short_name = to_unicode(short_name)
             if pysollib.settings.TRANSLATE_GAME_NAMES:
                 short_name = _(short_name)
         if isinstance(altnames, six.string_types):
             altnames = (altnames,)
-        altnames = [to_unicode(n) for n in altnames]
+        altnames = en_altnames = [to_unicode(n) for n in altnames]
         if pysollib.settings.TRANSLATE_GAME_NAMES:
             altnames = [_(n) for n in altnames]
         #
@@ -673,12 +677,36 @@ class GameInfo(Struct):
         Struct.__init__(self, id=id, gameclass=gameclass,
                         name=name, short_name=short_name,
                         altnames=tuple(altnames), en_name=en_name,
+                        en_short_name=en_short_name,
+                        en_altnames=tuple(en_altnames),
                         decks=decks, redeals=redeals, ncards=ncards,
                         category=category, skill_level=skill_level,
                         suits=tuple(suits), ranks=tuple(ranks),
                         trumps=tuple(trumps),
                         si=gi_si, rules_filename=rules_filename)
 
+    # the class of a game from the game index is only loaded when it
+    # is asked for
+    @property
+    def gameclass(self):
+        gameclass = self.__dict__['gameclass']
+        if gameclass is None:
+            gameclass = GAME_DB.loadGameClass(self.id)
+        return gameclass
+
+    def getIndexEntry(self):
+        # the arguments that create this GameInfo again (see
+        # GameManager.registerIndex())
+        si = self.si
+        return dict(id=self.id, name=self.en_name,
+                    game_type=si.game_type | si.game_flags,
+                    decks=self.decks, redeals=self.redeals,
+                    skill_level=self.skill_level, si=dict(si.__dict__),
+                    category=self.category, short_name=self.en_short_name,
+                    altnames=list(self.en_altnames), suits=list(self.suits),
+                    ranks=list(self.ranks), trumps=list(self.trumps),
+                    rules_filename=self.rules_filename, ncards=self.ncards)
+
 
 class GameManager:
     def __init__(self):
@@ -692,8 +720,12 @@ class GameManager:
         self.__all_games = {}           # includes hidden games
         self.__all_gamenames = {}       # includes hidden games
         self.__games_for_solver = []
+        # the modules that register the games of the game index
+        # (key: gameid)
+        self.__modules = {}
         self.check_game = True
         self.current_filename = None
+        self.current_module = None
         self.registered_game_types = {}
         self.callback = None            # update progress-bar (see main.py)
         self._num_games = 0             # for callback only
@@ -724,7 +756,8 @@ class GameManager:
                                      str(gameclass)))
         if 1:
             for id, game in self.__all_games.items():
-                if gi.gameclass is game.gameclass:
+                # (without loading the games from the index)
+                if gi.gameclass is game.__dict__['gameclass']:
                     raise GameInfoException(
                         "duplicate game class %s: %s and %s" %
                         (gi.id, str(gi.gameclass), str(game.gameclass)))
@@ -733,10 +766,16 @@ class GameManager:
                 raise GameInfoException("duplicate game altname %s: %s" %
                                         (gi.id, n))
 
-    def register(self, gi):
+    def register(self, gi, solver=None):
         # print gi.id, gi.short_name.encode('utf-8')
         if not isinstance(gi, GameInfo):
             raise GameInfoException("wrong GameInfo class")
+        index_gi = self.__all_games.get(gi.id)
+        if index_gi is not None and \
+                index_gi.__dict__['gameclass'] is None:
+            # the module of a game from the index is loaded
+            index_gi.__dict__['gameclass'] = gi.gameclass
+            return index_gi
         if self.check_game and pysollib.settings.CHECK_GAMES:
             self._check_game(gi)
         # if 0 and gi.si.game_flags & GI.GT_XORIGINAL:
@@ -764,15 +803,59 @@ class GameManager:
 #                      if gi.id in k: break
 #                  else:
 #                      print gi.id
-            if hasattr(gi.gameclass, 'Solver_Class') and \
-               gi.gameclass.Solver_Class is not None:
+            if solver is None:
+                solver = getattr(gi.gameclass, 'Solver_Class',
+                                 None) is not None
+            if solver:
                 self.__games_for_solver.append(gi.id)
         if self.current_filename is not None:
             gi.gameclass.MODULE_FILENAME = self.current_filename
+        if self.current_module is not None:
+            self.__modules[gi.id] = self.current_module
 
         if self.callback and self._num_games % 10 == 0:
             self.callback()
         self._num_games += 1
+        return gi
+
+    #
+    # the game index: the GameInfo of the games of some modules, so
+    # that the modules need not be imported at startup (see loadGames())
+    #
+
+    def getIndex(self, packages):
+        index = []
+        for gi in self.__all_games.values():
+            module = self.__modules.get(gi.id)
+            if module and module.rpartition('.')[0] in packages:
+                index.append((module, gi.id in self.__games_for_solver,
+                              gi.getIndexEntry()))
+        return index
+
+    def registerIndex(self, index):
+        check_game, self.check_game = self.check_game, False
+        try:
+            for module, solver, entry in index:
+                entry = dict(entry)
+                ncards = entry.pop('ncards')
+                gi = GameInfo(gameclass=None, **entry)
+                gi.ncards = ncards
+                self.current_module = module
+                self.register(gi, solver=solver)
+        finally:
+            self.current_module = None
+            self.check_game = check_game
+
+    def loadGameClass(self, gameid):
+        module = self.__modules.get(gameid)
+        if module is not None:
+            # registers the games of the module again (see register())
+            importlib.import_module(module)
+        gameclass = self.__all_games[gameid].__dict__['gameclass']
+        if gameclass is None:
+            raise GameInfoException("game %s not found in %s" %
+                                    (gameid, module))
+        return gameclass
 
     #
     # access games database - we do not expose hidden games
@@ -840,8 +923,7 @@ GAME_DB = GameManager()
 
 
 def registerGame(gameinfo):
-    GAME_DB.register(gameinfo)
-    return gameinfo
+    return GAME_DB.register(gameinfo)
 
 
 def hideGame(game):
@@ -856,3 +938,70 @@ def loadGame(modname, filename, check_game=False):
     imp.load_source(modname, filename)
     # execfile(filename, globals(), globals())
     GAME_DB.current_filename = None
+
+
+# the packages with the games of PySol (see GAME_MODULES in them)
+GAME_PACKAGES = ('pysollib.games', 'pysollib.games.ultra',
+                 'pysollib.games.mahjongg', 'pysollib.games.special')
+
+# the format of the game index file (see loadGames())
+GAME_INDEX_VERSION = 1
+
+
+def _getGameIndexKey(packages):
+    # the index is out of date when a module of the packages changed
+    key = [GAME_INDEX_VERSION, pysollib.settings.VERSION, sorted(packages)]
+    topdir = os.path.dirname(os.path.dirname(pysollib.settings.__file__))
+    for package in sorted(packages):
+        dirname = os.path.join(topdir, *package.split('.'))
+        try:
+            names = sorted(os.listdir(dirname))
+        except EnvironmentError:
+            continue
+        for name in names:
+            if name.endswith('.py'):
+                st = os.stat(os.path.join(dirname, name))
+                key.append([name, st.st_size, int(st.st_mtime)])
+    return key
+
+
+def loadGames(packages, index_filename=None):
+    """Register the games of the packages (names, see GAME_PACKAGES).
+
+    With index_filename, the games are registered from the game index
+    in that file, and the module of a game is only imported when its
+    class is needed.  The index is written when it is missing or out
+    of date.
+    """
+    key = None
+    if index_filename:
+        key = _getGameIndexKey(packages)
+        try:
+            with open(index_filename) as f:
+                index = json.load(f)
+        except (EnvironmentError, ValueError):
+            index = None
+        if index and index.get('key') == key:
+            GAME_DB.registerIndex(index['games'])
+            return
+    try:
+        for package in packages:
+            for name in importlib.import_module(package).GAME_MODULES:
+                GAME_DB.current_module = package + '.' + name
+                importlib.import_module(GAME_DB.current_module)
+    finally:
+        GAME_DB.current_module = None
+    if index_filename:
+        index = {'key': key, 'games': GAME_DB.getIndex(packages)}
+        try:
+            with open(index_filename, 'w') as f:
+                json.dump(index, f)
+        except (EnvironmentError, TypeError, ValueError) as ex:
+            print_err("cannot write the game index %s: %s" %
+                      (index_filename, ex))
+
+
+def loadAllGames(index_filename=None):
+    """Register all the games of PySol; importing pysollib.games does
+    not do it (see loadGames())."""
+    loadGames(GAME_PACKAGES, index_filename)
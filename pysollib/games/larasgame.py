@@ -360,6 +360,8 @@ class LarasGame(Game):
         moves.history.append(moves.current)
         moves.index = moves.index + 1
         assert moves.index == len(moves.history)
+        if self.journal:
+            self.journal.addMove(moves.current)
         moves.current = []
         self.updateText()
         self.updateStatus(moves=(moves.index, self.stats.total_moves))
@@ -384,7 +386,10 @@ class LarasGame(Game):
         self.active_row = m[len(m) - 1]
         self.stats.undo_moves = self.stats.undo_moves + 1
         self.stats.total_moves = self.stats.total_moves + 1
-        self.hints.list = None
+        if self.journal:
+            self.journal.addUndo()
+        # active_row changed too
+        self.invalidateHints()
         self.updateText()
         self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
         self.updateMenus()
@@ -405,7 +410,10 @@ class LarasGame(Game):
         self.moves.state = self.S_PLAY
         self.stats.redo_moves = self.stats.redo_moves + 1
         self.stats.total_moves = self.stats.total_moves + 1
-        self.hints.list = None
+        if self.journal:
+            self.journal.addRedo()
+        # active_row changed too
+        self.invalidateHints()
         self.updateText()
         self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
         self.updateMenus()
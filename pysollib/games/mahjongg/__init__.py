@@ -20,7 +20,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 # ---------------------------------------------------------------------------##
-from . import mahjongg1  # noqa: F401
-from . import mahjongg2  # noqa: F401
-from . import mahjongg3  # noqa: F401
-from . import shisensho  # noqa: F401
+
+# the modules with the games of this package, see loadGames() in
+# pysollib.gamedb
+GAME_MODULES = (
+    'mahjongg1',
+    'mahjongg2',
+    'mahjongg3',
+    'shisensho',
+)
@@ -108,6 +108,9 @@ class Mahjongg_Foundation(OpenStack):
     def _position(self, card):
         # AbstractFoundationStack._position(self, card)
         OpenStack._position(self, card)
+        if not self.is_visible:
+            # the removed tiles are not shown
+            return
 
         fnds = self.game.s.foundations
 
@@ -553,6 +556,9 @@ class AbstractMahjonggGame(Game):
                         # FIXME
                         x = self.width - l.XS
                         y = self.height - l.YS
+                    else:
+                        x = -l.XS
+                        y = l.YM+dyy
                 stack = Mahjongg_Foundation(x, y, self)
                 if show_removed:
                     stack.CARD_XOFFSET = dx
@@ -915,6 +921,11 @@ a solvable configuration.'''),
         # Mahjongg special: highlight all moveable tiles
         return ((self.s.rows, 1),)
 
+    def getOcclusionStacks(self):
+        # the tiles of the upper levels cover the ones below them; the
+        # rows are in the order of their levels (see createGame())
+        return self.s.rows
+
     def _highlightCards(self, info, sleep=1.5, delta=(1, 1, 1, 1)):
         if not Image:
             delta = (-self._delta_x, 0, 0, -self._delta_y)
@@ -984,6 +995,12 @@ a solvable configuration.'''),
         return Game._createCard(self, id, deck, suit, rank, x, y)
 
     def _getClosestStack(self, cx, cy, stacks, dragstack):
+        grid = self.regions.getIndex(stacks)
+        if grid is not None:
+            # Mahjongg special: if the stack is very close, do
+            # not consider blocked stacks
+            return grid.closest(cx, cy, lambda stack, dist: (
+                dist > self.check_dist or not stack.basicIsBlocked()))
         closest, cdist = None, 999999999
         # Since we only compare distances,
         # we don't bother to take the square root.
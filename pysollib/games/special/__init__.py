@@ -20,14 +20,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 # ---------------------------------------------------------------------------##
-from . import cribbage  # noqa: F401
-from . import hanoi  # noqa: F401
-from . import lightsout  # noqa: F401
-from . import memory  # noqa: F401
-from . import pegged  # noqa: F401
-from . import poker  # noqa: F401
-from . import tarock  # noqa: F401
 
-
-def no_use():
-    pass
+# the modules with the games of this package, see loadGames() in
+# pysollib.gamedb
+GAME_MODULES = (
+    'cribbage',
+    'hanoi',
+    'lightsout',
+    'memory',
+    'pegged',
+    'poker',
+    'tarock',
+)
@@ -25,6 +25,7 @@ from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
 from pysollib.hint import CautiousDefaultHint
 from pysollib.layout import Layout
+from pysollib.move import hashCards
 from pysollib.stack import \
         BasicRowStack, \
         DealRowTalonStack, \
@@ -60,7 +61,9 @@ class StHelena_Talon(TalonStack):
         if num_cards == 0:          # game already finished
             return 0
         # redeal
+        h = hashCards(self)
         self.cards.reverse()
+        self.game.position_hash ^= h ^ hashCards(self)
         self.game.nextRoundMove(self)
         self.game.startDealSample()
         for i in range(lr):
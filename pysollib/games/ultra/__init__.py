@@ -20,11 +20,16 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 # ---------------------------------------------------------------------------##
-from . import dashavatara  # noqa: F401
-from . import hanafuda  # noqa: F401
-from . import hanafuda1  # noqa: F401
-from . import hexadeck  # noqa: F401
-from . import larasgame  # noqa: F401
-from . import matrix  # noqa: F401
-from . import mughal  # noqa: F401
-from . import tarock  # noqa: F401
+
+# the modules with the games of this package, see loadGames() in
+# pysollib.gamedb
+GAME_MODULES = (
+    'dashavatara',
+    'hanafuda',
+    'hanafuda1',
+    'hexadeck',
+    'larasgame',
+    'matrix',
+    'mughal',
+    'tarock',
+)
@@ -24,11 +24,12 @@
 
 import os
 import re
+import signal
 import subprocess
+import tempfile
 import time
-from io import BytesIO
 
-from pysollib.mfxutil import destruct
+from pysollib.mfxutil import Struct, destruct
 from pysollib.pysolrandom import construct_random
 from pysollib.settings import DEBUG, FCS_COMMAND
 from pysollib.util import KING
@@ -73,6 +74,15 @@ class HintInterface:
     def getHints(self, taken_hint=None):
         return []
 
+    # Return True if there is at least one hint. Used for the stuck
+    # check, subclasses may return as soon as they found one.
+    def hasHints(self):
+        return bool(self.getHints(None))
+
+
+class _HintFound(Exception):
+    pass
+
 
 # ************************************************************************
 # * AbstractHint provides a useful framework for derived hint classes.
@@ -89,6 +99,8 @@ class AbstractHint(HintInterface):
             self.score_flatten_value = 10000
         # temporaries within getHints()
         self.bonus_color = None
+        # set by hasHints(): addHint() ends the computation
+        self.first_only = False
         #
         self.__clones = []
         self.reset()
@@ -139,6 +151,8 @@ class AbstractHint(HintInterface):
                 to_stack, text_color=None, forced_move=None):
         if score < 0:
             return
+        if self.first_only:
+            raise _HintFound()
         self.max_score = max(self.max_score, score)
         # add an atomic hint
         if self.score_flatten_value > 0:
@@ -196,6 +210,17 @@ class AbstractHint(HintInterface):
                 self.addHint(self.SCORE_DEAL, 0, game.s.talon, None)
         return self._returnHints()
 
+    def hasHints(self):
+        self.first_only = True
+        try:
+            self.getHints(None)
+        except _HintFound:
+            return True
+        finally:
+            self.first_only = False
+            self.reset()
+        return False
+
     # subclass
     def computeHints(self):
         pass
@@ -277,6 +302,52 @@ class AbstractHint(HintInterface):
     BLUE = "blue"
 
 
+# ************************************************************************
+# * HintCache keeps the results of DefaultHint.step010() between two
+# * hint computations, so that after a move only the candidate moves
+# * involving the changed stacks are computed again.
+# *
+# * Game.invalidateHints() reports the stacks changed by each atomic
+# * move. A move from row to row keeps everything that does not involve
+# * these two rows; any other move (or a row becoming empty or non-empty,
+# * which changes how many cards may be moved at once) clears the cache.
+# ************************************************************************
+
+class HintCache:
+    def __init__(self):
+        # ids of the stacks changed since the last computation, or None
+        self.touched = None
+        self.empty_rows = None
+        # r.id -> r.canDropCards(foundations)
+        self.drops = {}
+        # (r.id, t.id, ncards) -> (result, depends on all rows)
+        self.piles = {}
+
+    def touch(self, stack_ids):
+        if stack_ids is None:
+            self.touched = None
+        elif self.touched is not None:
+            self.touched.update(stack_ids)
+
+    def update(self, game):
+        # forget whatever the changes since the last call may affect
+        rows = game.s.rows
+        empty_rows = [not r.cards for r in rows]
+        touched = self.touched
+        if touched is None or empty_rows != self.empty_rows or \
+                not touched.issubset([r.id for r in rows]):
+            self.drops.clear()
+            self.piles.clear()
+        elif touched:
+            for r_id in touched:
+                self.drops.pop(r_id, None)
+            for key, value in list(self.piles.items()):
+                if value[1] or key[0] in touched or key[1] in touched:
+                    del self.piles[key]
+        self.touched = set()
+        self.empty_rows = empty_rows
+
+
 # ************************************************************************
 # *
 # ************************************************************************
@@ -298,6 +369,23 @@ class DefaultHint(AbstractHint):
     def _preferHighRankMoves(self):
         return 0
 
+    # Keep the results of step010() in a HintCache of the game. Turn
+    # this off if the stacks or scores of a move depend on other rows
+    # than the two stacks involved.
+    incremental = True
+    cache = None
+
+    def getCache(self):
+        if not self.incremental:
+            return None
+        caches = self.game.hints.caches
+        key = (self.__class__, self.level)
+        cache = caches.get(key)
+        if cache is None:
+            cache = caches[key] = HintCache()
+        cache.update(self.game)
+        return cache
+
     # Basic bonus for moving a card.
     # Bonus must be in range 0..999
 
@@ -365,6 +453,7 @@ class DefaultHint(AbstractHint):
         # check if the cards below our pile are a whole row
         if r.canMoveCards(rpile):
             # could we move the remaining pile ?
+            self.uses_rows = True
             for x in self.game.s.rows:
                 # note: we allow x == r here, because the pile
                 #       (currently at the top of r) will be
@@ -474,10 +563,18 @@ class DefaultHint(AbstractHint):
     # 1) check Tableau piles
 
     def step010(self, dropstacks, rows):
+        self.cache = self.getCache()
         # for each stack
         for r in dropstacks:
             # 1a) try if we can drop cards
-            t, ncards = r.canDropCards(self.game.s.foundations)
+            if self.cache is None:
+                t, ncards = r.canDropCards(self.game.s.foundations)
+            else:
+                drop = self.cache.drops.get(r.id)
+                if drop is None:
+                    drop = r.canDropCards(self.game.s.foundations)
+                    self.cache.drops[r.id] = drop
+                t, ncards = drop
             if t:
                 score, color = 0, None
                 score, color = self._getDropCardScore(
@@ -504,32 +601,51 @@ class DefaultHint(AbstractHint):
         r_is_waste = r in self.game.sg.talonstacks
 
         for t in rows:
-            score, color = 0, None
-            if not self.shallMovePile(r, t, pile, rpile):
-                continue
-            if r_is_waste:
-                # moving a card from the WasteStack
-                score, color = self._getMoveWasteScore(
-                    score, color, r, t, pile, rpile)
+            if self.cache is None:
+                res = self.step010_scorePile(r, t, pile, rpile, r_is_waste)
             else:
-                if not t.cards:
-                    # the target stack is empty
-                    if lp == lr:
-                        # do not move a whole stack from row to row
-                        continue
-                    if empty_row_seen:
-                        # only make one hint for moving to an empty stack
-                        # (in case we have multiple empty stacks)
-                        continue
-                    score = 60000
-                    empty_row_seen = 1
+                key = (r.id, t.id, lp)
+                if key in self.cache.piles:
+                    res = self.cache.piles[key][0]
                 else:
-                    # the target stack is not empty
-                    score = 80000
-                score, color = self._getMovePileScore(
-                    score, color, r, t, pile, rpile)
+                    self.uses_rows = False
+                    res = self.step010_scorePile(
+                        r, t, pile, rpile, r_is_waste)
+                    self.cache.piles[key] = (res, self.uses_rows)
+            if res is None:
+                continue
+            to_empty_row, score, color = res
+            if to_empty_row:
+                if empty_row_seen:
+                    # only make one hint for moving to an empty stack
+                    # (in case we have multiple empty stacks)
+                    continue
+                empty_row_seen = 1
             self.addHint(score, lp, r, t, color)
 
+    # score of moving pile from r to t: None or (to_empty_row, score, color)
+    def step010_scorePile(self, r, t, pile, rpile, r_is_waste):
+        score, color = 0, None
+        if not self.shallMovePile(r, t, pile, rpile):
+            return None
+        if r_is_waste:
+            # moving a card from the WasteStack
+            score, color = self._getMoveWasteScore(
+                score, color, r, t, pile, rpile)
+            return False, score, color
+        if not t.cards:
+            # the target stack is empty
+            if not rpile:
+                # do not move a whole stack from row to row
+                return None
+            score = 60000
+        else:
+            # the target stack is not empty
+            score = 80000
+        score, color = self._getMovePileScore(
+            score, color, r, t, pile, rpile)
+        return not t.cards, score, color
+
     # 2) try if we can move part of a pile within the RowStacks
     #    so that we can drop a card afterwards
     #    score: 40000 .. 59999
@@ -739,6 +855,13 @@ class Base_Solver_Hint:
             }
         self.hints = []
         self.hints_index = 0
+        self.solver_state = 'unknown'
+        self.iters = 0
+        # set by cancel(), which may be called from another thread
+        self._cancelled = False
+        self._process = None
+        # set by readGame()
+        self.board_string = None
 
         # correct cards rank if foundations.base_rank != 0 (Penguin, Opus)
         if 'base_rank' in game_type:    # (Simple Simon)
@@ -747,6 +870,8 @@ class Base_Solver_Hint:
             self.base_rank = game.s.foundations[0].cap.base_rank
 
     def _setText(self, **kw):
+        if kw.get('iter'):
+            self.iters = kw['iter']
         return self.dialog.setText(**kw)
 
     def config(self, **kw):
@@ -809,22 +934,217 @@ class Base_Solver_Hint:
             self._v = None
             return False
 
+    def cancel(self):
+        """Stop a running computeHints() as soon as possible.
+
+        Safe to call from any thread; computeHints() then returns with
+        solver_state 'cancelled' and no hints.
+        """
+        self._cancelled = True
+        if self._process:
+            self._process.kill()
+
+    def isCancelled(self):
+        return self._cancelled
+
+    def _checkCancelled(self):
+        if self._cancelled:
+            self.solver_state = 'cancelled'
+            self.hints = [None]
+        return self._cancelled
+
+    def _runLibSolver(self, lib_obj, start):
+        # run the library solver iters_step iterations at a time, so that
+        # progress is reported and cancel() is honoured between the steps
+        max_iters = self.options['max_iters']
+        step = max(1, self.options['iters_step'])
+        limit = min(step, max_iters)
+        lib_obj.limit_iterations(limit)
+        ret = start()
+        while (lib_obj.ret_code_is_suspend(ret) and limit < max_iters and
+               not self._cancelled):
+            self._setText(
+                iter=lib_obj.get_num_times(),
+                states=lib_obj.get_num_states_in_collection(),
+            )
+            limit = min(limit + step, max_iters)
+            lib_obj.limit_iterations(limit)
+            ret = lib_obj.resume_solution()
+        return ret
+
+    def readGame(self):
+        # read all that computeHints() needs from the game; call this in
+        # the main thread before running computeHints() in another one
+        game = self.game
+        s = game.s
+        self.stacks = Struct(rows=tuple(s.rows), reserves=tuple(s.reserves),
+                             foundations=tuple(s.foundations), talon=s.talon)
+        self.decks = game.gameinfo.decks
+        self.cache = game.app.solver_cache
+        self.board_string = self.calcBoardString()
+        self.cache_key = None
+        if self.cache is not None:
+            self.cache_key = self.cache.makeKey(
+                self.board_string, **self.getCacheArgs())
+
+    def computeHints(self):
+        if self.board_string is None:
+            self.readGame()
+        board = self.board_string
+        if DEBUG:
+            print('--------------------\n', board, '--------------------')
+        if self._checkCancelled():
+            return
+        key = self.cache_key
+        if key is not None:
+            result = self.cache.get(key)
+            if result is not None and self._loadResult(result):
+                return
+        self._computeHints(board)
+        if key is not None and not self._cancelled:
+            self.cache.put(key, self._saveResult())
+
+    def _computeHints(self, board):
+        # run the solver on board; subclasses override this
+        self.hints = [None]
+
+    def getCacheArgs(self):
+        # everything besides the board that the solver result depends on
+        return dict(solver=self.__class__.__name__,
+                    max_iters=self.options['max_iters'])
+
+    def _saveResult(self):
+        s = self.stacks
+        groups = (('rows', s.rows), ('reserves', s.reserves),
+                  ('foundations', s.foundations), ('talon', (s.talon,)))
+
+        def encode(stack):
+            if stack is None:
+                return None
+            for name, stacks in groups:
+                for i, st in enumerate(stacks):
+                    if st is stack:
+                        return [name, i]
+            raise ValueError(stack)
+        moves = [[h[0], encode(h[1]), encode(h[2])]
+                 for h in self.hints if h is not None]
+        return {'state': self.solver_state, 'iters': self.iters,
+                'moves': moves}
+
+    def _loadResult(self, result):
+        # rebuild the hints of a cached result; False if it does not
+        # fit this game
+        s = self.stacks
+
+        def decode(ref):
+            if ref is None:
+                return None
+            name, i = ref
+            if name == 'talon':
+                return s.talon
+            return getattr(s, name)[i]
+        try:
+            hints = [[ncards, decode(src), decode(dest)]
+                     for ncards, src, dest in result['moves']]
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return False
+        self.hints = hints + [None]
+        self.solver_state = result['state']
+        self._setText(iter=result.get('iters', 0), depth=0, states=0)
+        return True
+
     def run_solver(self, command, board):
         if DEBUG:
             print(command)
+        self._process = SolverProcess(command, board)
+        if self._cancelled:
+            self._process.kill()
+        return self._process.stdout, self._process.stderr
+
+
+# ************************************************************************
+# * SolverProcess - an external solver whose output is read as it comes
+# ************************************************************************
+
+class _SolverOutput:
+    # line iterator over the solver's stdout; reports "command not found"
+    # once the output is exhausted
+    def __init__(self, proc):
+        self.proc = proc
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.proc.popen.stdout.readline()
+        if not line:
+            self.proc.wait()
+            raise StopIteration
+        return line
+
+    next = __next__
+
+    def read(self):
+        data = self.proc.popen.stdout.read()
+        self.proc.wait()
+        return data
+
+    def close(self):
+        self.proc.close()
+
+
+class SolverProcess:
+    def __init__(self, command, board):
+        # stderr is not read while the solver runs, so it goes to a file
+        # rather than a pipe that could fill up and block the solver
+        self.stderr = tempfile.TemporaryFile()
         kw = {'shell': True,
               'stdin': subprocess.PIPE,
               'stdout': subprocess.PIPE,
-              'stderr': subprocess.PIPE}
+              'stderr': self.stderr}
         if os.name != 'nt':
             kw['close_fds'] = True
-        p = subprocess.Popen(command, **kw)
-        bytes_board = six.binary_type(board, 'utf-8')
-        pout, perr = p.communicate(bytes_board)
-        if p.returncode in (127, 1):
+            # own process group, so that kill() also stops the solver
+            # started by the shell
+            if six.PY2:
+                kw['preexec_fn'] = os.setsid
+            else:
+                kw['start_new_session'] = True
+        self.popen = subprocess.Popen(command, **kw)
+        self.killed = False
+        try:
+            self.popen.stdin.write(six.binary_type(board, 'utf-8'))
+            self.popen.stdin.close()
+        except (IOError, OSError):
+            # the solver exited without reading the board
+            pass
+        self.stdout = _SolverOutput(self)
+
+    def wait(self):
+        returncode = self.popen.wait()
+        if returncode in (127, 1) and not self.killed:
             # Linux and Windows return codes for "command not found" error
-            raise RuntimeError('Solver exited with {}'.format(p.returncode))
-        return BytesIO(pout), BytesIO(perr)
+            raise RuntimeError('Solver exited with {}'.format(returncode))
+        return returncode
+
+    def kill(self):
+        self.killed = True
+        if self.popen.poll() is not None:
+            return
+        try:
+            if os.name != 'nt':
+                os.killpg(self.popen.pid, signal.SIGKILL)
+            else:
+                self.popen.kill()
+        except OSError:
+            pass
+
+    def close(self):
+        if self.popen.poll() is None:
+            self.kill()
+        self.popen.wait()
+        self.popen.stdout.close()
+        self.stderr.close()
 
 
 use_fc_solve_lib = False
@@ -1006,8 +1326,22 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
 
         return self.board
 
-    def computeHints(self):
+    def getCacheArgs(self):
         game = self.game
+        preset = self.options['preset']
+        args = Base_Solver_Hint.getCacheArgs(self)
+        args.update(
+            preset=(preset if preset != 'none' else None),
+            decks=game.gameinfo.decks,
+            stacks=len(game.s.rows),
+            freecells=len(game.s.reserves),
+            )
+        for k in ('preset', 'sbb', 'sm', 'esf'):
+            args['game_' + k] = self.game_type.get(k)
+        return args
+
+    def _computeHints(self, board):
+        stacks = self.stacks
         game_type = self.game_type
         global FCS_VERSION
         if FCS_VERSION is None:
@@ -1025,9 +1359,6 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
 
         progress = self.options['progress']
 
-        board = self.calcBoardString()
-        if DEBUG:
-            print('--------------------\n', board, '--------------------')
         args = []
         if use_fc_solve_lib:
             args += ['--reset', '-opt', ]
@@ -1046,9 +1377,9 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
         if self.options['preset'] and self.options['preset'] != 'none':
             args += ['--load-config', self.options['preset']]
         args += ['--max-iters', str(self.options['max_iters']),
-                 '--decks-num', str(game.gameinfo.decks),
-                 '--stacks-num', str(len(game.s.rows)),
-                 '--freecells-num', str(len(game.s.reserves)),
+                 '--decks-num', str(self.decks),
+                 '--stacks-num', str(len(stacks.rows)),
+                 '--freecells-num', str(len(stacks.reserves)),
                  ]
         if 'preset' in game_type:
             args += ['--preset', game_type['preset']]
@@ -1061,15 +1392,17 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
 
         if use_fc_solve_lib:
             fc_solve_lib_obj.input_cmd_line(args)
-            status = fc_solve_lib_obj.solve_board(board)
+            status = self._runLibSolver(
+                fc_solve_lib_obj,
+                lambda: fc_solve_lib_obj.solve_board(board))
         else:
             command = FCS_COMMAND+' '+' '.join(args)
             pout, perr = self.run_solver(command, board)
         self.solver_state = 'unknown'
         stack_types = {
-            'the': game.s.foundations,
-            'stack': game.s.rows,
-            'freecell': game.s.reserves,
+            'the': stacks.foundations,
+            'stack': stacks.rows,
+            'freecell': stacks.reserves,
             }
         if DEBUG:
             start_time = time.time()
@@ -1113,13 +1446,15 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
                     hints.append([
                         (ord(m.s[3]) if type_ == 0
                          else (13 if type_ == 11 else 1)),
-                        (game.s.rows if (type_ in [0, 1, 4, 11, ])
-                         else game.s.reserves)[src],
-                        (game.s.rows[dest] if (type_ in [0, 2])
-                         else (game.s.reserves[dest]
+                        (stacks.rows if (type_ in [0, 1, 4, 11, ])
+                         else stacks.reserves)[src],
+                        (stacks.rows[dest] if (type_ in [0, 2])
+                         else (stacks.reserves[dest]
                                if (type_ in [1, 3]) else None))])
 
                     m = fc_solve_lib_obj.get_next_move()
+            elif fc_solve_lib_obj.ret_code_is_suspend(status):
+                self.solver_state = 'intractable'
             else:
                 self.solver_state = 'unsolved'
         else:
@@ -1197,6 +1532,7 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
         if not use_fc_solve_lib:
             pout.close()
             perr.close()
+        self._checkCancelled()
 
 
 class BlackHoleSolver_Hint(Base_Solver_Hint):
@@ -1226,13 +1562,16 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
 
         return board
 
-    def computeHints(self):
-        game = self.game
+    def getCacheArgs(self):
+        args = Base_Solver_Hint.getCacheArgs(self)
+        for k in ('preset', 'queens_on_kings', 'wrap_ranks'):
+            args['game_' + k] = self.game_type.get(k)
+        return args
+
+    def _computeHints(self, board):
+        stacks = self.stacks
         game_type = self.game_type
 
-        board = self.calcBoardString()
-        if DEBUG:
-            print('--------------------\n', board, '--------------------')
         if use_bh_solve_lib:
             # global bh_solve_lib_obj
             # bh_solve_lib_obj = bh_solve_lib_obj.new_bhs_user_handle()
@@ -1247,7 +1586,6 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
                     game_type['wrap_ranks']
                     if ('wrap_ranks' in game_type) else True),
             )
-            bh_solve_lib_obj.limit_iterations(self.options['max_iters'])
         else:
             args = []
             args += ['--game', game_type['preset'], '--rank-reach-prune']
@@ -1265,7 +1603,8 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
         result = ''
 
         if use_bh_solve_lib:
-            ret_code = bh_solve_lib_obj.resume_solution()
+            ret_code = self._runLibSolver(
+                bh_solve_lib_obj, bh_solve_lib_obj.resume_solution)
         else:
             pout, perr = self.run_solver(command, board)
 
@@ -1294,12 +1633,12 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
                 m = bh_solve_lib_obj.get_next_move()
                 while m:
                     found_stack_idx = m.get_column_idx()
-                    if len(game.s.rows) > found_stack_idx >= 0:
-                        src = game.s.rows[found_stack_idx]
+                    if len(stacks.rows) > found_stack_idx >= 0:
+                        src = stacks.rows[found_stack_idx]
 
                         hints.append([1, src, None])
                     else:
-                        hints.append([1, game.s.talon, None])
+                        hints.append([1, stacks.talon, None])
                     m = bh_solve_lib_obj.get_next_move()
         else:
             self.solver_state = result.lower()
@@ -1309,7 +1648,7 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
                     print(s)
 
                 if s.strip() == 'Deal talon':
-                    hints.append([1, game.s.talon, None])
+                    hints.append([1, stacks.talon, None])
                     continue
 
                 m = re.match(
@@ -1330,7 +1669,7 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
                     continue
 
                 found_stack_idx = int(m.group(1))
-                src = game.s.rows[found_stack_idx]
+                src = stacks.rows[found_stack_idx]
 
                 hints.append([1, src, None])
             pout.close()
@@ -1341,6 +1680,7 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
 
         hints.append(None)
         self.hints = hints
+        self._checkCancelled()
 
 
 class FreeCellSolverWrapper:
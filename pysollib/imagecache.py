@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# Scaled cardset images.  With auto_scale the card images are resized
+# with PIL every time the size of the window changes, and again on the
+# next run at the same size.  The scaled images are written as PNG files
+# under the config directory, one subdirectory per cardset and card
+# size (a "group"), and read back instead of being resized again.  The
+# size on disk is bounded; the least recently used groups are removed
+# first.
+
+import hashlib
+import os
+import shutil
+import threading
+
+from pysollib.mfxutil import Image, print_err
+
+
+class ScaledImageCache:
+    VERSION = 1
+
+    def __init__(self, dirname=None, max_size=32*1024*1024):
+        self.dirname = dirname
+        self.max_size = max_size        # in bytes, 0 to disable
+
+    @staticmethod
+    def makeKey(*args):
+        """Return the key of a group, made from args (the cardset, the
+        size of the cards, the resampling filter...)."""
+        s = ['v%d' % ScaledImageCache.VERSION] + [repr(a) for a in args]
+        return hashlib.sha1('\0'.join(s).encode('utf-8')).hexdigest()
+
+    def _filename(self, group, name, size):
+        return os.path.join(self.dirname, group,
+                            '%s-%dx%d.png' % (name, size[0], size[1]))
+
+    def get(self, group, name, size):
+        """Return the PIL image name scaled to size, or None."""
+        if not self.dirname or not self.max_size or not Image:
+            return None
+        fn = self._filename(group, name, size)
+        if not os.path.exists(fn):
+            return None
+        try:
+            im = Image.open(fn)
+            im.load()
+        except Exception:
+            return None
+        if im.size != tuple(size):
+            return None
+        return im
+
+    def put(self, group, name, size, image):
+        """Store image, name scaled to size."""
+        if not self.dirname or not self.max_size or not Image:
+            return
+        fn = self._filename(group, name, size)
+        tmp = '%s.%d.%d.tmp' % (
+            fn, os.getpid(), threading.current_thread().ident)
+        try:
+            d = os.path.dirname(fn)
+            if not os.path.isdir(d):
+                os.makedirs(d)
+            image.save(tmp, 'PNG')
+            os.replace(tmp, fn)
+        except Exception as ex:
+            print_err('cannot write scaled image cache: %s' % ex)
+            try:
+                os.remove(tmp)
+            except EnvironmentError:
+                pass
+
+    def clear(self):
+        for group, mtime, size in self._listGroups():
+            shutil.rmtree(os.path.join(self.dirname, group),
+                          ignore_errors=True)
+
+    def _listGroups(self):
+        # (group, mtime, size in bytes)
+        if not self.dirname:
+            return []
+        try:
+            names = os.listdir(self.dirname)
+        except EnvironmentError:
+            return []
+        groups = []
+        for group in names:
+            d = os.path.join(self.dirname, group)
+            try:
+                size = 0
+                for n in os.listdir(d):
+                    size += os.path.getsize(os.path.join(d, n))
+                groups.append((group, os.path.getmtime(d), size))
+            except EnvironmentError:
+                pass
+        return groups
+
+    def evict(self, group=None):
+        """Mark group as the most recently used one and remove the least
+        recently used groups until the cache fits in max_size."""
+        if not self.dirname:
+            return
+        if group is not None:
+            d = os.path.join(self.dirname, group)
+            try:
+                os.utime(d, None)
+            except EnvironmentError:
+                pass
+        groups = self._listGroups()
+        total = sum([size for g, mtime, size in groups])
+        groups.sort(key=lambda g: g[1])
+        for g, mtime, size in groups:
+            if total <= self.max_size:
+                break
+            if g == group and self.max_size:
+                continue
+            shutil.rmtree(os.path.join(self.dirname, g), ignore_errors=True)
+            total -= size
@@ -23,11 +23,13 @@
 
 
 import os
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 from pysollib.mfxutil import Image, ImageTk, USE_PIL, print_err
 from pysollib.pysoltk import copyImage, createBottom, createImage,\
         createImagePIL, loadImage
-from pysollib.pysoltk import shadowImage
+from pysollib.pysoltk import decodeImage, shadowImage
 from pysollib.resource import CSI
 from pysollib.settings import TOOLKIT
 
@@ -47,6 +49,11 @@ class ImagesCardback:
 
 
 class Images:
+    # the number of threads that decode the images of a cardset
+    DECODE_THREADS = 4
+    # the number of drag shadows kept (see getShadowPIL)
+    MAX_PIL_SHADOWS = 64
+
     def __init__(self, dataloader, cs, r=1):
         self.d = dataloader
         self.cs = cs
@@ -54,10 +61,12 @@ class Images:
         self._xfactor = 1.0
         self._yfactor = 1.0
         self._resampling = 0
+        self._pool = None               # see __decode()
         if cs is None:
             return
         self._setSize()
-        self._card = []
+        self._card = []                 # None for a face not loaded yet
+        self._decoding = {}             # key: filename, see __decode()
         self._back = []
         # bottom of stack (link to _bottom_negative/_bottom_positive)
         self._bottom = []
@@ -70,15 +79,37 @@ class Images:
         # vertical shadow of card (used when we drag a card)
         self._shadow = []
         self._xshadow = []              # horizontal shadow of card
-        self._pil_shadow = {}           # key: (width, height)
+        self._pil_shadow = OrderedDict()    # key: see getShadowPIL
         self._highlight = []            # highlight of card (tip)
         self._highlight_index = 0       #
         self._highlighted_images = {}   # key: (suit, rank)
 
         self.cardset_bottoms = False
+        self.scaled_cache = None        # a ScaledImageCache
+        self._scaled_group = None       # see _scaleImage()
+        self._draft = False             # see resize()
 
     def destruct(self):
-        pass
+        self._stopDecoding()
+
+    def __decode(self, filenames):
+        # decode the image files of the cardset in threads (the Tk images
+        # are created in __loadCard(), on the main thread)
+        self._stopDecoding()
+        self._pool = ThreadPool(self.DECODE_THREADS)
+        for filename in filenames:
+            f = os.path.join(self.cs.dir, filename)
+            if os.path.exists(f):
+                self._decoding[f] = self._pool.apply_async(
+                    decodeImage, (f,))
+        self._pool.close()
+
+    def _stopDecoding(self):
+        # drop the images decoded but not loaded yet
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+            self._decoding = {}
 
     def __loadCard(self, filename, check_w=1, check_h=1):
         # print '__loadCard:', filename
@@ -87,7 +118,14 @@ class Images:
             print_err('card image path %s does not exist' % f)
             return None
         try:
-            img = loadImage(file=f)
+            decoding = self._decoding.pop(f, None)
+            pil_image = None
+            if decoding is not None:
+                pil_image = decoding.get()
+            if pil_image is not None:
+                img = loadImage(pil_image=pil_image)
+            else:
+                img = loadImage(file=f)
         except Exception:
             return None
 
@@ -105,7 +143,8 @@ class Images:
                 raise ValueError("Invalid size %dx%d of image %s" % (w, h, f))
         return img
 
-    def __loadBottom(self, filename, check_w=1, check_h=1, color='white'):
+    def __useCardsetBottoms(self):
+        # load the bottoms and letters from the cardset or create them
         cs_type = CSI.TYPE_ID[self.cs.type]
         imagedir = None
         d = os.path.join('images', 'cards', 'bottoms')
@@ -113,21 +152,76 @@ class Images:
             imagedir = self.d.findDir(cs_type, d)
         except Exception:
             pass
-        if ((not USE_PIL and TOOLKIT != 'kivy') or self.cardset_bottoms
-                or imagedir is None):
+        return ((not USE_PIL and TOOLKIT != 'kivy') or self.cardset_bottoms
+                or imagedir is None)
+
+    def __loadBottom(self, filename, check_w=1, check_h=1, color='white'):
+        if self.__useCardsetBottoms():
             # load image
             img = self.__loadCard(filename+self.cs.ext, check_w, check_h)
             return img
 
         # create image
+        cs_type = CSI.TYPE_ID[self.cs.type]
         d = os.path.join('images', 'cards', 'bottoms', cs_type)
         try:
             fn = self.d.findImage(filename, d)
         except Exception:
             fn = None
-        img = createBottom(self._card[0], color, fn)
+        img = createBottom(self._getCard(0), color, fn)
         return img
 
+    def _loadFace(self, index):
+        n = self.cs.getFaceCardNames()[index]
+        im = self.__loadCard(n + self.cs.ext)
+        if (self._xfactor, self._yfactor) != (1, 1):
+            # see resize()
+            im = self._scaleImage(im, n)
+        im.filename = n
+        return im
+
+    def _scaleImage(self, im, name):
+        # im.resize() to the current factors, through the scaled_cache
+        xf, yf, resample = self._xfactor, self._yfactor, self._resampling
+        orig = getattr(im, '_pil_image_orig', None)
+        if (self.scaled_cache is None or orig is None or not name
+                or self._draft):
+            return im.resize(xf, yf, resample=resample)
+        if self._scaled_group is None:
+            config_txt = os.path.join(self.cs.dir, 'config.txt')
+            try:
+                stamp = os.path.getmtime(config_txt)
+            except EnvironmentError:
+                stamp = None
+            self._scaled_group = self.scaled_cache.makeKey(
+                self.cs.ident, self.cs.dir, stamp, self.cardset_bottoms,
+                self.getSize(), resample)
+        w, h = orig.size
+        size = (int(w*xf), int(h*yf))
+        pil_image = self.scaled_cache.get(self._scaled_group, name, size)
+        if pil_image is not None:
+            return loadImage(pil_image=pil_image, pil_image_orig=orig)
+        im = im.resize(xf, yf, resample=resample)
+        self.scaled_cache.put(self._scaled_group, name, size, im._pil_image)
+        return im
+
+    def _getCard(self, index):
+        im = self._card[index]
+        if im is None:
+            try:
+                im = self._loadFace(index)
+            except Exception as ex:
+                # the cardset was checked with the first face only
+                print_err('cardset %s: %s' % (self.cs.dir, ex))
+                cw, ch = self.getSize()
+                im = self.createMissingImage(cw, ch, fill="#a0a0a0",
+                                             outline="#000000")
+            self._card[index] = im
+            if None not in self._card:
+                # all the faces are loaded
+                self._stopDecoding()
+        return im
+
     def __addBack(self, im1, name):
         r = max(self.CARDW / 40.0, self.CARDH / 60.0)
         r = max(2, int(round(r)))
@@ -183,12 +277,24 @@ class Images:
                     self.cs.nbottoms + self.cs.nletters
             pstep += self.cs.nshadows + 1  # shadows & shade
             pstep = max(0, (80.0 - progress.percent) / pstep)
-        # load face cards
-        for n in self.cs.getFaceCardNames():
-            self._card.append(self.__loadCard(n + self.cs.ext))
-            self._card[-1].filename = n
-            if progress:
-                progress.update(step=pstep)
+        names = self.cs.getFaceCardNames()
+        if USE_PIL:
+            files = [n + self.cs.ext for n in names]
+            files += [name for name in self.cs.backnames if name]
+            if self.__useCardsetBottoms():
+                for i in range(self.cs.nbottoms):
+                    files.append("bottom%02d%s" % (i + 1, self.cs.ext))
+                    files.append("bottom%02d-n%s" % (i + 1, self.cs.ext))
+                for rank in range(self.cs.nletters):
+                    files.append("l%02d%s" % (rank + 1, self.cs.ext))
+                    files.append("l%02d-n%s" % (rank + 1, self.cs.ext))
+            self.__decode(files)
+        # load face cards: the first one now, for the size of the cards,
+        # and the others when they are needed (see getFace())
+        self._card = [None] * len(names)
+        self._card[0] = self._loadFace(0)
+        if progress:
+            progress.update(step=pstep * len(names))
         assert len(self._card) == self.cs.ncards
         # load backgrounds
         for name in self.cs.backnames:
@@ -249,7 +355,7 @@ class Images:
         # shade
         if USE_PIL:
             self._highlight.append(
-                self._getHighlight(self._card[0], None, '#3896f8'))
+                self._getHighlight(self._getCard(0), None, '#3896f8'))
         else:
             self._highlight.append(self.__loadCard("shade." + ext))
         if progress:
@@ -265,7 +371,7 @@ class Images:
     def getFace(self, deck, suit, rank):
         index = suit * len(self.cs.ranks) + rank
         # print "getFace:", suit, rank, index
-        return self._card[index % self.cs.ncards]
+        return self._getCard(index % self.cs.ncards)
 
     def getBack(self, update=False):
         if update:
@@ -324,25 +430,46 @@ class Images:
         x1 += cw
         y1 += ch
         w, h = x1-x0, y1-y0
-        if (w, h) in self._pil_shadow:
-            return self._pil_shadow[(w, h)]
-        # create mask
-        mask = Image.new('RGBA', (w, h))
+        pieces = []
         for c in cards:
             x, y = stack.getPositionFor(c)
-            x, y = x-x0, y-y0
-            im = c._active_image._pil_image
-            mask.paste(im, (x, y), im)
-        # create shadow
-        sh_color = (0x00, 0x00, 0x00, 0x50)
+            pieces.append((c, x-x0, y-y0))
+        # the shadow of a pile depends on where its cards are and on
+        # their images
+        key = (w, h, tuple([(c.id, c.face_up, x, y) for c, x, y in pieces]))
+        shadow = self._pil_shadow.pop(key, None)
+        if shadow is None:
+            shadow = self.composeShadowPIL(
+                [(c._active_image._pil_image, x, y) for c, x, y in pieces],
+                w, h, self.SHADOW_XOFFSET, self.SHADOW_YOFFSET)
+            shadow = ImageTk.PhotoImage(shadow)
+        self._pil_shadow[key] = shadow
+        while len(self._pil_shadow) > self.MAX_PIL_SHADOWS:
+            self._pil_shadow.popitem(last=False)
+        return shadow
+
+    @staticmethod
+    def composeShadowPIL(pieces, w, h, sx, sy):
+        """Return the shadow (w x h, RGBA) of the images of pieces, a
+        list of (image, x, y), for a shift of (sx, sy).
+
+        Only the alpha channels are composed, in 8-bit images.
+        """
+        # the outline of the pile
+        alphas = {}
+        mask = Image.new('L', (w, h))
+        for im, x, y in pieces:
+            a = alphas.get(id(im))
+            if a is None:
+                rgba = im if im.mode == 'RGBA' else im.convert('RGBA')
+                a = alphas[id(im)] = rgba.split()[3]
+            mask.paste(a, (x, y), a)
+        # the outline less the outline shifted by (sx, sy)
+        alpha = Image.new('L', (w, h))
+        alpha.paste(0x50, (0, 0, w, h), mask)
+        alpha.paste(0, (0, 0, w-sx, h-sy), mask.crop((sx, sy, w, h)))
         shadow = Image.new('RGBA', (w, h))
-        shadow.paste(sh_color, (0, 0, w, h), mask)
-        sx, sy = self.SHADOW_XOFFSET, self.SHADOW_YOFFSET
-        mask = mask.crop((sx, sy, w, h))
-        tmp = Image.new('RGBA', (w-sx, h-sy))
-        shadow.paste(tmp, (0, 0), mask)
-        shadow = ImageTk.PhotoImage(shadow)
-        self._pil_shadow[(w, h)] = shadow
+        shadow.putalpha(alpha)
         return shadow
 
     def getShade(self):
@@ -431,8 +558,10 @@ class Images:
         return (int(self.CARD_DX * self._xfactor),
                 int(self.CARD_DY * self._yfactor))
 
-    def resize(self, xf, yf, resample=1):
+    def resize(self, xf, yf, resample=1, draft=False):
         # print 'Images.resize:', xf, yf, self._card[0].width(), self.CARDW
+        # (a draft is a passing size, not kept in the scaled_cache)
+        self._draft = draft
         if (self._xfactor == xf and self._yfactor == yf
                 and self._resampling == resample):
             # print 'no resize'
@@ -440,43 +569,49 @@ class Images:
         self._xfactor = xf
         self._yfactor = yf
         self._resampling = resample
+        self._scaled_group = None
         # ???self._setSize(xf, yf)
         self.setOffsets()
-        # cards
+        # cards (the others are resized when they are loaded)
         cards = []
         for c in self._card:
-            c = c.resize(xf, yf, resample=resample)
+            if c is not None:
+                filename = getattr(c, 'filename', None)
+                c = self._scaleImage(c, filename)
+                c.filename = filename
             cards.append(c)
         self._card = cards
         # back
         for b in self._back:
-            b.image = b.image.resize(xf, yf, resample=resample)
+            b.image = self._scaleImage(b.image, b.name)
 
         # stack bottom image
         neg = self._bottom is self._bottom_negative  # dont know
 
         bottom_negative = []
         bottom_positive = []
-        for c in self._bottom_negative:
-            c = c.resize(xf, yf, resample=resample)
+        for i, c in enumerate(self._bottom_negative):
+            c = self._scaleImage(c, 'bottom-n-%d' % i)
             bottom_negative.append(c)
         self._bottom_negative = bottom_negative
-        for c in self._bottom_positive:
-            c = c.resize(xf, yf, resample=resample)
+        for i, c in enumerate(self._bottom_positive):
+            c = self._scaleImage(c, 'bottom-%d' % i)
             bottom_positive.append(c)
         self._bottom_positive = bottom_positive
 
         # letters
         letter_negative = []
         letter_positive = []
-        for c in self._letter_negative:
-            c = c.resize(xf, yf, resample=resample)
+        for i, c in enumerate(self._letter_negative):
+            c = self._scaleImage(c, 'letter-n-%d' % i)
             letter_negative.append(c)
         self._letter_negative = letter_negative
-        for c in self._letter_positive:
-            c = c.resize(xf, yf, resample=resample)
+        for i, c in enumerate(self._letter_positive):
+            c = self._scaleImage(c, 'letter-%d' % i)
             letter_positive.append(c)
         self._letter_positive = letter_positive
+        if self.scaled_cache is not None and self._scaled_group is not None:
+            self.scaled_cache.evict(self._scaled_group)
 
         self._createMissingImages()
         self.setNegative(neg)
@@ -484,8 +619,8 @@ class Images:
         self._highlighted_images = {}
         self._highlight = []
         self._highlight.append(
-            self._getHighlight(self._card[0], None, '#3896f8'))
-        self._pil_shadow = {}
+            self._getHighlight(self._getCard(0), None, '#3896f8'))
+        self._pil_shadow.clear()
 
     def reset(self):
         print('Image.reset')
@@ -503,7 +638,9 @@ class SubsampledImages(Images):
             r = max(images.CARDW, images.CARDH) // size_cap
 
         Images.__init__(self, None, images.cs, r=r)
-        self._card = self._subsample(images._card, r)
+        # the faces are subsampled when they are needed, see _loadFace()
+        self._images = images
+        self._card = [None] * len(images._card)
         self._bottom_positive = self._subsample(images._bottom_positive, r)
         self._letter_positive = self._subsample(images._letter_positive, r)
         self._bottom_negative = self._subsample(images._bottom_negative, r)
@@ -528,6 +665,16 @@ class SubsampledImages(Images):
     def getShadow(self, ncards):
         return None
 
+    def _loadFace(self, index):
+        images = self._images
+        im = images._getCard(index)
+        if (images._xfactor, images._yfactor) != (1, 1):
+            # the face as it was loaded
+            im = im.resize(1, 1)
+        if self.reduced == 1:
+            return im
+        return im.subsample(self.reduced)
+
     def _subsample(self, images_list, r):
         s = []
         for im in images_list:
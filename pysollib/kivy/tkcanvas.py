@@ -24,6 +24,7 @@
 
 from __future__ import division
 
+import contextlib
 import logging
 
 from kivy.clock import Clock
@@ -851,6 +852,11 @@ class MfxCanvas(Widget):
         # y = self.yy
         pass
 
+    @contextlib.contextmanager
+    def batch(self):
+        # the commands are not batched (see the Tk canvas)
+        yield
+
     def update_idletasks(self):
         print('MfxCanvas: update_idletasks')
         self.wmain.update_idletasks()
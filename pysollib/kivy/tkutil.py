@@ -205,6 +205,11 @@ def after_cancel(t):
 # ************************************************************************
 
 
+def decodeImage(file):
+    # the images are not decoded in advance, see Images.load()
+    return None
+
+
 def makeImage(file=None, data=None, dither=None, alpha=None):
     kw = {}
     if data is None:
@@ -28,10 +28,10 @@ import sys
 import traceback
 
 from pysollib.app import Application
-from pysollib.gamedb import GAME_DB
+from pysollib.gamedb import GAME_DB, GAME_PACKAGES, loadGames
 from pysollib.mfxutil import print_err
 from pysollib.mygettext import _
-from pysollib.pysolaudio import AbstractAudioClient
+from pysollib.pysolaudio import AbstractAudioClient, AudioClientProxy
 from pysollib.pysolaudio import KivyAudioClient, OSSAudioClient
 from pysollib.pysolaudio import PyGameAudioClient, Win32AudioClient
 from pysollib.pysolaudio import PysolSoundServerModuleClient
@@ -39,6 +39,7 @@ from pysollib.pysolaudio import pysolsoundserver
 from pysollib.pysoltk import MfxMessageDialog
 from pysollib.pysoltk import MfxRoot
 from pysollib.pysoltk import PysolProgressBar
+from pysollib.pysoltk import after, after_idle
 from pysollib.pysoltk import loadImage
 from pysollib.resource import Tile
 from pysollib.settings import SOUND_MOD, TITLE, TOOLKIT
@@ -90,6 +91,7 @@ def parse_option(argv):
                                        "french-only",
                                        "noplugins",
                                        "nosound",
+                                       "profile-startup=",
                                        "sound-mod=",
                                        "help"])
     except getopt.GetoptError as err:
@@ -103,6 +105,7 @@ def parse_option(argv):
             "french-only": False,
             "noplugins": False,
             "nosound": False,
+            "profile-startup": None,
             "sound-mod": None,
             }
     for i in optlist:
@@ -120,6 +123,8 @@ def parse_option(argv):
             opts["noplugins"] = True
         elif i[0] == "--nosound":
             opts["nosound"] = True
+        elif i[0] == "--profile-startup":
+            opts["profile-startup"] = i[1]
         elif i[0] == "--sound-mod":
             assert i[1] in ('pss', 'pygame', 'oss', 'win')
             opts["sound-mod"] = i[1]
@@ -132,6 +137,9 @@ def parse_option(argv):
         --sound-mod=MOD
         --nosound              disable sound support
         --noplugins            disable load plugins
+        --profile-startup=FILE write the times and the change of the
+                               live memory blocks of the startup phases
+                               to FILE as JSON (- for stdout)
   -h    --help                 display this help and exit
 
   FILE - file name of a saved game
@@ -165,6 +173,9 @@ def pysol_init(app, args):
         return 1
         sys.exit(1)
     opts, filename = opts
+    if opts['profile-startup']:
+        app.startup_profiler.start(opts['profile-startup'])
+    profiler = app.startup_profiler
     if filename:
         app.commandline.loadgame = filename
     app.commandline.deal = opts['deal']
@@ -205,20 +216,22 @@ def pysol_init(app, args):
     app.top_cursor = top.cget("cursor")
 
     # load options
-    try:
-        app.loadOptions()
-    except Exception:
-        traceback.print_exc()
-        pass
+    with profiler.phase('options'):
+        try:
+            app.loadOptions()
+        except Exception:
+            traceback.print_exc()
+            pass
 
     # init toolkit 2)
     init_root_window(top, app)
 
     # prepare the progress bar
-    app.loadImages1()
-    if not app.progress_images:
-        app.progress_images = (loadImage(app.gimages.logos[0]),
-                               loadImage(app.gimages.logos[1]))
+    with profiler.phase('images1'):
+        app.loadImages1()
+        if not app.progress_images:
+            app.progress_images = (loadImage(app.gimages.logos[0]),
+                                   loadImage(app.gimages.logos[1]))
     app.wm_withdraw()
 
     # create the progress bar
@@ -234,68 +247,73 @@ def pysol_init(app, args):
     def progressCallback(*args):
         app.intro.progress.update(step=1)
     GAME_DB.setCallback(progressCallback)
-    import pysollib.games
-    if not opts['french-only']:
-        import pysollib.games.ultra
-        import pysollib.games.mahjongg
-        import pysollib.games.special
-        pysollib.games.special.no_use()
+    packages = GAME_PACKAGES
+    if opts['french-only']:
+        packages = ('pysollib.games',)
+    with profiler.phase('games'):
+        loadGames(packages, os.path.join(app.dn.config, 'games.json'))
 
     # try to load plugins
     if not opts["noplugins"]:
-        for dir in (os.path.join(app.dataloader.dir, "games"),
-                    os.path.join(app.dataloader.dir, "plugins"),
-                    app.dn.plugins):
-            try:
-                app.loadPlugins(dir)
-            except Exception:
-                pass
+        with profiler.phase('plugins'):
+            for dir in (os.path.join(app.dataloader.dir, "games"),
+                        os.path.join(app.dataloader.dir, "plugins"),
+                        app.dn.plugins):
+                try:
+                    app.loadPlugins(dir)
+                except Exception:
+                    pass
     GAME_DB.setCallback(None)
 
+    # the AudioClientProxy hands its client over on this thread
+    def pollAudio():
+        if app.audio.poll():
+            return
+        if TOOLKIT == 'kivy':
+            # kivy has no timers, but runs idle calls a second later
+            after_idle(top, pollAudio)
+        else:
+            after(top, 100, pollAudio)
+
     # init audio 1)
-    app.audio = None
-    sounds = {'pss':     PysolSoundServerModuleClient,
-              'pygame':  PyGameAudioClient,
-              'oss':     OSSAudioClient,
-              'win':     Win32AudioClient}
-    if TOOLKIT == 'kivy':
-        sounds['kivy'] = KivyAudioClient
-    if opts["nosound"] or SOUND_MOD == 'none':
-        app.audio = AbstractAudioClient()
-    elif opts['sound-mod']:
-        c = sounds[opts['sound-mod']]
-        app.audio = c()
-    elif SOUND_MOD == 'auto':
-        snd = []
-        snd.append(PyGameAudioClient)
+    with profiler.phase('audio'):
+        app.audio = None
+        sounds = {'pss':     PysolSoundServerModuleClient,
+                  'pygame':  PyGameAudioClient,
+                  'oss':     OSSAudioClient,
+                  'win':     Win32AudioClient}
         if TOOLKIT == 'kivy':
-            snd.append(KivyAudioClient)
-        if pysolsoundserver:
-            snd.append(PysolSoundServerModuleClient)
-        snd.append(OSSAudioClient)
-        snd.append(Win32AudioClient)
-        snd.append(AbstractAudioClient)
-        for c in snd:
-            try:
-                app.audio = c()
-                app.audio.startServer()
-                app.audio.connectServer(app)
-            except Exception:
-                pass
-            else:
-                # success
-                break
-    else:
-        c = sounds[SOUND_MOD]
-        app.audio = c()
-        app.audio.startServer()
-        app.audio.connectServer(app)
-
-    # update sound_mode
-    if isinstance(app.audio, PysolSoundServerModuleClient):
-        app.opt.sound_mode = 1
-    else:
-        app.opt.sound_mode = 0
+            sounds['kivy'] = KivyAudioClient
+        if opts["nosound"] or SOUND_MOD == 'none':
+            app.audio = AbstractAudioClient()
+        elif opts['sound-mod']:
+            c = sounds[opts['sound-mod']]
+            app.audio = c()
+        elif SOUND_MOD == 'auto':
+            snd = []
+            snd.append(PyGameAudioClient)
+            if TOOLKIT == 'kivy':
+                snd.append(KivyAudioClient)
+            if pysolsoundserver:
+                snd.append(PysolSoundServerModuleClient)
+            snd.append(OSSAudioClient)
+            snd.append(Win32AudioClient)
+            # the first one that works is found in the background
+            app.audio = AudioClientProxy(snd)
+            app.audio.connectServer(app)
+            pollAudio()
+        else:
+            c = sounds[SOUND_MOD]
+            app.audio = c()
+            app.audio.startServer()
+            app.audio.connectServer(app)
+
+    # update sound_mode (AudioClientProxy does this when it is ready)
+    if not isinstance(app.audio, AudioClientProxy):
+        if isinstance(app.audio, PysolSoundServerModuleClient):
+            app.opt.sound_mode = 1
+        else:
+            app.opt.sound_mode = 0
 
     # check games
     if len(app.gdb.getGamesIdSortedByName()) == 0:
@@ -314,7 +332,9 @@ Please check your %(app)s installation.
         return 1
 
     # init cardsets
-    app.initCardsets()
+    with profiler.phase('cardsets'):
+        app.resource_index.load()
+        app.initCardsets()
     cardset = None
     c = app.opt.cardset.get(0)
     if c:
@@ -347,7 +367,8 @@ Cardsets package is up to date.
     tile.name = "None"
     tile.filename = None
     manager.register(tile)
-    app.initTiles()
+    with profiler.phase('tiles'):
+        app.initTiles()
     if app.opt.tabletile_name:  # and top.winfo_screendepth() > 8:
         for tile in manager.getAll():
             if app.opt.tabletile_name == tile.basename:
@@ -355,8 +376,12 @@ Cardsets package is up to date.
                 break
 
     # init samples and music resources
-    app.initSamples()
-    app.initMusic()
+    with profiler.phase('samples'):
+        app.initSamples()
+        app.audio.preloadSamples(app.sample_manager.getAll())
+    with profiler.phase('music'):
+        app.initMusic()
+    app.resource_index.save()
 
     # init audio 2)
     if not app.audio.CAN_PLAY_SOUND:
@@ -380,9 +405,10 @@ Cardsets package is up to date.
             app.audio.playContinuousMusic(app.music_playlist)
 
     # prepare other images
-    app.loadImages2()
-    app.loadImages3()
-    app.loadImages4()
+    with profiler.phase('images2'):
+        app.loadImages2()
+        app.loadImages3()
+        app.loadImages4()
 
     # load cardset
     progress = app.intro.progress
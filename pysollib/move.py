@@ -30,6 +30,36 @@ if sys.version_info > (3,):
 # imports
 
 
+# ************************************************************************
+# * Zobrist hashing of the position (see Game.getSnapshot()).
+# * Each card (suit, rank and face) at each position of each stack has
+# * a fixed pseudo-random 64-bit key; the position hash is the xor of
+# * the keys of all cards, so a move only has to xor out the keys of
+# * the cards it takes away and xor in the keys of the cards it adds.
+# ************************************************************************
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def zobristKey(stack_id, pos, card):
+    x = ((((stack_id << 10) + pos) << 16) + (card.suit << 8) +
+         card.rank) * 2 + bool(card.face_up)
+    # splitmix64
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+# hash of the cards of a stack from position first upwards
+def hashCards(stack, first=0):
+    h = 0
+    cards = stack.cards
+    for i in range(max(first, 0), len(cards)):
+        h ^= zobristKey(stack.id, i, cards[i])
+    return h
+
+
 # ************************************************************************
 # * moves (undo / redo)
 # ************************************************************************
@@ -46,7 +76,8 @@ if sys.version_info > (3,):
 class AtomicMove:
 
     def do(self, game):
-        self.redo(game)
+        with game.canvas.batch():
+            self.redo(game)
 
     def __repr__(self):
         return str(self.__dict__)
@@ -63,6 +94,11 @@ class AtomicMove:
     def cmpForUndo(self, other):
         return -1
 
+    # The ids of the stacks changed by this move, or None if the move
+    # may change anything. See Game.invalidateHints().
+    def getStackIds(self):
+        return None
+
 
 # ************************************************************************
 # * Move the top N cards from a stack to another stack.
@@ -87,6 +123,7 @@ class AMoveMove(AtomicMove):
             # don't use animation for drag-move
             frames = 0
         cards = from_stack.cards[-ncards:]
+        h = hashCards(from_stack, len(from_stack.cards) - ncards)
         if frames != 0:
             from_stack.unshadeStack()
             x, y = to_stack.getPositionForNextCard()
@@ -94,6 +131,12 @@ class AMoveMove(AtomicMove):
                                 frames=frames, shadow=self.shadow)
         for i in range(ncards):
             from_stack.removeCard()
+        # xor in the keys of the moved cards before adding them, as
+        # addCard() may trigger further moves (see Stack.closeStack())
+        n = len(to_stack.cards)
+        for i in range(ncards):
+            h ^= zobristKey(to_stack.id, n + i, cards[i])
+        game.position_hash ^= h
         for c in cards:
             to_stack.addCard(c)
         from_stack.updatePositions()
@@ -107,6 +150,9 @@ class AMoveMove(AtomicMove):
         self._doMove(game, self.ncards, game.allstacks[self.to_stack_id],
                      game.allstacks[self.from_stack_id])
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return (cmp(self.ncards, other.ncards) or
                 cmp(self.from_stack_id, other.from_stack_id) or
@@ -136,10 +182,16 @@ class AFlipMove(AtomicMove):
             card.showFace()
 
     def redo(self, game):
-        self._doMove(game, game.allstacks[self.stack_id])
+        stack = game.allstacks[self.stack_id]
+        h = hashCards(stack, len(stack.cards) - 1)
+        self._doMove(game, stack)
+        game.position_hash ^= h ^ hashCards(stack, len(stack.cards) - 1)
 
     def undo(self, game):
-        self._doMove(game, game.allstacks[self.stack_id])
+        self.redo(game)
+
+    def getStackIds(self):
+        return (self.stack_id,)
 
     def cmpForRedo(self, other):
         return cmp(self.stack_id, other.stack_id)
@@ -172,6 +224,7 @@ class AFlipAndMoveMove(AtomicMove):
             moved = True
         else:
             moved = game.animatedFlipAndMove(from_stack, to_stack, self.frames)
+        h = hashCards(from_stack, len(from_stack.cards) - 1)
         c = from_stack.cards[-1]
         if c.face_up:
             c.showBack()
@@ -183,6 +236,8 @@ class AFlipAndMoveMove(AtomicMove):
             game.animatedMoveTo(from_stack, to_stack, cards, x, y,
                                 frames=self.frames, shadow=0)
         c = from_stack.removeCard(update=False)
+        h ^= zobristKey(to_stack.id, len(to_stack.cards), c)
+        game.position_hash ^= h
         to_stack.addCard(c, update=False)
         from_stack.updateText()
         to_stack.updateText()
@@ -195,6 +250,9 @@ class AFlipAndMoveMove(AtomicMove):
         self._doMove(game, game.allstacks[self.to_stack_id],
                      game.allstacks[self.from_stack_id])
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return (cmp(self.from_stack_id, other.from_stack_id) or
                 cmp(self.to_stack_id, other.to_stack_id))
@@ -210,21 +268,20 @@ class AFlipAllMove(AtomicMove):
 
     def redo(self, game):
         stack = game.allstacks[self.stack_id]
+        h = hashCards(stack)
         for card in stack.cards:
             if card.face_up:
                 card.showBack()
             else:
                 card.showFace()
+        game.position_hash ^= h ^ hashCards(stack)
         stack.refreshView()
 
     def undo(self, game):
-        stack = game.allstacks[self.stack_id]
-        for card in stack.cards:
-            if card.face_up:
-                card.showBack()
-            else:
-                card.showFace()
-        stack.refreshView()
+        self.redo(game)
+
+    def getStackIds(self):
+        return (self.stack_id,)
 
     def cmpForRedo(self, other):
         return cmp(self.stack_id, other.stack_id)
@@ -245,6 +302,7 @@ class ATurnStackMove(AtomicMove):
         to_stack = game.allstacks[self.to_stack_id]
         assert len(from_stack.cards) > 0
         assert len(to_stack.cards) == 0
+        h = hashCards(from_stack)
         mylen = len(from_stack.cards)
         for i in range(mylen):
             # unhide = (i >= mylen - 2)
@@ -256,6 +314,7 @@ class ATurnStackMove(AtomicMove):
             to_stack.addCard(card, unhide=unhide, update=0)
             card.showBack(unhide=unhide)
             # print 3, unhide, to_stack.getCard().__dict__
+        game.position_hash ^= h ^ hashCards(to_stack)
         from_stack.updateText()
         to_stack.updateText()
 
@@ -264,6 +323,7 @@ class ATurnStackMove(AtomicMove):
         to_stack = game.allstacks[self.from_stack_id]
         assert len(from_stack.cards) > 0
         assert len(to_stack.cards) == 0
+        h = hashCards(from_stack)
         mylen = len(from_stack.cards)
         for i in range(mylen):
             # unhide = (i >= mylen - 2)
@@ -272,9 +332,13 @@ class ATurnStackMove(AtomicMove):
             assert not card.face_up
             card.showFace(unhide=unhide)
             to_stack.addCard(card, unhide=unhide, update=0)
+        game.position_hash ^= h ^ hashCards(to_stack)
         from_stack.updateText()
         to_stack.updateText()
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return (cmp(self.from_stack_id, other.from_stack_id) or
                 cmp(self.to_stack_id, other.to_stack_id))
@@ -321,7 +385,9 @@ class NEW_ATurnStackMove(AtomicMove):
             assert to_stack.round < to_stack.max_rounds or \
                 to_stack.max_rounds < 0
             to_stack.round = to_stack.round + 1
+        h = hashCards(from_stack)
         self._doMove(from_stack, to_stack, 0)
+        game.position_hash ^= h ^ hashCards(to_stack)
 
     def undo(self, game):
         from_stack = game.allstacks[self.from_stack_id]
@@ -330,7 +396,12 @@ class NEW_ATurnStackMove(AtomicMove):
             assert to_stack is game.s.talon
             assert to_stack.round > 1
             to_stack.round = to_stack.round - 1
+        h = hashCards(to_stack)
         self._doMove(to_stack, from_stack, 1)
+        game.position_hash ^= h ^ hashCards(from_stack)
+
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
 
     def cmpForRedo(self, other):
         return (cmp(self.from_stack_id, other.from_stack_id) or
@@ -408,6 +479,9 @@ class ANextRoundMove(AtomicMove):
 # ************************************************************************
 
 class ASaveSeedMove(AtomicMove):
+    # saved as the state of game.random (see game/savefile.py)
+    RANDOM_STATE_FIELDS = ('state',)
+
     def __init__(self, game):
         self.state = game.random.getstate()
 
@@ -417,6 +491,9 @@ class ASaveSeedMove(AtomicMove):
     def undo(self, game):
         game.random.setstate(self.state)
 
+    def getStackIds(self):
+        return ()
+
     def cmpForRedo(self, other):
         return cmp(self.state, other.state)
 
@@ -447,6 +524,9 @@ class ASaveStateMove(AtomicMove):
 # ************************************************************************
 
 class AShuffleStackMove(AtomicMove):
+    # saved as the state of game.random (see game/savefile.py)
+    RANDOM_STATE_FIELDS = ('state',)
+
     def __init__(self, stack, game):
         self.stack_id = stack.id
         # save cards and state
@@ -459,12 +539,14 @@ class AShuffleStackMove(AtomicMove):
         assert stack is game.s.talon
         # shuffle (see random)
         game.random.setstate(self.state)
+        h = hashCards(stack)
         seq = stack.cards
         n = len(seq) - 1
         while n > 0:
             j = game.random.randint(0, n)
             seq[n], seq[j] = seq[j], seq[n]
             n = n - 1
+        game.position_hash ^= h ^ hashCards(stack)
         stack.refreshView()
 
     def undo(self, game):
@@ -475,11 +557,16 @@ class AShuffleStackMove(AtomicMove):
             c = game.cards[id]
             assert c.id == id
             cards.append(c)
+        h = hashCards(stack)
         stack.cards = cards
+        game.position_hash ^= h ^ hashCards(stack)
         # restore the state
         game.random.setstate(self.state)
         stack.refreshView()
 
+    def getStackIds(self):
+        return (self.stack_id,)
+
     def cmpForRedo(self, other):
         return (cmp(self.stack_id, other.stack_id) or
                 cmp(self.card_ids, other.card_ids) or
@@ -508,11 +595,15 @@ class ASingleCardMove(AtomicMove):
             assert to_stack.acceptsCards(
                 from_stack, [from_stack.cards[from_pos]])
         card = from_stack.cards[from_pos]
+        h = hashCards(from_stack, from_pos)
         card = from_stack.removeCard(card, update_positions=1)
+        h ^= hashCards(from_stack, from_pos)
         if self.frames != 0:
             x, y = to_stack.getPositionFor(card)
             game.animatedMoveTo(from_stack, to_stack, [card], x, y,
                                 frames=self.frames, shadow=self.shadow)
+        h ^= zobristKey(to_stack.id, len(to_stack.cards), card)
+        game.position_hash ^= h
         to_stack.addCard(card)
         # to_stack.refreshView()
 
@@ -520,14 +611,20 @@ class ASingleCardMove(AtomicMove):
         from_stack = game.allstacks[self.from_stack_id]
         to_stack = game.allstacks[self.to_stack_id]
         from_pos = self.from_pos
+        h = hashCards(from_stack, from_pos) ^ \
+            hashCards(to_stack, len(to_stack.cards) - 1)
         card = to_stack.removeCard()
         # if self.frames != 0:
         #  x, y = to_stack.getPositionFor(card)
         #  game.animatedMoveTo(from_stack, to_stack, [card], x, y,
         #                      frames=self.frames, shadow=self.shadow)
         from_stack.insertCard(card, from_pos)
+        game.position_hash ^= h ^ hashCards(from_stack, from_pos)
         # to_stack.refreshView()
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return cmp((self.from_stack_id, self.to_stack_id, self.from_pos),
                    (other.from_stack_id, other.to_stack_id, other.from_pos))
@@ -551,6 +648,9 @@ class AInnerMove(AtomicMove):
         # stack = game.allstacks[self.stack_id]
         pass
 
+    def getStackIds(self):
+        return (self.stack_id,)
+
     def cmpForRedo(self, other):
         return cmp((self.stack_id, self.from_pos, self.to_pos),
                    (other.stack_id, other.from_pos, other.to_pos))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+from pysollib.acard import AbstractCard
+from pysollib.null.tkcanvas import MfxCanvasImage
+
+
+# ************************************************************************
+# * Card - a card without any image; only the model state is kept
+# ************************************************************************
+
+class _NullCard(AbstractCard):
+    def __init__(self, id, deck, suit, rank, game, x=0, y=0):
+        AbstractCard.__init__(self, id, deck, suit, rank, game, x=x, y=y)
+        self.item = MfxCanvasImage(game.canvas, x, y)
+
+    def moveBy(self, dx, dy):
+        dx, dy = int(dx), int(dy)
+        self.x = self.x + dx
+        self.y = self.y + dy
+
+    def hide(self, stack):
+        self.hide_stack = stack
+
+    def unhide(self):
+        if self.hide_stack is None:
+            return 0
+        self.hide_stack = None
+        return 1
+
+    def showFace(self, unhide=1):
+        self.face_up = 1
+
+    def showBack(self, unhide=1):
+        self.face_up = 0
+
+    def updateCardBackground(self, image):
+        pass
+
+
+Card = _NullCard
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# Headless game engine for batch simulation.
+#
+# Usage:
+#
+#   from pysollib.null.headless import HeadlessApp
+#   app = HeadlessApp()
+#   game = app.startGame(gameid, seed)
+#   game.moveMove(1, game.s.rows[0], game.s.foundations[0])
+#   game.finishMove()
+#   game.undo()
+#
+# The null toolkit has to be selected before pysollib.pysoltk is
+# imported for the first time, so import this module before anything
+# that pulls in the toolkit (pysollib.game, pysollib.stack, ...).
+
+import sys
+
+import pysollib.settings
+
+if 'pysollib.pysoltk' in sys.modules:
+    if pysollib.settings.TOOLKIT != 'null':
+        raise ImportError('pysollib.pysoltk is already loaded with the %r '
+                          'toolkit' % pysollib.settings.TOOLKIT)
+else:
+    pysollib.settings.TOOLKIT = 'null'
+    pysollib.settings.USE_TILE = False
+
+# the toolkit is chosen above, so these imports HAVE TO come after it
+from pysollib.app_statistics import Statistics  # noqa: E402,I202
+from pysollib.gamedb import GAME_DB, loadAllGames  # noqa: E402
+from pysollib.mfxutil import Struct  # noqa: E402
+from pysollib.null.tkcanvas import MfxCanvas  # noqa: E402
+from pysollib.null.tkwrap import MfxRoot  # noqa: E402
+from pysollib.options import Options  # noqa: E402
+from pysollib.pysolrandom import PysolRandom, construct_random  # noqa: E402
+from pysollib.resource import Cardset  # noqa: E402
+
+import six  # noqa: E402
+
+
+# ************************************************************************
+# * Images - card geometry only, no image is ever loaded
+# ************************************************************************
+
+class NullImages:
+    def __init__(self, cardw=71, cardh=96, xoffset=12, yoffset=20):
+        self.cs = Cardset(version=6, CARDW=cardw, CARDH=cardh,
+                          CARD_XOFFSET=xoffset, CARD_YOFFSET=yoffset,
+                          SHADOW_XOFFSET=7, SHADOW_YOFFSET=7)
+        self.reduced = 0
+        self._xfactor = 1.0
+        self._yfactor = 1.0
+        self.CARDW, self.CARDH = cardw, cardh
+        self.CARD_XOFFSET, self.CARD_YOFFSET = xoffset, yoffset
+        self.SHADOW_XOFFSET, self.SHADOW_YOFFSET = 7, 7
+        self.CARD_DX, self.CARD_DY = 0, 0
+
+    def destruct(self):
+        pass
+
+    def getFace(self, deck, suit, rank):
+        return None
+
+    def getBack(self, update=False):
+        return None
+
+    def getTalonBottom(self):
+        return None
+
+    def getReserveBottom(self):
+        return None
+
+    def getBlankBottom(self):
+        return None
+
+    def getSuitBottom(self, suit=-1):
+        return None
+
+    def getBraidBottom(self):
+        return None
+
+    def getLetter(self, rank):
+        return None
+
+    def getShadow(self, ncards):
+        return None
+
+    def getShade(self):
+        return None
+
+    def getHighlightedCard(self, deck, suit, rank, color=None):
+        return None
+
+    def getHighlightedBack(self):
+        return None
+
+    def getSize(self):
+        return (self.CARDW, self.CARDH)
+
+    def getOffsets(self):
+        return (self.CARD_XOFFSET, self.CARD_YOFFSET)
+
+    def getDelta(self):
+        return (self.CARD_DX, self.CARD_DY)
+
+    def resize(self, xf, yf, resample=1):
+        pass
+
+
+# ************************************************************************
+# * HeadlessApp - the subset of Application used by a Game
+# ************************************************************************
+
+class HeadlessApp:
+    def __init__(self, opt=None):
+        self.gdb = GAME_DB
+        self.opt = opt or Options()
+        self.opt.animations = 0
+        self.opt.redeal_animation = False
+        self.opt.win_animation = False
+        self.opt.sound = False
+        self.opt.shadow = False
+        self.opt.shade = False
+        self.opt.randomize_place = False
+        self.stats = Statistics()
+        # set to a SolverCache to reuse solver results
+        self.solver_cache = None
+        # set to a MoveJournal to journal the moves
+        self.journal = None
+        self.audio = None
+        self.cardset = None
+        # no logos
+        self.gimages = Struct(demo=[], pause=[], logos=[], redeal=[])
+        self.images = NullImages()
+        self.menubar = None
+        self.toolbar = None
+        self.statusbar = None
+        self.top = MfxRoot()
+        self.top.connectApp(self)
+        self.top_cursor = None
+        self.canvas = MfxCanvas()
+        # preview > 1 skips stack texts and other decorations
+        self.canvas.preview = 2
+        self.gamerandom = PysolRandom()
+        self.miscrandom = PysolRandom()
+        self.game = None
+        loadGames()
+
+    def getFont(self, name):
+        return self.opt.fonts.get(name)
+
+    def getGameInfo(self, id):
+        return self.gdb.get(id)
+
+    def getGameClass(self, id):
+        gi = self.gdb.get(id)
+        if gi is None:
+            return None
+        return gi.gameclass
+
+    def getGameTitleName(self, id):
+        gi = self.gdb.get(id)
+        if gi is None:
+            return None
+        return gi.name
+
+    def constructGame(self, id):
+        gi = self.gdb.get(id)
+        if gi is None:
+            raise Exception("Unknown game (id %d)" % id)
+        return gi.gameclass(gi)
+
+    def createGame(self, id):
+        """Construct and lay out the game with the given id."""
+        game = self.constructGame(id)
+        game.createPreview(self)
+        # finish what Game.create() does for a playable game
+        game.createSnGroups()
+        game.allstacks = tuple(game.allstacks)
+        game.sg.to_tuples()
+        game.s.to_tuples()
+        hint_class = game.getHintClass()
+        if hint_class is not None:
+            game.Stuck_Class = hint_class(game, 0)
+        self.game = game
+        return game
+
+    def startGame(self, id, seed=None, autoplay=1):
+        """Create the game and deal it.
+
+        seed may be a Random object, a seed string as accepted by
+        construct_random() or None for a random deal.
+        """
+        game = self.createGame(id)
+        if isinstance(seed, six.string_types + six.integer_types):
+            seed = construct_random(str(seed))
+        game.newGame(random=seed, autoplay=autoplay)
+        return game
+
+
+def loadGames():
+    loadAllGames()
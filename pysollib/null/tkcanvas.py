@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+import contextlib
+
+
+# ************************************************************************
+# * canvas items
+# *
+# * Items only remember their position and options; nothing is drawn.
+# ************************************************************************
+
+class _NullCanvasItem:
+    def __init__(self, canvas, x=0, y=0, *args, **kwargs):
+        self.canvas = canvas
+        self.init_coord = x, y
+        self.x, self.y = x, y
+        self.id = None
+        self.cnf = {}
+        if 'group' in kwargs:
+            del kwargs['group']
+        self.cnf.update(kwargs)
+
+    def __getitem__(self, key):
+        return self.cnf.get(key)
+
+    def __setitem__(self, key, value):
+        self.cnf[key] = value
+
+    def cget(self, key):
+        return self.cnf.get(key)
+
+    def config(self, cnf={}, **kw):
+        self.cnf.update(cnf)
+        self.cnf.update(kw)
+
+    configure = config
+
+    def coords(self, *args):
+        if args:
+            self.x, self.y = args[0][:2] if len(args) == 1 else args[:2]
+        return [self.x, self.y]
+
+    def move(self, dx, dy):
+        self.x += dx
+        self.y += dy
+
+    def moveTo(self, x, y):
+        self.x, self.y = x, y
+
+    def addtag(self, tag, option="withtag"):
+        pass
+
+    def dtag(self, tag=None):
+        pass
+
+    def gettags(self):
+        return ()
+
+    def tkraise(self, aboveThis=None):
+        pass
+
+    def lower(self, belowThis=None):
+        pass
+
+    def bind(self, sequence=None, command=None, add=None):
+        pass
+
+    def unbind(self, sequence, funcid=None):
+        pass
+
+    def show(self):
+        pass
+
+    def hide(self):
+        pass
+
+    def delete(self):
+        pass
+
+
+class MfxCanvasGroup(_NullCanvasItem):
+    def __init__(self, canvas, tag=None):
+        _NullCanvasItem.__init__(self, canvas)
+
+
+class MfxCanvasImage(_NullCanvasItem):
+    pass
+
+
+class MfxCanvasLine(_NullCanvasItem):
+    pass
+
+
+class MfxCanvasRectangle(_NullCanvasItem):
+    pass
+
+
+class MfxCanvasText(_NullCanvasItem):
+    def __init__(self, canvas, x, y, preview=-1, **kwargs):
+        _NullCanvasItem.__init__(self, canvas, x, y, **kwargs)
+        self.text_format = None
+
+
+# ************************************************************************
+# * canvas
+# ************************************************************************
+
+class MfxCanvas:
+    def __init__(self, *args, **kw):
+        self.preview = 0
+        self.busy = False
+        self.items = {}
+        self.xmargin, self.ymargin = 0, 0
+        self.width, self.height = 0, 0
+        self._text_items = []
+        self._text_color = '#000000'
+
+    def config(self, cnf={}, **kw):
+        pass
+
+    configure = config
+
+    def winfo_ismapped(self):
+        return False
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def update_idletasks(self):
+        pass
+
+    @contextlib.contextmanager
+    def batch(self):
+        # the commands are not batched (see the Tk canvas)
+        yield
+
+    def after(self, ms, func=None, *args):
+        return None
+
+    def after_cancel(self, id):
+        pass
+
+    def bind(self, sequence=None, func=None, add=None):
+        pass
+
+    def unbind(self, sequence, funcid=None):
+        pass
+
+    def coords(self, item, *args):
+        return item.coords(*args)
+
+    def itemconfig(self, item, cnf={}, **kw):
+        item.config(cnf, **kw)
+
+    def delete(self, *items):
+        pass
+
+    def setInitialSize(self, width, height, margins=True, scrollregion=True):
+        self.width, self.height = width, height
+
+    def deleteAllItems(self):
+        self._text_items = []
+
+    def findCard(self, stack, event):
+        return -1
+
+    def setTextColor(self, color):
+        self._text_color = color
+
+    def setTile(self, image, stretch=0, save_aspect=0):
+        return 0
+
+    def setTopImage(self, image, cw=0, ch=0):
+        return 0
+
+    def hideAllItems(self):
+        pass
+
+    def showAllItems(self):
+        pass
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+from pysollib.mfxutil import KwStruct
+
+
+# ************************************************************************
+# * Dialogs are never shown; they behave as if the default button
+# * had been pressed.
+# ************************************************************************
+
+class MfxDialog:
+    def __init__(self, parent, title="", resizable=False, default=-1):
+        self.parent = parent
+        self.status = 0
+        self.button = default
+
+    def destroy(self):
+        pass
+
+    def initKw(self, kw):
+        kw = KwStruct(kw, timeout=0, resizable=False, default=0)
+        return kw
+
+
+class MfxMessageDialog(MfxDialog):
+    def __init__(self, parent, title, **kw):
+        kw = self.initKw(kw)
+        MfxDialog.__init__(self, parent, title, kw.resizable, kw.default)
+
+
+class MfxExceptionDialog(MfxMessageDialog):
+    def __init__(self, parent, ex, title="Error", **kw):
+        MfxMessageDialog.__init__(self, parent, title, **kw)
+
+
+class PysolAboutDialog(MfxMessageDialog):
+    def __init__(self, app, parent, title, **kw):
+        MfxMessageDialog.__init__(self, parent, title, **kw)
+
+
+class MfxSimpleEntry(MfxDialog):
+    def __init__(self, parent, title, label, value, **kw):
+        kw = self.initKw(kw)
+        MfxDialog.__init__(self, parent, title, kw.resizable, kw.default)
+        self.value = value
+
+
+class StackDesc:
+    def __init__(self, game, stack):
+        pass
+
+    def delete(self):
+        pass
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+
+# ************************************************************************
+# * Wrapper class for the (missing) root window.
+# ************************************************************************
+
+class MfxRoot:
+    def __init__(self, **kw):
+        self.app = None
+
+    def connectApp(self, app):
+        self.app = app
+
+    def busyUpdate(self):
+        pass
+
+    def mainquit(self):
+        pass
+
+    def screenshot(self, filename):
+        pass
+
+    def setCursor(self, cursor):
+        pass
+
+    def sleep(self, seconds):
+        pass
+
+    def interruptSleep(self):
+        pass
+
+    def update(self):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+    def wm_title(self, title):
+        pass
+
+    def wm_iconname(self, name):
+        pass
+
+    def wm_geometry(self, newGeometry=None):
+        pass
@@ -204,6 +204,7 @@ auto_scale = boolean
 spread_stacks = boolean
 preserve_aspect_ratio = boolean
 resampling = integer(0, 10)
+scaled_images_cache_size = integer(0, 4096)
 '''.splitlines()
 
 
@@ -467,6 +468,7 @@ class Options:
         self.resampling = 0
         if USE_PIL:
             self.resampling = int(Image.ANTIALIAS)
+        self.scaled_images_cache_size = 32  # MB, 0 to disable
         # solver
         self.solver_presets = [
             'none',
@@ -624,7 +626,8 @@ class Options:
             config['cardsets'][str(key)] = val
         for key in ('scale_cards', 'scale_x', 'scale_y',
                     'auto_scale', 'spread_stacks',
-                    'preserve_aspect_ratio', 'resampling'):
+                    'preserve_aspect_ratio', 'resampling',
+                    'scaled_images_cache_size'):
             config['cardsets'][key] = getattr(self, key)
 
         # games_geometry
@@ -800,7 +803,8 @@ class Options:
                        ('auto_scale', 'bool'),
                        ('spread_stacks', 'bool'),
                        ('preserve_aspect_ratio', 'bool'),
-                       ('resampling', 'int')):
+                       ('resampling', 'int'),
+                       ('scaled_images_cache_size', 'int')):
             val = self._getOption('cardsets', key, t)
             if val is not None:
                 setattr(self, key, val)
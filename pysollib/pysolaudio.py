@@ -24,8 +24,9 @@
 
 # imports
 import os
+import re
 import traceback
-from threading import Thread
+from threading import Lock, Thread
 
 try:
     import pysolsoundserver
@@ -43,6 +44,8 @@ class AbstractAudioClient:
 
     CAN_PLAY_SOUND = False
     CAN_PLAY_MUSIC = False
+    # startServer() and connectServer() have to run on the main thread
+    MAIN_THREAD = False
 
     def __init__(self):
         self.server = None
@@ -163,6 +166,10 @@ class AbstractAudioClient:
     def updateSettings(self):
         pass
 
+    # load the samples (Sample objects) in advance, without blocking
+    def preloadSamples(self, samples):
+        pass
+
 
 # ************************************************************************
 # * pysolsoundserver module
@@ -266,6 +273,7 @@ class KivyAudioClient(AbstractAudioClient):
 
     CAN_PLAY_SOUND = True
     CAN_PLAY_MUSIC = False
+    MAIN_THREAD = True
 
     def __init__(self):
         AbstractAudioClient.__init__(self)
@@ -498,6 +506,8 @@ class PyGameAudioClient(AbstractAudioClient):
 
     CAN_PLAY_SOUND = True
     CAN_PLAY_MUSIC = True
+    # SDL is initialised in connectServer()
+    MAIN_THREAD = True
 
     def __init__(self):
         AbstractAudioClient.__init__(self)
@@ -517,6 +527,7 @@ class PyGameAudioClient(AbstractAudioClient):
         self.sound = None
         self.sound_channel = None
         self.sound_priority = -1
+        self.sounds = {}                # the preloaded samples
 
     def startServer(self):
         pass
@@ -546,7 +557,9 @@ class PyGameAudioClient(AbstractAudioClient):
                 self.sound.stop()
         vol = self.app.opt.sound_sample_volume/128.0
         try:
-            self.sound = self.mixer.Sound(filename)
+            self.sound = self.sounds.get(filename)
+            if self.sound is None:
+                self.sound = self.mixer.Sound(filename)
             self.sound.set_volume(vol)
             self.sound_channel = self.sound.play(loop)
         except Exception:
@@ -623,3 +636,190 @@ class PyGameAudioClient(AbstractAudioClient):
     def playNextMusic(self):
         if self.music:
             self.music.stop()
+
+    def preloadSamples(self, samples):
+        th = Thread(target=self._preloadSamples, args=(samples,))
+        th.daemon = True
+        th.start()
+
+    def _preloadSamples(self, samples):
+        for obj in samples:
+            if obj.absname and obj.absname not in self.sounds:
+                try:
+                    self.sounds[obj.absname] = self.mixer.Sound(obj.absname)
+                except Exception:
+                    pass
+
+
+# ************************************************************************
+# * the first of some audio clients that works, found in the background
+# ************************************************************************
+
+class AudioClientProxy(AbstractAudioClient):
+    """Try the audio client classes in turn on a thread of its own, so
+    that the startup does not wait for the audio devices.  Until one of
+    them is connected, the last sample and the music and settings calls
+    are kept for it; poll() hands the client over on the main thread.
+    The clients that have to be connected on the main thread are only
+    created on the thread and connected by poll()."""
+
+    CAN_PLAY_SOUND = True
+    CAN_PLAY_MUSIC = True
+
+    def __init__(self, clients):
+        AbstractAudioClient.__init__(self)
+        self.clients = clients
+        # the music of any of the clients, see playContinuousMusic()
+        self.EXTENSIONS = '|'.join([c.EXTENSIONS for c in clients])
+        self.client = None
+        self._lock = Lock()
+        # (client, the clients left) found by the thread, until poll()
+        # takes it; the clients left are None if it is connected
+        self._found = None
+        self._pending = []
+        self._sample = None
+        self._thread = None
+
+    def connectServer(self, app):
+        assert app
+        self.app = app
+        self._startThread(self.clients)
+
+    def _startThread(self, clients):
+        self._thread = Thread(target=self._findClient, args=(clients,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _findClient(self, clients):
+        # runs on the thread: nothing but self._found is set here
+        for i, c in enumerate(clients):
+            try:
+                client = c()
+                if not c.MAIN_THREAD:
+                    client.startServer()
+                    client.connectServer(self.app)
+            except Exception:
+                pass
+            else:
+                # success
+                found = (client, clients[i+1:] if c.MAIN_THREAD else None)
+                break
+        else:
+            found = (AbstractAudioClient(), None)
+        with self._lock:
+            if self.app is not None:
+                self._found = found
+                return
+        # destroyed in the meantime
+        found[0].destroy()
+
+    def poll(self):
+        """Take over the client if the thread found it; to be called on
+        the main thread until it returns True."""
+        with self._lock:
+            found, self._found = self._found, None
+        if found is None:
+            return self.app is None
+        client, clients = found
+        app = self.app
+        if clients is not None:
+            try:
+                client.startServer()
+                client.connectServer(app)
+            except Exception:
+                # try the next ones
+                self._startThread(clients)
+                return False
+        if isinstance(client, PysolSoundServerModuleClient):
+            app.opt.sound_mode = 1
+        else:
+            app.opt.sound_mode = 0
+        if not client.CAN_PLAY_SOUND:
+            app.opt.sound = 0
+            if app.menubar:
+                app.menubar.tkopt.sound.set(0)
+        self.client = client
+        # the calls made in the meantime, in order
+        pending, self._pending = self._pending, None
+        for func, args in pending:
+            try:
+                func(*args)
+            except Exception:
+                traceback.print_exc()
+        sample, self._sample = self._sample, None
+        if sample:
+            client.playSample(*sample)
+        return True
+
+    def _call(self, func, *args):
+        # call func(*args) now, or once the client is there
+        if self.client is None:
+            if self._pending is not None:
+                self._pending.append((func, args))
+            return
+        func(*args)
+
+    def destroy(self):
+        with self._lock:
+            client, self.client = self.client, None
+            if client is None and self._found is not None:
+                client = self._found[0]
+            self._found = None
+            self.app = None
+            self._pending = None
+            self._sample = None
+        if client is not None:
+            client.destroy()
+
+    def playSample(self, name, priority=0, loop=0, volume=-1):
+        client = self.client
+        if client is None:
+            if self._pending is not None:
+                # played once the client is there
+                self._sample = (name, priority, loop, volume)
+            return 0
+        return client.playSample(name, priority, loop, volume)
+
+    def stopSamples(self):
+        self._sample = None
+        client = self.client
+        if client is not None:
+            client.stopSamples()
+
+    def stopSamplesLoop(self):
+        client = self.client
+        if client is not None:
+            client.stopSamplesLoop()
+
+    def getMusicInfo(self):
+        client = self.client
+        if client is not None:
+            return client.getMusicInfo()
+        return -1
+
+    def playNextMusic(self):
+        client = self.client
+        if client is not None:
+            client.playNextMusic()
+
+    def playContinuousMusic(self, music_list):
+        self._call(self._playContinuousMusic, music_list)
+
+    def _playContinuousMusic(self, music_list):
+        if not self.client.CAN_PLAY_MUSIC:
+            return
+        ext_re = re.compile(self.client.EXTENSIONS)
+        music_list = [m for m in music_list if ext_re.search(m.filename)]
+        self.client.playContinuousMusic(music_list)
+
+    def updateSettings(self):
+        self._call(self._updateSettings)
+
+    def _updateSettings(self):
+        self.client.updateSettings()
+
+    def preloadSamples(self, samples):
+        self._call(self._preloadSamples, samples)
+
+    def _preloadSamples(self, samples):
+        self.client.preloadSamples(samples)
@@ -40,7 +40,9 @@ class _HideableCard(AbstractCard):
     def hide(self, stack):
         if stack is self.hide_stack:
             return
-        self.item.hide()
+        # a moving card is hidden when it is in its place
+        if not self.isAnimating():
+            self.item.hide()
         self.hide_stack = stack
 
     def unhide(self):
@@ -50,6 +52,10 @@ class _HideableCard(AbstractCard):
         self.hide_stack = None
         return 1
 
+    def rehide(self):
+        if self.hide_stack is not None:
+            self.item.hide()
+
 
 # ************************************************************************
 # *
@@ -39,6 +39,8 @@
 #     around.
 #
 
+import contextlib
+
 import gobject
 
 import gtk
@@ -525,6 +527,11 @@ class MfxCanvas(gnomecanvas.Canvas):
         self.__topimage = self.root().add(gnomecanvas.CanvasPixbuf,
                                           pixbuf=pixbuf, x=x-dx, y=y-dy)
 
+    @contextlib.contextmanager
+    def batch(self):
+        # the commands are not batched (see the Tk canvas)
+        yield
+
     def update_idletasks(self):
         # print 'MfxCanvas.update_idletasks'
         # gdk.window_process_all_updates()
@@ -108,7 +108,7 @@ class LogFormatter(PysolStatsFormatter):
         return 1
 
     def writeFullLog(self, player):
-        prev_games = self.app.stats.prev_games.get(player)
+        prev_games = self.app.stats.getPrevGames(player)
         return self.writeLog(player, prev_games)
 
     def writeSessionLog(self, player):
@@ -145,6 +145,11 @@ class _PysolPixmap:
         return im
 
 
+def decodeImage(file):
+    # the images are not decoded in advance, see Images.load()
+    return None
+
+
 def loadImage(file):
     return _PysolPixmap(file=file)
 
@@ -92,6 +92,16 @@ elif TOOLKIT == 'kivy':
     from pysollib.kivy.selectcardset import *  # noqa: F401,F403
     from pysollib.kivy.selecttree import *  # noqa: F401,F403
 
+elif TOOLKIT == 'null':
+    from pysollib.null.tkconst import *  # noqa: F401,F403
+    from pysollib.null.tkutil import *  # noqa: F401,F403
+    from pysollib.null.card import *  # noqa: F401,F403
+    from pysollib.null.tkcanvas import *  # noqa: F401,F403
+    from pysollib.null.tkwrap import *  # noqa: F401,F403
+    from pysollib.null.tkwidget import *  # noqa: F401,F403
+    from pysollib.null.tkhtml import *  # noqa: F401,F403
+    from pysollib.null.solverdialog import *  # noqa: F401,F403
+
 else:  # gtk
     from pysollib.pysolgtk.tkconst import *  # noqa: F401,F403
     from pysollib.pysolgtk.tkutil import *  # noqa: F401,F403
@@ -25,7 +25,8 @@ import glob
 import os
 import traceback
 
-from pysollib.mfxutil import KwStruct, Struct
+from pysollib.mfxutil import KwStruct, Struct, print_err
+from pysollib.mfxutil import pickle, unpickle
 from pysollib.mygettext import _
 from pysollib.settings import DEBUG
 
@@ -156,6 +157,74 @@ class ResourceManager:
         return result
 
 
+# ************************************************************************
+# * ResourceIndex - what was found in the resource directories on the
+# * last run, so that only the directories that changed are read again
+# ************************************************************************
+
+class ResourceIndex:
+    VERSION = 1
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.changed = False
+        self._entries = {}      # key -> (stamp of the paths, data)
+        self._used = {}         # the entries used on this run
+
+    def load(self):
+        if not self.filename or not os.path.exists(self.filename):
+            return
+        try:
+            index = unpickle(self.filename)
+        except Exception as ex:
+            print_err("cannot read the resource index %s: %s" %
+                      (self.filename, ex))
+            return
+        if isinstance(index, dict) and index.get('version') == self.VERSION:
+            self._entries = index['entries']
+
+    def save(self):
+        # only what was used on this run is kept
+        if not self.filename or (not self.changed and
+                                 len(self._used) == len(self._entries)):
+            return
+        try:
+            pickle({'version': self.VERSION, 'entries': self._used},
+                   self.filename, protocol=-1)
+        except Exception as ex:
+            print_err("cannot write the resource index %s: %s" %
+                      (self.filename, ex))
+
+    def _stamp(self, path):
+        try:
+            st = os.stat(path)
+        except EnvironmentError:
+            return None
+        return st.st_mtime, st.st_size
+
+    def get(self, key, paths, read):
+        """Return read(*paths), or what it returned on the last run if
+        none of the paths (directories or files) changed since."""
+        stamp = tuple([self._stamp(path) for path in paths])
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, read(*paths))
+            self._entries[key] = entry
+            self.changed = True
+        self._used[key] = entry
+        return entry[1]
+
+    def listDir(self, dirname):
+        """Return the sorted names in the directory as (name, isfile)
+        pairs."""
+        return self.get(('dir', dirname), (dirname,), _listDir)
+
+
+def _listDir(dirname):
+    return tuple([(name, os.path.isfile(os.path.join(dirname, name)))
+                  for name in sorted(os.listdir(dirname))])
+
+
 # ************************************************************************
 # * Cardset
 # ************************************************************************
@@ -332,7 +401,7 @@ class CSI:
 
 
 class CardsetConfig(Struct):
-    # see config.txt and _readCardsetConfig()
+    # see config.txt and _readCardsetDir()
     def __init__(self):
         Struct.__init__(
             self,
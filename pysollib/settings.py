@@ -39,7 +39,7 @@ VERSION = '.'.join(map(str, VERSION_TUPLE))
 WIN_SYSTEM = 'x11'                      # win32, x11, aqua, classic
 
 # toolkit
-TOOLKIT = 'tk'                          # or 'gtk'
+TOOLKIT = 'tk'                          # or 'gtk', 'kivy', 'null'
 USE_TILE = 'auto'                       # or True or False
 
 # sound
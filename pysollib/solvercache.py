@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# Solver results, keyed by a digest of the board and of the solver
+# arguments.  Recent results are kept in memory; every result is also
+# written to one small file under the config directory, so that solving
+# the same position again (after an undo, a restart, a replayed deal)
+# is instant.  The number of files is bounded; the least recently used
+# ones are removed first.
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from pysollib.mfxutil import print_err
+
+# the outcomes worth remembering; 'cancelled' and failures are not
+SOLVER_STATES = ('solved', 'unsolved', 'intractable')
+
+
+class SolverCache:
+    VERSION = 1
+
+    def __init__(self, dirname=None, max_memory=256, max_files=2000):
+        self.dirname = dirname
+        self.max_memory = max_memory
+        self.max_files = max_files
+        self._lru = OrderedDict()
+        # the number of files on disk, counted on the first write
+        self._files = None
+        # the solver runs in a thread of its own
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def makeKey(board, **args):
+        """Return the key of board solved with args (None values are
+        left out, so that a missing argument and None are the same)."""
+        s = ['v%d' % SolverCache.VERSION, board]
+        for k in sorted(args):
+            if args[k] is not None:
+                s.append('%s=%s' % (k, args[k]))
+        return hashlib.sha1('\0'.join(s).encode('utf-8')).hexdigest()
+
+    def _filename(self, key):
+        return os.path.join(self.dirname, key + '.json')
+
+    def get(self, key):
+        """Return the result stored under key, or None."""
+        with self._lock:
+            if key in self._lru:
+                result = self._lru[key] = self._lru.pop(key)
+                return result
+        result = self._read(key)
+        if result is not None:
+            with self._lock:
+                self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        """Store result, a dict with the keys 'state', 'iters' and
+        'moves' ([ncards, src, dest] lists of json values)."""
+        if result.get('state') not in SOLVER_STATES:
+            return
+        with self._lock:
+            self._remember(key, result)
+        self._write(key, result)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self._files = None
+        for fn in self._listFiles():
+            try:
+                os.remove(fn)
+            except EnvironmentError:
+                pass
+
+    def _remember(self, key, result):
+        self._lru.pop(key, None)
+        self._lru[key] = result
+        while len(self._lru) > self.max_memory:
+            self._lru.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # disk store
+    # ------------------------------------------------------------------
+
+    def _read(self, key):
+        if not self.dirname:
+            return None
+        fn = self._filename(key)
+        try:
+            with open(fn, 'r') as fd:
+                result = json.load(fd)
+        except (EnvironmentError, ValueError):
+            return None
+        if not isinstance(result, dict) or \
+                result.get('version') != self.VERSION or \
+                result.get('state') not in SOLVER_STATES:
+            return None
+        try:
+            # keep the recently used files from being evicted
+            os.utime(fn, None)
+        except EnvironmentError:
+            pass
+        return result
+
+    def _write(self, key, result):
+        if not self.dirname:
+            return
+        data = dict(result, version=self.VERSION)
+        fn = self._filename(key)
+        tmp = '%s.%d.%d.tmp' % (
+            fn, os.getpid(), threading.current_thread().ident)
+        try:
+            if not os.path.isdir(self.dirname):
+                os.makedirs(self.dirname)
+            with open(tmp, 'w') as fd:
+                json.dump(data, fd, separators=(',', ':'))
+            new = not os.path.exists(fn)
+            os.replace(tmp, fn)
+        except EnvironmentError as ex:
+            print_err('cannot write solver cache: %s' % ex)
+            try:
+                os.remove(tmp)
+            except EnvironmentError:
+                pass
+            return
+        with self._lock:
+            if self._files is None:
+                self._files = len(self._listFiles())
+            elif new:
+                self._files += 1
+            if self._files > self.max_files:
+                self._evict()
+
+    def _listFiles(self):
+        if not self.dirname:
+            return []
+        try:
+            names = os.listdir(self.dirname)
+        except EnvironmentError:
+            return []
+        return [os.path.join(self.dirname, n) for n in names
+                if n.endswith('.json')]
+
+    def _evict(self):
+        files = self._listFiles()
+        self._files = len(files)
+        if len(files) <= self.max_files:
+            return
+        mtimes = []
+        for fn in files:
+            try:
+                mtimes.append((os.path.getmtime(fn), fn))
+            except EnvironmentError:
+                pass
+        mtimes.sort()
+        # drop a tenth more than needed, so this does not run every time
+        n = len(mtimes) - self.max_files + self.max_files // 10
+        for mtime, fn in mtimes[:n]:
+            try:
+                os.remove(fn)
+                self._files -= 1
+            except EnvironmentError:
+                pass
@@ -23,6 +23,7 @@
 
 from pysollib.mfxutil import Image, ImageTk, USE_PIL
 from pysollib.mfxutil import Struct, SubclassResponsibility, kwdefault
+from pysollib.mfxutil import print_err, uclock
 from pysollib.mygettext import _
 from pysollib.pysoltk import ANCHOR_NW, ANCHOR_SE
 from pysollib.pysoltk import CURSOR_DOWN_ARROW, CURSOR_DRAG
@@ -256,6 +257,12 @@ class Stack:
         view.is_visible = view.x >= -dx and view.y >= -dy
         view.is_open = -1
         view.can_hide_cards = -1
+        # the cards of a stack which is not on the table are all hidden
+        # (kivy moves the cards on its own, so they are left alone)
+        view.hide_all_cards = not view.is_visible and TOOLKIT != 'kivy'
+        # a StackOcclusion if the cards of other stacks may cover the
+        # cards of the stack (see Game.getOcclusionStacks())
+        view.occlusion = None
         view.max_shadow_cards = -1
         view.current_cursor = ''
         view.cursor_changed = False
@@ -394,12 +401,17 @@ class Stack:
     def addCard(self, card, unhide=1, update=1):
         model, view = self, self
         model.cards.append(card)
-        card.tkraise(unhide=unhide)
+        if view.hide_all_cards:
+            card.hide(self)
+        else:
+            card.tkraise(unhide=unhide)
         if view.can_hide_cards and len(model.cards) >= 3:
             # we only need to display the 2 top cards
             model.cards[-3].hide(self)
         card.item.addtag(view.group)
         view._position(card)
+        if view.occlusion is not None:
+            view.occlusion.changed(self)
         if update:
             view.updateText()
         self.closeStack()
@@ -408,8 +420,11 @@ class Stack:
     def insertCard(self, card, position, unhide=1, update=1):
         model, view = self, self
         model.cards.insert(position, card)
-        for c in model.cards[position:]:
-            c.tkraise(unhide=unhide)
+        if view.hide_all_cards:
+            card.hide(self)
+        else:
+            for c in model.cards[position:]:
+                c.tkraise(unhide=unhide)
         if (view.can_hide_cards and len(model.cards) >= 3 and
                 len(model.cards)-position <= 2):
             # we only need to display the 2 top cards
@@ -417,6 +432,8 @@ class Stack:
         card.item.addtag(view.group)
         for c in model.cards[position:]:
             view._position(c)
+        if view.occlusion is not None:
+            view.occlusion.changed(self)
         if update:
             view.updateText()
         self.closeStack()
@@ -434,6 +451,8 @@ class Stack:
                 card.unhide()
                 if len(self.cards) >= 3:
                     model.cards[-3].unhide()
+            elif unhide and view.hide_all_cards:
+                card.unhide()
             del model.cards[-1]
         else:
             card.item.dtag(view.group)
@@ -444,12 +463,18 @@ class Stack:
                     if card is model.cards[-1] or model is self.cards[-2]:
                         # Make sure that 2 top cards will be un-hidden.
                         model.cards[-3].unhide()
+            elif unhide and view.hide_all_cards:
+                card.unhide()
             card_index = model.cards.index(card)
             model.cards.remove(card)
             if update_positions:
                 for c in model.cards[card_index:]:
                     view._position(c)
 
+        if view.occlusion is not None:
+            # the card was hidden if it was covered here
+            card.unhide()
+            view.occlusion.changed(self)
         if update:
             view.updateText()
         self.unshadeStack()
@@ -737,34 +762,36 @@ class Stack:
         cards = model.cards
         if not view.is_visible or len(cards) < 2:
             return
-        if view.can_hide_cards:
-            # hide all lower cards
-            for c in cards[:-2]:
-                # print "refresh hide", c, c.hide_stack
-                c.hide(self)
-            # unhide the 2 top cards
-            for c in cards[-2:]:
-                # print "refresh unhide 1", c, c.hide_stack
-                c.unhide()
-                # print "refresh unhide 1", c, c.hide_stack
-        # update the card postions and stacking order
-        item = cards[0].item
-        x, y = view.x, view.y
-        ix, iy, lx, ly = 0, 0, len(view.CARD_XOFFSET), len(view.CARD_YOFFSET)
-        for c in cards[1:]:
-            c.item.tkraise(item)
-            item = c.item
-            if not view.can_hide_cards:
-                d = self.shrink_face_down
-                if c.face_up:
-                    x += self.CARD_XOFFSET[ix]
-                    y += self.CARD_YOFFSET[iy]
-                else:
-                    x += int(self.CARD_XOFFSET[ix]/d)
-                    y += int(self.CARD_YOFFSET[iy]/d)
-                ix = (ix + 1) % lx
-                iy = (iy + 1) % ly
-                c.moveTo(x, y)
+        with view.canvas.batch():
+            if view.can_hide_cards:
+                # hide all lower cards
+                for c in cards[:-2]:
+                    # print "refresh hide", c, c.hide_stack
+                    c.hide(self)
+                # unhide the 2 top cards
+                for c in cards[-2:]:
+                    # print "refresh unhide 1", c, c.hide_stack
+                    c.unhide()
+                    # print "refresh unhide 1", c, c.hide_stack
+            # update the card postions and stacking order
+            item = cards[0].item
+            x, y = view.x, view.y
+            ix, iy = 0, 0
+            lx, ly = len(view.CARD_XOFFSET), len(view.CARD_YOFFSET)
+            for c in cards[1:]:
+                c.item.tkraise(item)
+                item = c.item
+                if not view.can_hide_cards:
+                    d = self.shrink_face_down
+                    if c.face_up:
+                        x += self.CARD_XOFFSET[ix]
+                        y += self.CARD_YOFFSET[iy]
+                    else:
+                        x += int(self.CARD_XOFFSET[ix]/d)
+                        y += int(self.CARD_YOFFSET[iy]/d)
+                    ix = (ix + 1) % lx
+                    iy = (iy + 1) % ly
+                    c.moveTo(x, y)
 
     def updateText(self):
         if self.game.preview > 1 or self.texts.ncards is None:
@@ -793,8 +820,9 @@ class Stack:
     def updatePositions(self):
         # compact the stack when a cards goes off screen
         if self.reallocateCards():
-            for c in self.cards:
-                self._position(c)
+            with self.canvas.batch():
+                for c in self.cards:
+                    self._position(c)
 
     def reallocateCards(self):
         # change CARD_YOFFSET if a cards is off-screen
@@ -1111,6 +1139,8 @@ class Stack:
     def __defaultClickEventHandler(self, event, handler,
                                    start_drag=0, cancel_drag=1):
         self.game.event_handled = True  # for Game.undoHandler
+        self.game.delayStuck()
+        self.game.finishAnimations()
         if self.game.demo:
             self.game.stopDemo(event)
             return EVENT_HANDLED
@@ -1181,7 +1211,13 @@ class Stack:
             return EVENT_HANDLED
         if self.game.app.opt.mouse_type == 'point-n-click':
             return EVENT_HANDLED
+        drag = self.game.drag
+        t = uclock()
         self.keepDrag(event)
+        t = uclock() - t
+        drag.motion_events += 1
+        drag.motion_time += t
+        drag.motion_max = max(drag.motion_max, t)
         #  if self.game.app.opt.mouse_type == 'drag-n-drop' \
         #           and TOOLKIT == 'tk':
         #      # use a timer to update the drag
@@ -1561,6 +1597,16 @@ class Stack:
         drag.shadows = []
         drag.stack = None
         drag.cards = []
+        if DEBUG >= 2 and drag.motion_events:
+            # the time spent in the motion handler, not the latency of
+            # the events
+            print_err('drag motion: %d events, handler time %.3f ms mean, '
+                      '%.3f ms max' %
+                      (drag.motion_events,
+                       1000 * drag.motion_time / drag.motion_events,
+                       1000 * drag.motion_max), 2)
+        drag.motion_events = 0
+        drag.motion_time = drag.motion_max = 0.0
 
     # finish a drag operation
     def finishDrag(self, event=None):
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# The startup profiler (--profile-startup=FILE): the wall and CPU time
+# of every phase of the startup, up to the creation of the first game,
+# written to FILE (or stdout for "-") as JSON.  The memory use of a
+# phase is given as the change of the number of live memory blocks
+# (blocks allocated and not freed yet, not the number of allocations)
+# and as the number of garbage collections, which the interpreter runs
+# every few hundred allocations.
+
+import contextlib
+import gc
+import json
+import os
+import sys
+import timeit
+
+from pysollib.mfxutil import print_err
+from pysollib.settings import TOOLKIT, VERSION
+
+
+def _counters():
+    cpu = os.times()
+    if hasattr(gc, 'get_stats'):
+        collections = sum([s['collections'] for s in gc.get_stats()])
+    else:
+        collections = 0
+    if hasattr(sys, 'getallocatedblocks'):
+        blocks = sys.getallocatedblocks()
+    else:
+        blocks = 0
+    return (timeit.default_timer(), cpu[0] + cpu[1], blocks, collections)
+
+
+class StartupProfiler:
+    VERSION = 2
+
+    def __init__(self):
+        self.filename = None            # None if not profiling
+        self.phases = []
+        self._start = None
+
+    def start(self, filename):
+        self.filename = filename
+        self.phases = []
+        self._start = _counters()
+
+    def _result(self, name, start, end):
+        return {'name': name,
+                'wall': round(end[0] - start[0], 6),
+                'cpu': round(end[1] - start[1], 6),
+                'live_blocks': end[2] - start[2],
+                'gc_collections': end[3] - start[3]}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if self.filename is None:
+            yield
+            return
+        start = _counters()
+        try:
+            yield
+        finally:
+            self.phases.append(self._result(name, start, _counters()))
+
+    def finish(self):
+        """Write the report; the phases after this are not timed."""
+        if self.filename is None:
+            return
+        report = {'version': self.VERSION, 'pysol_version': VERSION,
+                  'toolkit': TOOLKIT, 'python': sys.version.split()[0],
+                  'total': self._result('total', self._start, _counters()),
+                  'phases': self.phases}
+        filename, self.filename = self.filename, None
+        try:
+            if filename == '-':
+                print(json.dumps(report, indent=2))
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(report, f, indent=2)
+        except EnvironmentError as ex:
+            print_err("cannot write the startup profile %s: %s" %
+                      (filename, ex))
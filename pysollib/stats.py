@@ -22,6 +22,7 @@
 # ---------------------------------------------------------------------------##
 
 import time
+from datetime import date, timedelta
 
 from pysollib.gamedb import GI
 from pysollib.mfxutil import format_time
@@ -59,9 +60,10 @@ class PysolStatsFormatter:
             }
         sort_func = sort_functions[sort_by]
         g = sort_func(player=player)
+        index = app.getStatsIndex(player)
         t_won, tlost, tgames, ttime, tmoves = 0, 0, 0, 0, 0
         for id in g:
-            won, lost, time, moves = app.stats.getFullStats(player, id)
+            won, lost, time, moves = index.getFullStats(id)
             tot = won + lost
             if tot > 0 or id == app.game.id:
                 # yield only played games
@@ -233,7 +235,7 @@ class FileStatsFormatter(PysolStatsFormatter):
         if player is None:
             player = _('Demo')
         header = _("Full log for %(player)s") % {'player': player}
-        prev_games = self.app.stats.prev_games.get(player)
+        prev_games = self.app.stats.getPrevGames(player)
         return self.writeLog(player, header, prev_games)
 
     def writeSessionLog(self, player):
@@ -252,79 +254,42 @@ class ProgressionFormatter:
 
     def __init__(self, app, player, gameid):
 
-        all_results = {}      # key: (year, month, day);  value: [played, won]
-        self.all_results = all_results
-        game_results = {}
-        self.game_results = game_results
-        games = app.stats.prev_games.get(player)
-        if not games:
-            return
-        for g in games:
-            id = g[0]
-            status = g[2]
-            start_time = g[3]
-            t = time.localtime(start_time)[:3]
-            if t not in all_results:
-                all_results[t] = [0, 0]
-            all_results[t][0] += 1
-            if status > 0:
-                all_results[t][1] += 1
-            if id == gameid:
-                if t not in game_results:
-                    game_results[t] = [0, 0]
-                game_results[t][0] += 1
-                if status > 0:
-                    game_results[t][1] += 1
-        # from pprint import pprint; pprint(all_results)
-
-    def norm_time(self, t):
-        if len(t) == 3:
-            t = list(t)+[0, 0, 0, -1, -1, -1]
-        return list(time.localtime(time.mktime(tuple(t))))
+        # key: day (see date.toordinal());  value: [played, won]
+        histogram = app.stats.getHistogram(player)
+        self.all_results = histogram.all
+        self.game_results = histogram.games.get(gameid, {})
+
+    def monthsAgo(self, d, n):
+        # like time.mktime(), an invalid day goes on to the next month
+        year, month = divmod(d.year * 12 + d.month - 1 - n, 12)
+        return date(year, month + 1, 1) + timedelta(days=d.day - 1)
 
     def getResults(self, interval, all_games=True, date_format='%d.%m'):
         if all_games:
             results = self.all_results
         else:
             results = self.game_results
-        t = list(time.localtime())
+        today = date.today()
         if interval == 'week':
-            t[2] -= 7
-            lt = self.norm_time(t)
+            lt = today - timedelta(days=7)
             marks = None
             delta = 1
-            format = date_format
         elif interval == 'month':
-            tt = t[:]
-            t[1] -= 1
-            lt = self.norm_time(t)
-            marks = [lt[:3], tt[:3]]
-            tt[2] -= 10
-            marks.append(self.norm_time(tt)[:3])
-            tt[2] -= 10
-            marks.append(self.norm_time(tt)[:3])
+            lt = self.monthsAgo(today, 1)
+            marks = [lt, today, today - timedelta(days=10),
+                     today - timedelta(days=20)]
             delta = 1
-            format = date_format
         elif interval == 'year':
-            tt = t[:]
-            t[0] -= 1
-            lt = self.norm_time(t)
-            marks = [lt[:3], tt[:3]]
-            for i in range(5):
-                tt[1] -= 2
-                marks.append(self.norm_time(tt)[:3])
+            lt = self.monthsAgo(today, 12)
+            marks = [lt, today]
+            for i in range(1, 6):
+                marks.append(self.monthsAgo(today, 2 * i))
             delta = 7
-            format = date_format
         else:                           # all
-            tt = t[:]
-            tt[1] -= 1
-            tt = self.norm_time(tt)
+            lt = self.monthsAgo(today, 1)
             if results:
-                lt = self.norm_time(min(results.keys()))
-                lt = min(lt, tt)        # min 1 month
-            else:
-                lt = tt
-            dt = time.time()-time.mktime(tuple(lt))
+                lt = min(date.fromordinal(min(results)), lt)  # min 1 month
+            dt = time.time()-time.mktime(lt.timetuple())
             if dt > 63072000:           # 2 years
                 d = 6
             elif dt > 31536000:         # 1 year
@@ -333,30 +298,28 @@ class ProgressionFormatter:
                 d = 2
             else:
                 d = 1
-            marks = [lt[:3], t[:3]]
+            marks = [lt, today]
+            t = today
             while t > lt:
-                t[1] -= d
-                t = self.norm_time(t)
-                marks.append(t[:3])
+                t = self.monthsAgo(t, d)
+                marks.append(t)
             delta = 7
-            format = date_format
+        if marks is not None:
+            marks = set(m.toordinal() for m in marks)
 
         res = []
-        ct = list(time.localtime())
-        while lt <= ct:
-            # assert type(lt) is type(ct)
+        first, day = lt.toordinal(), today.toordinal()
+        while first <= day:
             played = 0
             won = 0
             text = None
             for i in range(delta):
-                if (not marks) or ct[:3] in marks:
-                    text = time.strftime(format, tuple(ct))
-                t = tuple(ct[:3])
-                if t in results:
-                    played += results[t][0]
-                    won += results[t][1]
-                ct[2] -= 1
-                ct = self.norm_time(ct)
+                if (not marks) or day in marks:
+                    text = date.fromordinal(day).strftime(date_format)
+                if day in results:
+                    played += results[day][0]
+                    won += results[day][1]
+                day -= 1
             res.append((text, played, won))
         res.reverse()
         # from pprint import pprint; pprint(res)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# Solvability survey: deal a range of seeds of one game and run the
+# solver on each of them in a pool of worker processes.
+#
+# The result file has one line per seed:
+#
+#   <seed> <solved|unsolved|intractable|error> <iterations> <moves>
+
+import getopt
+import multiprocessing
+
+from pysollib.gamedb import GAME_DB
+from pysollib.mfxutil import Struct, print_err
+from pysollib.mygettext import _
+# selects the null toolkit; nothing above may import pysollib.pysoltk
+from pysollib.null.headless import HeadlessApp, loadGames
+from pysollib.pysolrandom import construct_random
+from pysollib.settings import TITLE
+
+
+SOLVER_STATES = ('solved', 'unsolved', 'intractable', 'error')
+
+
+# ************************************************************************
+# * worker side
+# ************************************************************************
+
+class _SurveyProgress:
+    # stands in for the solver dialog; only remembers the iterations
+    def __init__(self):
+        self.iters = 0
+
+    def setText(self, **kw):
+        if kw.get('iter'):
+            self.iters = kw['iter']
+
+
+_worker = None
+
+
+def _initWorker(gameid, preset, max_iters):
+    global _worker
+    app = HeadlessApp()
+    _worker = Struct(
+        game=app.createGame(gameid),
+        preset=preset,
+        max_iters=max_iters,
+    )
+
+
+def solveSeed(seed):
+    game = _worker.game
+    game.newGame(random=construct_random(str(seed)), autoplay=0)
+    progress = _SurveyProgress()
+    solver = game.Solver_Class(game, progress)
+    solver.config(preset=_worker.preset, max_iters=_worker.max_iters,
+                  progress=False)
+    try:
+        solver.computeHints()
+    except RuntimeError:
+        # solver not found
+        return (seed, 'error', 0, 0)
+    moves = len(solver.hints) - 1
+    state = solver.solver_state
+    if state not in SOLVER_STATES:
+        state = 'solved' if moves > 0 else 'unsolved'
+    return (seed, state, progress.iters, moves)
+
+
+# ************************************************************************
+# * command line
+# ************************************************************************
+
+def findSolverGame(name):
+    """Return the id of the solver-capable game called name (or with
+    the id name), or None."""
+    try:
+        gameid = int(name)
+    except ValueError:
+        gameid = GAME_DB.getGameByName(name)
+    if gameid not in GAME_DB.getGamesForSolver():
+        return None
+    return gameid
+
+
+def parseSeeds(s):
+    """Parse 'FIRST-LAST' (inclusive) or a single seed."""
+    first, sep, last = s.partition('-')
+    first = int(first)
+    last = int(last) if sep else first
+    if first < 0 or last < first:
+        raise ValueError(s)
+    return first, last
+
+
+def parse_option(argv):
+    prog_name = argv[0]
+    try:
+        optlist, args = getopt.getopt(argv[1:], "g:s:j:o:h",
+                                      ["game=", "seeds=", "jobs=",
+                                       "output=", "max-iters=", "preset=",
+                                       "help"])
+    except getopt.GetoptError as err:
+        print_err(str(err) + "\n" + _("try %s --help for more information") %
+                  prog_name, 0)
+        return None
+    opts = {"help": False,
+            "game": None,
+            "seeds": "1-100",
+            "jobs": multiprocessing.cpu_count(),
+            "output": None,
+            "max-iters": 100000,
+            "preset": None,
+            }
+    for i in optlist:
+        if i[0] in ("-h", "--help"):
+            opts["help"] = True
+        elif i[0] in ("-g", "--game"):
+            opts["game"] = i[1]
+        elif i[0] in ("-s", "--seeds"):
+            opts["seeds"] = i[1]
+        elif i[0] in ("-j", "--jobs"):
+            opts["jobs"] = i[1]
+        elif i[0] in ("-o", "--output"):
+            opts["output"] = i[1]
+        elif i[0] == "--max-iters":
+            opts["max-iters"] = i[1]
+        elif i[0] == "--preset":
+            opts["preset"] = i[1]
+
+    if opts["help"] or opts["game"] is None:
+        print(_("""Usage: %s [OPTIONS]
+  -g    --game=GAME            game name or game id (required)
+  -s    --seeds=FIRST-LAST     range of deals to survey (default: 1-100)
+  -j    --jobs=N               number of worker processes
+  -o    --output=FILE          result file (default: survey-GAMEID.txt)
+        --max-iters=N          solver iterations limit per deal
+        --preset=PRESET        Freecell Solver preset
+  -h    --help                 display this help and exit
+
+  Only games supported by the solver can be surveyed.
+""") % prog_name)
+        return None
+
+    try:
+        opts["seeds"] = parseSeeds(opts["seeds"])
+        opts["jobs"] = max(1, int(opts["jobs"]))
+        opts["max-iters"] = int(opts["max-iters"])
+    except ValueError as err:
+        print_err(_("invalid option value: ") + str(err), 0)
+        return None
+    return opts
+
+
+def survey(gameid, first, last, output, jobs=1, preset=None,
+           max_iters=100000):
+    """Solve the deals first..last of gameid, writing each result to
+    output as soon as it is known; return the count of each state."""
+    counts = dict((state, 0) for state in SOLVER_STATES)
+    gi = GAME_DB.get(gameid)
+    output.write("# %s solver survey: game %d (%s) seeds %d-%d "
+                 "max-iters %d preset %s\n" %
+                 (TITLE, gameid, gi.name, first, last, max_iters, preset))
+    pool = multiprocessing.Pool(jobs, _initWorker,
+                                (gameid, preset, max_iters))
+    try:
+        seeds = range(first, last + 1)
+        chunksize = max(1, min(16, len(seeds) // (jobs * 4)))
+        for seed, state, iters, moves in pool.imap(solveSeed, seeds,
+                                                   chunksize):
+            output.write("%d %s %d %d\n" % (seed, state, iters, moves))
+            output.flush()
+            counts[state] += 1
+    finally:
+        pool.terminate()
+        pool.join()
+    return counts
+
+
+def main(argv):
+    opts = parse_option(argv)
+    if opts is None:
+        return 1
+    loadGames()
+    gameid = findSolverGame(opts["game"])
+    if gameid is None:
+        print_err(_("game is unknown or not supported by the solver: ") +
+                  opts["game"], 0)
+        return 1
+    filename = opts["output"] or "survey-%d.txt" % gameid
+    first, last = opts["seeds"]
+    with open(filename, "w") as output:
+        counts = survey(gameid, first, last, output, jobs=opts["jobs"],
+                        preset=opts["preset"], max_iters=opts["max-iters"])
+    print(", ".join("%s: %d" % (state, counts[state])
+                    for state in SOLVER_STATES))
+    if counts['error']:
+        print_err(_("the solver could not be run (is it installed?)"), 0)
+        return 1
+    return 0
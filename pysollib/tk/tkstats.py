@@ -433,7 +433,7 @@ class CanvasFormatter(PysolStatsFormatter):
         return 1
 
     def writeFullLog(self, player):
-        prev_games = self.app.stats.prev_games.get(player)
+        prev_games = self.app.stats.getPrevGames(player)
         return self.writeLog(player, prev_games)
 
     def writeSessionLog(self, player):
@@ -33,7 +33,9 @@ class _HideableCard(AbstractCard):
     def hide(self, stack):
         if stack is self.hide_stack:
             return
-        self.item.config(state="hidden")
+        # a moving card is hidden when it is in its place
+        if not self.isAnimating():
+            self.item.config(state="hidden")
         self.hide_stack = stack
         # print "hide:", self.id, self.item.coords()
 
@@ -45,6 +47,10 @@ class _HideableCard(AbstractCard):
         self.hide_stack = None
         return 1
 
+    def rehide(self):
+        if self.hide_stack is not None:
+            self.item.config(state="hidden")
+
 
 # ************************************************************************
 # * New implementation since 2.10
@@ -59,7 +65,7 @@ class _HideableCard(AbstractCard):
 class _OneImageCard(_HideableCard):
     def __init__(self, id, deck, suit, rank, game, x=0, y=0):
         _HideableCard.__init__(self, id, deck, suit, rank, game, x=x, y=y)
-        self._face_image = game.getCardFaceImage(deck, suit, rank)
+        self.__face_image = None
         self._back_image = game.getCardBackImage(deck, suit, rank)
         self._shade_image = game.getCardShadeImage()
         self._active_image = self._back_image
@@ -68,6 +74,14 @@ class _OneImageCard(_HideableCard):
         self.shade_item = None
         # self._setImage = self.item.config
 
+    # the face image is only loaded when it is shown (see Images.getFace)
+    @property
+    def _face_image(self):
+        if self.__face_image is None:
+            self.__face_image = self.game.getCardFaceImage(
+                self.deck, self.suit, self.rank)
+        return self.__face_image
+
     def _setImage(self, image):
         if image is not self._active_image:
             self.item.config(image=image)
@@ -99,11 +113,11 @@ class _OneImageCard(_HideableCard):
         self.x = self.x + dx
         self.y = self.y + dy
         item = self.item
-        item.canvas.tk.call(item.canvas._w, "move", item.id, dx, dy)
+        item.canvas._command("move", item.id, dx, dy)
 
     # for resize
     def update(self, id, deck, suit, rank, game):
-        self._face_image = game.getCardFaceImage(deck, suit, rank)
+        self.__face_image = None
         self._back_image = game.getCardBackImage(deck, suit, rank)
         self._shade_image = game.getCardShadeImage()
         if self.face_up:
@@ -124,7 +138,8 @@ class _OneImageCardWithHideByConfig(_OneImageCard):
     def hide(self, stack):
         if stack is self.hide_stack:
             return
-        self._setImage(image=None)
+        if not self.isAnimating():
+            self._setImage(image=None)
         self.hide_stack = stack
 
     def unhide(self):
@@ -137,6 +152,10 @@ class _OneImageCardWithHideByConfig(_OneImageCard):
         self.hide_stack = None
         return 1
 
+    def rehide(self):
+        if self.hide_stack is not None:
+            self._setImage(image=None)
+
     #
     # much like in _OneImageCard
     #
@@ -1,10 +1,30 @@
+import threading
+
 from pysollib.mygettext import _
 from pysollib.settings import TITLE
 from pysollib.ui.tktile.tkconst import EVENT_HANDLED
+from pysollib.ui.tktile.tkutil import after, after_cancel
 
 from six.moves import tkinter
 
 
+class SolverProgress:
+    # passed to the solver instead of the dialog: the solver thread stores
+    # its progress here and the dialog picks it up from the Tk thread
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._text = {}
+
+    def setText(self, **kw):
+        with self._lock:
+            self._text.update(kw)
+
+    def pop(self):
+        with self._lock:
+            text, self._text = self._text, {}
+        return text
+
+
 class BaseSolverDialog:
     def _ToggleShowProgressButton(self, *args):
         self.app.opt.solver_show_progress = self.progress_var.get()
@@ -23,8 +43,13 @@ class BaseSolverDialog:
         self.app.opt.solver_preset = self.preset_var.get()
 
     def __init__(self, parent, app, **kw):
+        global solver_dialog
+        solver_dialog = self
         self.parent = parent
         self.app = app
+        self.solver = None
+        self.solver_thread = None
+        self.solver_timer = None
         title = _('%(app)s - FreeCell Solver') % {'app': TITLE}
         kw = self.initKw(kw)
         self._calc_MfxDialog().__init__(
@@ -136,6 +161,7 @@ class BaseSolverDialog:
         elif button == 3:
             global solver_dialog
             solver_dialog = None
+            self.stopSolving(poll=False)
             self.destroy()
         return EVENT_HANDLED
 
@@ -159,26 +185,79 @@ class BaseSolverDialog:
         self.top.update_idletasks()
 
     def reset(self):
+        # the position changed, a running search is of no use anymore
+        self.stopSolving()
         self.play_button.config(state='disabled')
 
     def startSolving(self):
-        from pysollib.mygettext import ungettext
-
+        if self.solver_thread:
+            # the Start button is a Stop button while solving
+            self.stopSolving()
+            return
         self._reset()
         game = self.app.game
-        solver = game.Solver_Class(game, self)  # create solver instance
-        game.solver = solver
+        progress = SolverProgress()
+        solver = game.Solver_Class(game, progress)  # create solver instance
         preset = self.preset_var.get()
         max_iters = self._getMaxIters()
-        progress = self.app.opt.solver_show_progress
+        show_progress = self.app.opt.solver_show_progress
         iters_step = self.app.opt.solver_iterations_output_step
-        solver.config(preset=preset, max_iters=max_iters, progress=progress,
-                      iters_step=iters_step)
+        solver.config(preset=preset, max_iters=max_iters,
+                      progress=show_progress, iters_step=iters_step)
+        # the solver thread must not touch the game, which may be
+        # destructed while it runs: all it needs is read here
+        solver.readGame()
+        self.solver = solver
+        self.solver_progress = progress
+        self.solver_error = None
+        self.solver_thread = threading.Thread(
+            target=self._solverThread, args=(solver,))
+        self.solver_thread.daemon = True
+        self.solver_thread.start()
+        self.start_button.config(text=_('Stop'))
+        self.solver_timer = after(self.top, 100, self._pollSolver)
+
+    def stopSolving(self, poll=True):
+        # poll=False: the dialog goes away, stop polling the solver too
+        if self.solver_thread:
+            self.solver.cancel()
+        if not poll:
+            after_cancel(self.solver_timer)
+            self.solver_timer = None
+
+    def _solverThread(self, solver):
         try:
             solver.computeHints()
-        except RuntimeError:
+        except Exception as err:
+            self.solver_error = err
+
+    def _pollSolver(self):
+        self.setText(**self.solver_progress.pop())
+        if self.solver_thread.is_alive():
+            self.solver_timer = after(self.top, 100, self._pollSolver)
+            return
+        self.solver_timer = None
+        self.solver_thread = None
+        self.start_button.config(text=_('Start'))
+        self._showResult(self.solver)
+
+    def _showResult(self, solver):
+        from pysollib.mygettext import ungettext
+
+        if isinstance(self.solver_error, RuntimeError):
             self.result_label['text'] = _('Solver not found in the PATH')
             return
+        if self.solver_error:
+            self.result_label['text'] = _('Solver error: %s') % (
+                self.solver_error,)
+            return
+        if solver.solver_state == 'cancelled':
+            self.result_label['text'] = _('Solver stopped')
+            return
+        game = self.app.game
+        if game is not solver.game:
+            return
+        game.solver = solver
         hints_len = len(solver.hints)-1
         if hints_len > 0:
             if solver.solver_state == 'intractable':
@@ -233,6 +312,7 @@ def connect_game_solver_dialog(game):
 def destroy_solver_dialog():
     global solver_dialog
     try:
+        solver_dialog.stopSolving(poll=False)
         solver_dialog.destroy()
     except Exception:
         # traceback.print_exc()
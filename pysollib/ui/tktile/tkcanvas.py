@@ -21,6 +21,8 @@
 #
 # ---------------------------------------------------------------------------
 
+import contextlib
+
 from pysollib.mfxutil import Image, ImageTk
 from pysollib.ui.tktile.Canvas2 import CanvasText, Group, Line, Rectangle
 from pysollib.ui.tktile.Canvas2 import ImageItem as ImageItem2
@@ -138,6 +140,10 @@ class MfxCanvas(tkinter.Canvas):
         self._text_items = []
         #
         self.xmargin, self.ymargin = 10, 10
+        # the item commands to send, see batch()
+        self.__batch = None
+        self.tk.call('proc', '::mfx_canvas_batch', 'w cmds',
+                     'foreach c $cmds {$w {*}$c}')
         # resize bg image
         self.bind('<Configure>', self.setBackgroundImage)
 
@@ -223,6 +229,7 @@ class MfxCanvas(tkinter.Canvas):
 
     def _create(self, itemType, args, kw):
         # print "_create:", itemType, args, kw
+        self.flushBatch()
         id = tkinter.Canvas._create(self, itemType, args, kw)
         if self.__tops:
             self.tk.call(self._w, "lower", id, self.__tops[0])
@@ -231,16 +238,106 @@ class MfxCanvas(tkinter.Canvas):
     def tag_raise(self, id, aboveThis=None):
         # print "tag_raise:", id, aboveThis
         if aboveThis is None and self.__tops:
-            self.tk.call(self._w, "lower", id, self.__tops[0])
+            self._command("lower", id, self.__tops[0])
         else:
-            self.tk.call(self._w, "raise", id, aboveThis)
+            self._command("raise", id, aboveThis)
 
     def tag_lower(self, id, belowThis=None):
         # print "tag_lower:", id, belowThis
         if belowThis is None and self.__tiles:
-            self.tk.call(self._w, "raise", id, self.__tiles[-1])
+            self._command("raise", id, self.__tiles[-1])
         else:
-            self.tk.call(self._w, "lower", id, belowThis)
+            self._command("lower", id, belowThis)
+
+    #
+    # batched item commands
+    #
+
+    @contextlib.contextmanager
+    def batch(self):
+        # Within the block the commands that change the items (move,
+        # raise, lower, coords and itemconfigure) are collected and sent
+        # to Tk in one call at the end, instead of one call each.  The
+        # other commands send the collected ones first, so the order of
+        # the commands is kept.
+        if self.__batch is not None:
+            yield
+            return
+        self.__batch = []
+        try:
+            yield
+        finally:
+            self.flushBatch()
+            self.__batch = None
+
+    def flushBatch(self):
+        if self.__batch:
+            batch, self.__batch = self.__batch, []
+            self.tk.call('::mfx_canvas_batch', self._w, tuple(batch))
+
+    def _command(self, *args):
+        while args[-1] is None:
+            args = args[:-1]
+        if self.__batch is None:
+            return self.tk.call((self._w,) + args)
+        self.__batch.append(args)
+
+    def move(self, *args):
+        self._command('move', *args)
+
+    def coords(self, *args):
+        if len(args) > 1 and self.__batch is not None:
+            self._command('coords', *tkinter._flatten(args))
+            return None
+        self.flushBatch()
+        return tkinter.Canvas.coords(self, *args)
+
+    def itemconfigure(self, tagOrId, cnf=None, **kw):
+        if self.__batch is None or (cnf is None and not kw) or \
+                isinstance(cnf, str):
+            self.flushBatch()
+            return tkinter.Canvas.itemconfigure(self, tagOrId, cnf, **kw)
+        self._command('itemconfigure', tagOrId, *self._options(cnf, kw))
+
+    itemconfig = itemconfigure
+
+    # the other item commands
+
+    def _do(self, name, args=()):
+        self.flushBatch()
+        return tkinter.Canvas._do(self, name, args)
+
+    def addtag(self, *args):
+        self.flushBatch()
+        tkinter.Canvas.addtag(self, *args)
+
+    def bbox(self, *args):
+        self.flushBatch()
+        return tkinter.Canvas.bbox(self, *args)
+
+    def delete(self, *args):
+        self.flushBatch()
+        tkinter.Canvas.delete(self, *args)
+
+    def dtag(self, *args):
+        self.flushBatch()
+        tkinter.Canvas.dtag(self, *args)
+
+    def find(self, *args):
+        self.flushBatch()
+        return tkinter.Canvas.find(self, *args)
+
+    def gettags(self, *args):
+        self.flushBatch()
+        return tkinter.Canvas.gettags(self, *args)
+
+    def itemcget(self, tagOrId, option):
+        self.flushBatch()
+        return tkinter.Canvas.itemcget(self, tagOrId, option)
+
+    def update_idletasks(self):
+        self.flushBatch()
+        tkinter.Canvas.update_idletasks(self)
 
     def setInitialSize(self, width, height, margins=True, scrollregion=True):
         # print 'Canvas.setInitialSize:', width, height, scrollregion
@@ -251,17 +251,7 @@ if Image:
         def __init__(self, file=None, image=None, pil_image_orig=None):
 
             if file:
-                image = Image.open(file).convert('RGBA')
-
-                basename = os.path.basename(file)
-                file_name = os.path.splitext(basename)[0]
-
-                findsum = findfile(file_name)
-
-                if findsum != -3:  # -1 for every check
-                    image = masking(image)
-
-                    image.filename = file_name
+                image = decodeImage(file)
 
             ImageTk.PhotoImage.__init__(self, image)
             self._pil_image = image
@@ -306,6 +296,26 @@ if Image:
             return PIL_Image(image=im, pil_image_orig=self._pil_image_orig)
 
 
+def decodeImage(file):
+    """Read an image file with PIL for makeImage(pil_image=...), or
+    return None without PIL.  This does not need Tk, so it can run on
+    any thread."""
+    if not Image:
+        return None
+    image = Image.open(file).convert('RGBA')
+
+    basename = os.path.basename(file)
+    file_name = os.path.splitext(basename)[0]
+
+    findsum = findfile(file_name)
+
+    if findsum != -3:  # -1 for every check
+        image = masking(image)
+
+        image.filename = file_name
+    return image
+
+
 def masking(image):
 
     # eliminates the 0 in alphachannel
@@ -334,7 +344,11 @@ def findfile(file_name):
     return findsum
 
 
-def makeImage(file=None, data=None, dither=None, alpha=None):
+def makeImage(file=None, data=None, dither=None, alpha=None,
+              pil_image=None, pil_image_orig=None):
+    if pil_image is not None:
+        # see decodeImage() and ScaledImageCache
+        return PIL_Image(image=pil_image, pil_image_orig=pil_image_orig)
     kw = {}
     if data is None:
         assert file is not None
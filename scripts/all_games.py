@@ -7,12 +7,9 @@ import sys
 import time
 
 # from pprint import pprint
-import pysollib.games
-import pysollib.games.mahjongg  # noqa: F401
-import pysollib.games.special
-import pysollib.games.ultra  # noqa: F401
 from pysollib.gamedb import GAME_DB
 from pysollib.gamedb import GI
+from pysollib.gamedb import loadAllGames
 from pysollib.mfxutil import latin1_normalize
 from pysollib.mygettext import fix_gettext
 from pysollib.resource import CSI
@@ -21,6 +18,7 @@ from six.moves import builtins
 os.environ['LANG'] = 'C'
 builtins.__dict__['_'] = lambda x: x
 builtins.__dict__['n_'] = lambda x: x
+loadAllGames()
 
 pysollib_path = os.path.join(sys.path[0], '..')
 sys.path[0] = os.path.normpath(pysollib_path)
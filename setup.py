@@ -81,7 +81,7 @@ kw = {
     ],
     'long_description': long_description,
     'license': 'GPL',
-    'scripts': ['pysol.py'],
+    'scripts': ['pysol.py', 'pysol_survey.py'],
     'packages': ['pysollib',
                  'pysollib.winsystems',
                  'pysollib.tk',
@@ -90,6 +90,7 @@ kw = {
                  'pysollib.ui',
                  'pysollib.ui.tktile',
                  'pysollib.kivy',
+                 'pysollib.null',
                  'pysollib.game',
                  'pysollib.games',
                  'pysollib.games.special',
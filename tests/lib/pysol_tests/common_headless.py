@@ -0,0 +1,16 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import subprocess
+import sys
+
+# The toolkit is chosen when pysollib.pysoltk is first imported, which
+# the other tests have already done in this process, so the scripts
+# that need the null toolkit run in a new interpreter.
+HEADER = "import pysollib.null.headless  # noqa: F401\n"
+
+
+def run_headless(script, *args):
+    """Run script, with the null toolkit, and return its output."""
+    out = subprocess.check_output(
+        [sys.executable, "-c", HEADER + script] + list(args))
+    return out.decode('utf-8')
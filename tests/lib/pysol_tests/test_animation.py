@@ -0,0 +1,105 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from pysollib.game.animation import CardAnimator
+
+
+class Item:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+    def move(self, dx, dy):
+        self.x += dx
+        self.y += dy
+
+    def delete(self):
+        self.deleted = True
+
+
+class Card:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+        self.item = Item(x, y)
+        self.rehidden = 0
+
+    def rehide(self):
+        self.rehidden += 1
+
+    def moveTo(self, x, y):
+        # like Card.moveBy(): the item moves along
+        self.item.move(x - self.x, y - self.y)
+        self.x, self.y = x, y
+
+
+class Widget:
+    def __init__(self):
+        self.timers = []
+
+    def after(self, ms, func):
+        self.timers.append(func)
+        return func
+
+    def after_cancel(self, timer):
+        self.timers.remove(timer)
+
+
+class CardAnimatorTests(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.widget = Widget()
+        self.animator = CardAnimator(self.widget, clock=lambda: self.now)
+
+    def _move(self, cards, x, y, duration=1.0, shadows=()):
+        starts = [(c.x, c.y) for c in cards]
+        for c in cards:
+            c.moveTo(x, y)
+        self.animator.add(cards, starts, duration, shadows)
+
+    def _tick(self, now):
+        self.now = now
+        self.widget.timers.pop(0)()
+
+    def test_concurrent(self):
+        cards = [Card(0, 0), Card(100, 0)]
+        shadow = Item(0, 0)
+        self._move(cards[:1], 0, 100, shadows=(shadow,))
+        self._move(cards[1:], 100, 200, duration=2.0)
+        # the cards are in their places, their items are not
+        self.assertEqual((cards[0].x, cards[0].y), (0, 100))
+        self.assertEqual((cards[0].item.x, cards[0].item.y), (0, 0))
+        self.assertEqual(len(self.widget.timers), 1)
+        self._tick(0.5)
+        self.assertEqual(cards[0].item.y, 50)
+        self.assertEqual(cards[1].item.y, 50)
+        self.assertEqual(shadow.y, 50)
+        self._tick(1.0)
+        self.assertEqual(cards[0].item.y, 100)
+        self.assertTrue(shadow.deleted)
+        self.assertTrue(self.animator.isAnimating(cards[1]))
+        self.assertFalse(self.animator.isAnimating(cards[0]))
+        self.assertEqual([c.rehidden for c in cards], [1, 0])
+        # a late frame is dropped, not drawn
+        self._tick(1.5)
+        self.assertEqual(cards[1].item.y, 150)
+        self.assertGreater(self.animator.dropped, 0)
+        self._tick(2.5)
+        self.assertEqual(cards[1].item.y, 200)
+        self.assertEqual(self.widget.timers, [])
+        self.assertFalse(self.animator.isAnimating())
+        self.assertEqual([c.rehidden for c in cards], [1, 1])
+
+    def test_queued_and_finish(self):
+        card = Card(0, 0)
+        self._move([card], 100, 0)
+        self._move([card], 100, 100)
+        self._tick(0.5)
+        self.assertEqual((card.item.x, card.item.y), (50, 0))
+        self._tick(1.5)
+        self.assertEqual((card.item.x, card.item.y), (100, 50))
+        # a new action: everything in its place
+        self.animator.finish()
+        self.assertEqual((card.item.x, card.item.y), (100, 100))
+        self.assertEqual(card.rehidden, 1)
+        self.assertEqual(self.widget.timers, [])
+        self.assertFalse(self.animator.isAnimating())
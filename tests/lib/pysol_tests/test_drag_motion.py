@@ -0,0 +1,24 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+app = HeadlessApp()
+game = app.startGame(2, 12345, autoplay=0)
+drag = game.drag
+stack = game.s.rows[0]
+# a drag that ended: the counters start again for the next one
+drag.motion_events, drag.motion_time, drag.motion_max = 10, 0.05, 0.02
+stack._stopDrag()
+assert (drag.motion_events, drag.motion_time, drag.motion_max) == (0, 0, 0)
+print("ok")
+'''
+
+
+class DragMotionTests(unittest.TestCase):
+    def test_reset(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
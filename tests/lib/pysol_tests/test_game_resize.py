@@ -0,0 +1,60 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+app = HeadlessApp()
+game = app.startGame(2, 12345, autoplay=0)
+# the headless games are previews, which are not resized
+game.preview = 0
+timers = {}
+resizes = []
+
+
+def after(ms, func):
+    timers[func.__name__] = ms
+    return func.__name__
+
+
+def after_cancel(id):
+    del timers[id]
+
+
+def fire(name):
+    func = getattr(game, name)
+    del timers[name]
+    func()
+
+
+game.canvas.after = after
+game.canvas.after_cancel = after_cancel
+game.resizeGame = lambda draft=False: resizes.append(draft)
+# one event: one full resize
+game._configureHandler()
+assert timers == {'_resizeHandler': 250}, timers
+fire('_resizeHandler')
+assert resizes == [False]
+# a burst: drafts in between, then one full resize
+del resizes[:]
+for i in range(3):
+    game._configureHandler()
+assert timers == {'_resizeHandler': 250, '_resizeDraftHandler': 100}
+fire('_resizeDraftHandler')
+game._configureHandler()
+game._configureHandler()
+fire('_resizeDraftHandler')
+game._configureHandler()
+fire('_resizeHandler')
+assert timers == {}, timers
+assert resizes == [True, True, False], resizes
+print("ok")
+'''
+
+
+class GameResizeTests(unittest.TestCase):
+    def test_configure(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
@@ -0,0 +1,54 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import os
+import tempfile
+import unittest
+
+from .common_headless import run_headless
+
+# each run needs an empty games database, so a new interpreter
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+import sys
+
+from pysollib.gamedb import GAME_DB, loadAllGames
+
+loadAllGames(sys.argv[1])
+modules = [m for m in sys.modules if m.startswith("pysollib.games.")]
+print(len(modules))
+for gameid in GAME_DB.getGamesIdSortedById():
+    gi = GAME_DB.get(gameid)
+    si = sorted(gi.si.__dict__.items())
+    print(gameid, repr((gi.name, gi.short_name, gi.altnames, gi.decks,
+                        gi.redeals, gi.ncards, gi.category, gi.suits,
+                        gi.ranks, gi.trumps, gi.rules_filename, si)))
+print(GAME_DB.getGamesIdSortedByName())
+print(GAME_DB.getGamesForSolver())
+# Klondike, Mahjongg Altar, Three Peaks (Scored)
+app = HeadlessApp()
+for gameid in (2, 5001, 22216):
+    game = app.startGame(gameid, 12345, autoplay=0)
+    assert game.id == gameid
+    print(type(game).__name__)
+'''
+
+
+class GameIndexTests(unittest.TestCase):
+    def _run(self, filename):
+        return run_headless(SCRIPT, filename)
+
+    def test_index(self):
+        filename = os.path.join(tempfile.mkdtemp(), "games.json")
+        # the first run imports the games and writes the index
+        first = self._run(filename).split('\n', 1)
+        self.assertTrue(os.path.exists(filename))
+        self.assertNotEqual(first[0], "0")
+        # the next one only imports the modules of the games played
+        second = self._run(filename).split('\n', 1)
+        self.assertEqual(second[0], "0")
+        self.assertEqual(second[1], first[1])
+        # an out of date index is written again
+        with open(filename, "w") as f:
+            f.write('{"key": [], "games": []}')
+        self.assertEqual(self._run(filename), "\n".join(first))
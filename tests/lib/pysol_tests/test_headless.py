@@ -0,0 +1,46 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+app = HeadlessApp()
+
+
+def layout(game):
+    return [[(c.id, c.face_up) for c in s.cards] for s in game.allstacks]
+
+
+# Klondike
+game = app.startGame(2, 12345, autoplay=0)
+first = layout(game)
+assert len(game.s.talon.cards) == 23
+# same seed, same deal
+game = app.startGame(2, 12345, autoplay=0)
+assert layout(game) == first
+talon, waste = game.s.talon, game.s.waste
+game.dealCards()
+assert len(waste.cards) == 2 and waste.cards[-1].face_up
+game.undo()
+assert layout(game) == first
+game.redo()
+second = layout(game)
+# any legal single card move
+move = [(f, t) for f in game.allstacks for t in game.allstacks
+        if f is not t and f.cards and f.canMoveCards(f.cards[-1:]) and
+        t.acceptsCards(f, f.cards[-1:])][0]
+game.moveMove(1, move[0], move[1])
+game.finishMove()
+assert layout(game) != second
+game.undo()
+assert layout(game) == second
+print("ok")
+'''
+
+
+class HeadlessTests(unittest.TestCase):
+    def test_klondike(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
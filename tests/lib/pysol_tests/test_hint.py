@@ -1,5 +1,8 @@
 # Written by Shlomi Fish, under the MIT Expat License.
 
+import os
+import threading
+import time
 import unittest
 
 from pysollib.acard import AbstractCard
@@ -20,3 +23,49 @@ class HintTests(unittest.TestCase):
         # TEST
         self.assertEqual(got, '8D', 'card2str2 works')
         # diag('got == ' + got)
+
+    def test_run_solver_streams_output(self):
+        if os.name == 'nt':
+            return
+        h = Base_Solver_Hint(None, None, base_rank=0)
+        pout, perr = h.run_solver('cat', 'FC: - - - -\nJD KD\n')
+        lines = [line for line in pout]
+        pout.close()
+        perr.close()
+        # TEST
+        self.assertEqual(lines, [b'FC: - - - -\n', b'JD KD\n'])
+
+    def test_cancel_kills_solver(self):
+        if os.name == 'nt':
+            return
+        h = Base_Solver_Hint(None, None, base_rank=0)
+        start = time.time()
+        pout, perr = h.run_solver('sleep 30; echo done', '')
+        threading.Timer(0.2, h.cancel).start()
+        lines = [line for line in pout]
+        pout.close()
+        # TEST
+        self.assertEqual(lines, [])
+        self.assertTrue(h.isCancelled())
+        self.assertTrue(time.time() - start < 10)
+
+    def test_missing_solver(self):
+        if os.name == 'nt':
+            return
+        h = Base_Solver_Hint(None, None, base_rank=0)
+        pout, perr = h.run_solver('no-such-solver-command-xyz', '')
+        # TEST
+        self.assertRaises(RuntimeError, pout.read)
+        pout.close()
+
+    def test_solver_stderr_does_not_block(self):
+        if os.name == 'nt':
+            return
+        h = Base_Solver_Hint(None, None, base_rank=0)
+        # more than a pipe buffer on stderr before any output
+        pout, perr = h.run_solver(
+            'head -c 1000000 /dev/zero >&2; echo done', '')
+        lines = [line for line in pout]
+        pout.close()
+        # TEST
+        self.assertEqual(lines, [b'done\n'])
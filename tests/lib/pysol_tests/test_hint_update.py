@@ -0,0 +1,55 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+app = HeadlessApp()
+
+
+def hints(game, incremental):
+    h = game.getHintClass()(game, 2)
+    h.incremental = incremental
+    h.scored = 0
+    score = h.step010_scorePile
+
+    def counting_score(*args):
+        h.scored += 1
+        return score(*args)
+    h.step010_scorePile = counting_score
+    hints = [(x[0], x[1], x[2], x[3].id, x[4] and x[4].id)
+             for x in h.getHints()]
+    return hints, h.scored
+
+
+# Spider
+game = app.startGame(11, 12345, autoplay=0)
+rows = game.s.rows
+first, scored = hints(game, True)
+assert scored == len(rows) * len(rows)
+assert hints(game, False) == (first, scored)
+move = [(r, t) for r in rows for t in rows
+        if r is not t and t.cards and r.cards[-1].face_up and
+        t.acceptsCards(r, r.cards[-1:])][0]
+game.moveMove(1, move[0], move[1])
+if move[0].canFlipCard():
+    game.flipMove(move[0])
+game.finishMove()
+full, scored = hints(game, False)
+assert full != first
+inc, rescored = hints(game, True)
+assert inc == full
+# only the piles from or to the two rows were scored again
+assert rescored == 4 * len(rows) - 4
+game.undo()
+assert hints(game, True)[0] == hints(game, False)[0] == first
+print("ok")
+'''
+
+
+class HintUpdateTests(unittest.TestCase):
+    def test_incremental_hints(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
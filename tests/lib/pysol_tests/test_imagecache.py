@@ -0,0 +1,49 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from pysollib.imagecache import ScaledImageCache
+
+
+class ScaledImageCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = ScaledImageCache(os.path.join(self.dir, "scaled"))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_get_put(self):
+        cache = self.cache
+        group = cache.makeKey('123-dondorf', (118, 184), 1)
+        self.assertNotEqual(group, cache.makeKey('123-dondorf', (118, 184), 0))
+        self.assertIsNone(cache.get(group, '01c', (118, 184)))
+        im = Image.new('RGBA', (118, 184), (10, 20, 30, 40))
+        cache.put(group, '01c', (118, 184), im)
+        im2 = cache.get(group, '01c', (118, 184))
+        self.assertEqual(im2.mode, 'RGBA')
+        self.assertEqual(list(im2.getdata()), list(im.getdata()))
+        self.assertIsNone(cache.get(group, '01c', (119, 184)))
+        cache.clear()
+        self.assertIsNone(cache.get(group, '01c', (118, 184)))
+
+    def test_evict(self):
+        cache = self.cache
+        groups = []
+        for i in range(3):
+            group = cache.makeKey('123-dondorf', (i, i), 1)
+            cache.put(group, '01c', (50, 50), Image.new('RGBA', (50, 50)))
+            os.utime(os.path.join(cache.dirname, group), (i, i))
+            groups.append(group)
+        size = os.path.getsize(os.path.join(cache.dirname, group,
+                                            '01c-50x50.png'))
+        cache.max_size = 2 * size
+        # the least recently used group goes first, the used one stays
+        cache.evict(groups[0])
+        self.assertEqual(sorted(os.listdir(cache.dirname)),
+                         sorted([groups[0], groups[2]]))
@@ -0,0 +1,51 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from PIL import Image, ImageDraw
+
+from pysollib.images import Images
+
+
+def card(w, h, color):
+    # a card with round corners
+    im = Image.new('RGBA', (w, h))
+    ImageDraw.Draw(im).rounded_rectangle((0, 0, w-1, h-1), 6, fill=color)
+    return im
+
+
+def oldShadow(pieces, w, h, sx, sy):
+    # the shadow as the RGBA images were composed before
+    mask = Image.new('RGBA', (w, h))
+    for im, x, y in pieces:
+        mask.paste(im, (x, y), im)
+    shadow = Image.new('RGBA', (w, h))
+    shadow.paste((0x00, 0x00, 0x00, 0x50), (0, 0, w, h), mask)
+    mask = mask.crop((sx, sy, w, h))
+    tmp = Image.new('RGBA', (w-sx, h-sy))
+    shadow.paste(tmp, (0, 0), mask)
+    return shadow
+
+
+class ShadowTests(unittest.TestCase):
+    def test_compose(self):
+        face, back = card(71, 96, (255, 0, 0, 255)), card(71, 96, 'blue')
+        # a fanned run, a pile going up and left, and a single card
+        for pieces, w, h in (
+                ([(back, 0, 0), (back, 0, 6)] +
+                 [(face, 0, 12 + 25 * i) for i in range(12)], 71, 383),
+                ([(face, 36, 20), (face, 18, 10), (face, 0, 0)], 107, 116),
+                ([(face, 0, 0)], 71, 96)):
+            new = Images.composeShadowPIL(pieces, w, h, 7, 7)
+            self.assertEqual(new.mode, 'RGBA')
+            self.assertEqual(list(new.getdata()),
+                             list(oldShadow(pieces, w, h, 7, 7).getdata()))
+
+
+class ResizeTests(unittest.TestCase):
+    def test_draft_cleared(self):
+        images = Images(None, None)
+        # a draft resize, then the full one at the same size
+        images._draft = True
+        images.resize(1.0, 1.0, resample=0)
+        self.assertFalse(images._draft)
@@ -0,0 +1,163 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+import os
+import tempfile
+
+from pysollib.game.journal import MoveJournal
+from pysollib.game.savefile import SaveFileReader
+
+app = HeadlessApp()
+filename = os.path.join(tempfile.mkdtemp(), "journal.dat")
+app.journal = MoveJournal(filename)
+
+
+def state(game):
+    return ([[(c.id, c.face_up) for c in s.cards] for s in game.allstacks],
+            game.moves.index, len(game.moves.history))
+
+
+def play(game, n):
+    for i in range(n):
+        hints = game.getHints(0)
+        if hints and hints[0][4] is not None:
+            game.moveMove(hints[0][2], hints[0][3], hints[0][4])
+            if hints[0][3].canFlipCard():
+                game.flipMove(hints[0][3])
+        elif game.canDealCards():
+            game.dealCards()
+        else:
+            break
+        game.finishMove()
+
+
+def recover(gameid):
+    base, records = app.journal.read()
+    game = app.createGame(gameid)
+    loaded = game._undumpGame(SaveFileReader(base), app)
+    game.restoreGame(loaded)
+    game.replayJournal(records)
+    return game
+
+
+# Klondike, Lara's Game, Three Peaks (Scored) - which cannot undo
+for gameid in (2, 37, 22216):
+    game = app.startGame(gameid, 12345, autoplay=0)
+    play(game, 20)
+    if game.canUndo():
+        for i in range(5):
+            game.undo()
+        game.redo()
+        play(game, 3)
+        game.undo()
+    assert game.moves.index > 0
+    other = recover(gameid)
+    assert state(other) == state(game), gameid
+    assert other.stats.player_moves == game.stats.player_moves
+    # the recovered game goes on with a journal of its own
+    play(other, 1)
+    assert state(recover(gameid)) == state(other)
+
+# a record cut off by a crash is dropped
+game = app.startGame(2, 12345, autoplay=0)
+play(game, 3)
+before = state(game)
+play(game, 1)
+app.journal.close()
+with open(filename, "r+b") as f:
+    f.truncate(os.path.getsize(filename) - 1)
+assert state(recover(2)) == before
+app.journal.close(remove=True)
+assert app.journal.read() is None
+
+# the rest of the records is synced when the game goes idle
+game = app.startGame(2, 12345, autoplay=0)
+play(game, 3)
+assert app.journal._pending
+game.syncJournal()
+assert not app.journal._pending
+
+# the demo moves are not journaled, the journal keeps the game from
+# before the demo
+before = state(game)
+game.startDemo()
+assert state(recover(2)) == before
+for i in range(3):
+    game.playOneDemoMove(game.demo)
+    game.finishMove()
+assert state(recover(2)) == before
+game.stopDemo()
+play(game, 2)
+other = recover(2)
+assert state(other) == state(game)
+assert other.stats.player_moves == game.stats.player_moves
+print("ok")
+'''
+
+# leaves the journal of a game in progress behind
+WRITE_SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+import sys
+
+from pysollib.game.journal import MoveJournal
+
+app = HeadlessApp()
+app.journal = MoveJournal(sys.argv[1])
+game = app.startGame(2, 12345, autoplay=0)
+game.dealCards()
+game.finishMove()
+print("ok")
+'''
+
+# Application needs the tk toolkit, which works without a display until
+# the main window is built
+LOAD_SCRIPT = '''
+import sys
+
+from pysollib.app import Application
+from pysollib.game.journal import MoveJournal
+from pysollib.gamedb import GAME_DB, loadAllGames
+
+loadAllGames()
+app = Application()
+app.gdb = GAME_DB
+app.journal = MoveJournal(sys.argv[1])
+app.commandline.loadgame = sys.argv[2] or None
+app._load_journal(app.constructGame(2))
+print(app.nextgame.loadedgame is not None, app.nextgame.journal is not None)
+'''
+
+
+class JournalTests(unittest.TestCase):
+    def test_recover(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
+
+    def _load(self, filename, loadgame):
+        o = subprocess.check_output(
+            [sys.executable, "-c", LOAD_SCRIPT, filename, loadgame])
+        return o.decode('utf-8').split()
+
+    def test_commandline(self):
+        dirname = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(dirname, "journal.dat")
+            self.assertEqual(
+                run_headless(WRITE_SCRIPT, filename).strip(), "ok")
+            self.assertEqual(self._load(filename, ""), ["True", "True"])
+            # a game to load given on the command line comes first
+            self.assertEqual(
+                self._load(filename, "game.pso"), ["False", "False"])
+        finally:
+            shutil.rmtree(dirname)
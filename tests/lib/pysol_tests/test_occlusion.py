@@ -0,0 +1,102 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import random
+import unittest
+
+from pysollib.game.occlusion import _isCovered
+
+from .common_headless import run_headless
+
+# the hidden tiles of Mahjongg layouts, checked against the covered
+# pixels found row by row
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+app = HeadlessApp()
+w, h = app.images.getSize()
+
+
+def shape(stack, card):
+    ox, oy = stack.CARD_XOFFSET[0], stack.CARD_YOFFSET[0]
+    x0, y0 = card.x + max(ox, 0), card.y + max(oy, 0)
+    x1, y1 = card.x + w + min(ox, 0), card.y + h + min(oy, 0)
+    return [(x0, y0, x1, y1), (x0 - ox, y0 - oy, x1 - ox, y1 - oy)]
+
+
+def covered(rect, rects):
+    for y in range(rect[1], rect[3]):
+        x = rect[0]
+        for r in sorted(r for r in rects if r[1] <= y < r[3]):
+            if r[0] <= x:
+                x = max(x, r[2])
+        if x < rect[2]:
+            return False
+    return True
+
+
+def check(game):
+    rows = game.s.rows
+    hidden = 0
+    for i, stack in enumerate(rows):
+        for card in stack.cards:
+            rects = []
+            for other in rows[i + 1:]:
+                for c in other.cards:
+                    rects.extend(shape(other, c))
+            expected = all(covered(r, rects) for r in shape(stack, card))
+            assert card.isHidden() == expected, (stack.id, expected)
+            hidden += expected
+    return hidden
+
+
+def play(game, n):
+    for i in range(n):
+        hints = game.getHints(0)
+        if not hints:
+            break
+        hints[0][3].moveMove(hints[0][2], hints[0][4])
+        game.finishMove()
+
+
+# Mahjongg Altar, Arrow and Double Mahjongg Faro (288 tiles)
+for gameid in (5001, 5004, 5801):
+    game = app.startGame(gameid, 12345, autoplay=0)
+    dealt = check(game)
+    assert dealt > 0, gameid
+    play(game, 30)
+    assert check(game) < dealt, gameid
+    while game.moves.index:
+        game.undo()
+    assert check(game) == dealt, gameid
+    # the stacks are moved
+    for s in game.s.rows:
+        s.resize(0.5, 0.5)
+    game.occlusion.build()
+    check(game)
+print("ok")
+'''
+
+
+class CoveredTests(unittest.TestCase):
+    def test_random(self):
+        rand = random.Random(1)
+        for i in range(300):
+            rects = []
+            for j in range(rand.randint(0, 6)):
+                x, y = rand.randint(0, 8), rand.randint(0, 8)
+                rects.append((x, y, x + rand.randint(1, 8),
+                              y + rand.randint(1, 8)))
+            x, y = rand.randint(0, 8), rand.randint(0, 8)
+            rect = (x, y, x + rand.randint(1, 6), y + rand.randint(1, 6))
+            # every pixel of rect is in one of rects
+            expected = all(
+                any(r[0] <= px < r[2] and r[1] <= py < r[3] for r in rects)
+                for px in range(rect[0], rect[2])
+                for py in range(rect[1], rect[3]))
+            self.assertEqual(_isCovered(rect, rects), expected,
+                             (rect, rects))
+
+
+class MahjonggOcclusionTests(unittest.TestCase):
+    def test_hidden_tiles(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
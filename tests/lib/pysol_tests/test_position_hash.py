@@ -0,0 +1,49 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib.move import hashCards
+from pysollib.null.headless import HeadlessApp
+
+app = HeadlessApp()
+
+
+def full_hash(game):
+    h = 0
+    for s in game.allstacks:
+        h ^= hashCards(s)
+    return h
+
+
+# Klondike
+game = app.startGame(2, 12345, autoplay=0)
+first = game.getSnapshot()
+assert first == full_hash(game) != 0
+for i in range(30):
+    hints = game.getHints(0)
+    if hints and hints[0][4] is not None:
+        game.moveMove(hints[0][2], hints[0][3], hints[0][4])
+        if hints[0][3].canFlipCard():
+            game.flipMove(hints[0][3])
+    else:
+        game.dealCards()
+    game.finishMove()
+    assert game.getSnapshot() == full_hash(game)
+assert game.getSnapshot() != first
+while game.moves.index:
+    game.undo()
+    assert game.getSnapshot() == full_hash(game)
+assert game.getSnapshot() == first
+# redealing restores the hash of the deal
+game = app.startGame(2, 12345, autoplay=0)
+assert game.getSnapshot() == first
+print("ok")
+'''
+
+
+class PositionHashTests(unittest.TestCase):
+    def test_snapshot(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
@@ -0,0 +1,142 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import threading
+import unittest
+
+from pysollib.mfxutil import Struct
+from pysollib.pysolaudio import AbstractAudioClient, AudioClientProxy
+
+
+class BrokenClient(AbstractAudioClient):
+    def startServer(self):
+        raise RuntimeError("no audio device")
+
+
+class SlowClient(AbstractAudioClient):
+    EXTENSIONS = r"\.((ogg))$"
+    CAN_PLAY_SOUND = True
+    CAN_PLAY_MUSIC = True
+    ready = None
+
+    def __init__(self):
+        AbstractAudioClient.__init__(self)
+        self.calls = []
+
+    def connectServer(self, app):
+        self.ready.wait()
+        AbstractAudioClient.connectServer(self, app)
+        self.audiodev = self
+
+    def playSample(self, name, priority=0, loop=0, volume=-1):
+        self.calls.append(('playSample', name))
+        return 1
+
+    def playContinuousMusic(self, music_list):
+        self.calls.append(('music', [m.filename for m in music_list]))
+
+    def updateSettings(self):
+        self.calls.append(('updateSettings',))
+
+    def preloadSamples(self, samples):
+        self.calls.append(('preloadSamples', samples))
+
+    def _destroy(self):
+        self.calls.append(('destroy',))
+
+
+class MainThreadClient(AbstractAudioClient):
+    MAIN_THREAD = True
+    threads = None
+    fail = False
+
+    def connectServer(self, app):
+        self.threads.append(threading.current_thread())
+        if self.fail:
+            raise RuntimeError("no audio device")
+        AbstractAudioClient.connectServer(self, app)
+
+
+class AudioClientProxyTests(unittest.TestCase):
+    def _start(self, clients=(BrokenClient, SlowClient)):
+        SlowClient.ready = threading.Event()
+        app = Struct(opt=Struct(sound=1, sound_mode=1), menubar=None)
+        audio = AudioClientProxy(list(clients))
+        audio.connectServer(app)
+        return app, audio
+
+    def test_background(self):
+        app, audio = self._start()
+        # the startup goes on while the client is found
+        self.assertEqual(audio.playSample('drop'), 0)
+        self.assertEqual(audio.getMusicInfo(), -1)
+        audio.updateSettings()
+        audio.playContinuousMusic([Struct(filename='a.ogg'),
+                                   Struct(filename='b.mp3')])
+        audio.preloadSamples(['drop'])
+        self.assertFalse(audio.poll())
+        SlowClient.ready.set()
+        audio._thread.join()
+        # nothing is changed until the main thread polls
+        self.assertIsNone(audio.client)
+        self.assertEqual(app.opt.sound_mode, 1)
+        audio.updateSettings()
+        self.assertTrue(audio.poll())
+        client = audio.client
+        self.assertIsInstance(client, SlowClient)
+        # the last sample is played once the client is there
+        self.assertEqual(client.calls, [('updateSettings',),
+                                        ('music', ['a.ogg']),
+                                        ('preloadSamples', ['drop']),
+                                        ('updateSettings',),
+                                        ('playSample', 'drop')])
+        self.assertEqual(app.opt.sound_mode, 0)
+        self.assertEqual(audio.playSample('drop'), 1)
+        audio.updateSettings()
+        self.assertEqual(client.calls[-2:], [('playSample', 'drop'),
+                                             ('updateSettings',)])
+        audio.destroy()
+        self.assertEqual(client.calls[-1], ('destroy',))
+
+    def test_destroyed_before_ready(self):
+        app, audio = self._start()
+        audio.updateSettings()
+        audio.destroy()
+        SlowClient.ready.set()
+        audio._thread.join()
+        self.assertTrue(audio.poll())
+        self.assertIsNone(audio.client)
+
+    def test_destroyed_before_poll(self):
+        app, audio = self._start()
+        SlowClient.ready.set()
+        audio._thread.join()
+        client = audio._found[0]
+        audio.destroy()
+        self.assertTrue(audio.poll())
+        self.assertIsNone(audio.client)
+        self.assertEqual(client.calls, [('destroy',)])
+
+    def test_main_thread(self):
+        MainThreadClient.threads = []
+        MainThreadClient.fail = False
+        app, audio = self._start([MainThreadClient, SlowClient])
+        audio._thread.join()
+        self.assertEqual(MainThreadClient.threads, [])
+        self.assertTrue(audio.poll())
+        self.assertIsInstance(audio.client, MainThreadClient)
+        self.assertEqual(MainThreadClient.threads,
+                         [threading.current_thread()])
+        audio.destroy()
+
+    def test_main_thread_failed(self):
+        MainThreadClient.threads = []
+        MainThreadClient.fail = True
+        app, audio = self._start([MainThreadClient, SlowClient])
+        audio._thread.join()
+        # the next client is tried on the thread again
+        self.assertFalse(audio.poll())
+        SlowClient.ready.set()
+        audio._thread.join()
+        self.assertTrue(audio.poll())
+        self.assertIsInstance(audio.client, SlowClient)
+        audio.destroy()
@@ -0,0 +1,94 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pysollib.cardsetparser import read_cardset_config
+from pysollib.resource import ResourceIndex
+
+CONFIG_TXT = """\
+PySolFC solitaire cardset;4;.gif;1;52;7
+123-dondorf;Dondorf
+79 123 8
+16 25 7 7
+back01.gif
+back01.gif
+"""
+
+
+class ResourceIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, "resources.dat")
+        self.cardsets = os.path.join(self.dir, "cardsets")
+        self.cardset = os.path.join(self.cardsets, "cardset-dondorf")
+        os.makedirs(self.cardset)
+        self.config_txt = os.path.join(self.cardset, "config.txt")
+        self._write(self.config_txt, CONFIG_TXT, 1000)
+        self._write(os.path.join(self.cardset, "back01.gif"), "", 1000)
+        os.utime(self.cardset, (1000, 1000))
+        self.reads = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, filename, data, mtime):
+        with open(filename, "w") as f:
+            f.write(data)
+        os.utime(filename, (mtime, mtime))
+
+    def _read(self, dirname, config_txt_path):
+        self.reads += 1
+        return read_cardset_config(dirname, config_txt_path).__dict__
+
+    def _restart(self):
+        # a new run of the program
+        index = ResourceIndex(self.filename)
+        index.load()
+        listing = index.listDir(self.cardset)
+        config = index.get(self.cardset, (self.cardset, self.config_txt),
+                           self._read)
+        index.save()
+        return index, listing, config
+
+    def test_index(self):
+        index, listing, config = self._restart()
+        self.assertEqual(listing, (("back01.gif", True),
+                                   ("config.txt", True)))
+        self.assertEqual(config['name'], "Dondorf")
+        self.assertTrue(index.changed)
+        self.assertEqual(self.reads, 1)
+        # nothing changed: nothing is read
+        index, listing2, config2 = self._restart()
+        self.assertFalse(index.changed)
+        self.assertEqual(listing2, listing)
+        self.assertEqual(config2['si'].__dict__, config.pop('si').__dict__)
+        del config2['si']
+        self.assertEqual(config2, config)
+        self.assertEqual(self.reads, 1)
+        # config.txt changed
+        self._write(self.config_txt, CONFIG_TXT.replace("Dondorf\n",
+                                                        "Dondorf 2\n"), 2000)
+        index, listing, config = self._restart()
+        self.assertEqual(config['name'], "Dondorf 2")
+        self.assertEqual(self.reads, 2)
+        # a file was added
+        self._write(os.path.join(self.cardset, "shade.gif"), "", 2000)
+        os.utime(self.cardset, (3000, 3000))
+        index, listing, config = self._restart()
+        self.assertEqual(listing[-1], ("shade.gif", True))
+        self.assertEqual(self.reads, 3)
+        # what is not used any more is dropped
+        index = ResourceIndex(self.filename)
+        index.load()
+        index.get("other", (self.cardsets,), lambda d: 1)
+        index.save()
+        index, listing, config = self._restart()
+        self.assertTrue(index.changed)
+        self.assertEqual(self.reads, 4)
+        # a missing directory is not kept
+        index = ResourceIndex(self.filename)
+        self.assertRaises(EnvironmentError, index.listDir,
+                          os.path.join(self.dir, "missing"))
@@ -0,0 +1,122 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import shutil
+import tempfile
+import unittest
+
+from pysollib.game.savefile import RandomState, SaveFileError, \
+    SaveFileReader, SaveFileWriter, ValueDecoder, encodeValues
+from pysollib.mfxutil import Struct
+
+from .common_headless import run_headless
+
+# saving needs a game
+SCRIPT = '''
+import os
+import sys
+from pickle import Pickler
+
+from six import BytesIO
+
+# selects the null toolkit, so it comes before the other pysollib imports
+from pysollib.null.headless import HeadlessApp
+from pysollib.game.savefile import MAGIC, SaveFileReader
+
+app = HeadlessApp()
+
+
+def layout(game):
+    return [[(c.id, c.face_up) for c in s.cards] for s in game.allstacks]
+
+
+filename = os.path.join(sys.argv[1], "game.pso")
+# Klondike, with a Mersenne Twister seed
+game = app.startGame(2, 123456789012345, autoplay=0)
+first = layout(game)
+for i in range(5):
+    game.dealCards()
+    game.finishMove()
+game.shuffleStackMove(game.s.talon)
+game.finishMove()
+saved = layout(game)
+game._saveGame(filename)
+with open(filename, "rb") as f:
+    data = f.read()
+assert data.startswith(MAGIC)
+loaded = game._loadGame(filename, app)
+game.restoreGame(loaded)
+assert layout(game) == saved
+assert game.moves.index == 6
+# the pickled format of older versions
+reader = SaveFileReader(data)
+f = BytesIO()
+p = Pickler(f, 2)
+while True:
+    v = reader.load()
+    p.dump(v)
+    if v == "EOF":
+        break
+game.restoreGame(game._undumpGame(game._openSaveFile(f.getvalue()), app))
+assert layout(game) == saved
+while game.moves.index:
+    game.undo()
+assert layout(game) == first
+game.redo()
+game.setBookmark(0, confirm=0)
+game.undo()
+game.gotoBookmark(0, confirm=0)
+assert game.moves.index == 1
+print("ok")
+'''
+
+
+class SaveFileTests(unittest.TestCase):
+    def test_values(self):
+        values = [None, True, False, 0, 255, -1, 1 << 40, 1 << 70, -(1 << 70),
+                  0.5, u"\\u00e9t\\u00e9", b"\\x00\\xff", [1, (2, 3)], (),
+                  {1: "a", "b": [None]}]
+        dec = ValueDecoder(encodeValues(*values))
+        self.assertEqual([dec.decode() for v in values], values)
+        self.assertTrue(dec.atEnd())
+        s = ValueDecoder(encodeValues(Struct(base_rank=3))).decode()
+        self.assertEqual(s.base_rank, 3)
+        self.assertRaises(TypeError, encodeValues, object())
+        self.assertRaises(SaveFileError, ValueDecoder(b"s\\x05\\x00").decode)
+
+    def test_random_state(self):
+        class Random:
+            def seed(self):
+                pass
+
+            def getstate(self):
+                return (self.seed, (3, 4))
+
+        random = Random()
+        data = encodeValues(RandomState((12, 34)),
+                            RandomState(random.getstate()))
+        loaded = Random()
+        dec = ValueDecoder(data, loaded)
+        self.assertEqual(dec.decode(), (12, 34))
+        state = dec.decode()
+        # the seed method of the random of the loaded game
+        self.assertIs(state[0].__self__, loaded)
+        self.assertEqual(state[1:], ((3, 4),))
+        # only the states of the random are saved that way
+        self.assertRaises(TypeError, encodeValues, random.seed)
+
+    def test_reader(self):
+        w = SaveFileWriter()
+        w.addValues(b"HEAD", 1, 2)
+        w.dump(7)
+        r = SaveFileReader(w.getvalue())
+        self.assertEqual(sorted(r.sections), [b"HEAD", b"HOOK"])
+        self.assertRaises(SaveFileError, SaveFileReader, b"\\x80\\x02")
+        self.assertRaises(SaveFileError, SaveFileReader, w.getvalue()[:-1])
+
+    def test_save_game(self):
+        dirname = tempfile.mkdtemp()
+        try:
+            o = run_headless(SCRIPT, dirname)
+        finally:
+            shutil.rmtree(dirname)
+        self.assertEqual(o.strip(), "ok")
@@ -0,0 +1,55 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from pysollib.game.snapshots import SnapshotStore
+
+from .common_headless import run_headless
+
+# saving needs a game
+SCRIPT = '''
+from six import BytesIO
+from pysollib.null.headless import HeadlessApp
+
+app = HeadlessApp()
+game = app.startGame(2, 12345, autoplay=0)  # Klondike
+for i in range(5):
+    game.dealCards()
+    game.finishMove()
+assert len(game.snapshots) == 6
+f = BytesIO()
+game._dumpGame(f, bookmark=2)
+snapshots = list(game.snapshots)
+game.restoreGameFromBookmark(f.getvalue())
+assert list(game.snapshots) == snapshots
+assert game.getSnapshot() in game.snapshots
+print("ok")
+'''
+
+
+class SnapshotStoreTests(unittest.TestCase):
+    def test_set(self):
+        store = SnapshotStore()
+        self.assertTrue(store.add(5))
+        self.assertFalse(store.add(5))
+        self.assertTrue(store.add(-1))
+        self.assertIn(5, store)
+        self.assertIn(-1, store)
+        self.assertNotIn(6, store)
+        self.assertEqual(len(store), 2)
+        store.clear()
+        self.assertNotIn(5, store)
+
+    def test_max_size(self):
+        store = SnapshotStore(range(10), max_size=4)
+        self.assertEqual(list(store), [6, 7, 8, 9])
+
+    def test_dumps(self):
+        store = SnapshotStore([3, -2, 1 << 63])
+        data = store.dumps()
+        self.assertEqual(len(data), 24)
+        self.assertEqual(list(SnapshotStore.loads(data)), list(store))
+        self.assertRaises(ValueError, SnapshotStore.loads, data[:-1])
+
+    def test_save_game(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
@@ -0,0 +1,118 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pysollib.solvercache import SolverCache
+
+from .common_headless import run_headless
+
+# the cached moves replace the solver run, which would fail here since
+# no solver is installed
+SCRIPT = '''
+import sys
+from pysollib.null.headless import HeadlessApp
+from pysollib.solvercache import SolverCache
+
+
+
+class Progress:
+    def setText(self, **kw):
+        pass
+
+
+app = HeadlessApp()
+app.solver_cache = SolverCache(sys.argv[1])
+game = app.startGame(8, 1, autoplay=0)  # FreeCell
+solver = game.Solver_Class(game, Progress())
+solver.config(max_iters=1000)
+board = solver.calcBoardString()
+key = app.solver_cache.makeKey(board, **solver.getCacheArgs())
+app.solver_cache.put(key, {'state': 'solved', 'iters': 57, 'moves': [
+    [1, ['rows', 0], ['reserves', 2]], [1, ['rows', 3], None]]})
+
+# a new cache instance, as after a restart
+app.solver_cache = SolverCache(sys.argv[1])
+solver = game.Solver_Class(game, Progress())
+solver.config(max_iters=1000)
+# all the solver needs is read from the game before it runs
+solver.readGame()
+solver.game = None
+solver.computeHints()
+assert solver.solver_state == 'solved'
+assert solver.iters == 57
+assert solver.hints == [[1, game.s.rows[0], game.s.reserves[2]],
+                        [1, game.s.rows[3], None], None]
+# other solver arguments, other key
+solver.game = game
+solver.config(max_iters=2000)
+assert app.solver_cache.makeKey(board, **solver.getCacheArgs()) != key
+print("ok")
+'''
+
+
+class SolverCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def _result(self, n):
+        return {'state': 'solved', 'iters': n, 'moves': [[1, ['rows', n],
+                                                          None]]}
+
+    def test_key(self):
+        k = SolverCache.makeKey('board', preset='a', max_iters=10)
+        self.assertEqual(
+            k, SolverCache.makeKey('board', max_iters=10, preset='a'))
+        self.assertEqual(
+            k, SolverCache.makeKey('board', max_iters=10, preset='a',
+                                   sbb=None))
+        self.assertNotEqual(
+            k, SolverCache.makeKey('board', max_iters=11, preset='a'))
+        self.assertNotEqual(
+            k, SolverCache.makeKey('board2', max_iters=10, preset='a'))
+
+    def test_memory_lru(self):
+        cache = SolverCache(max_memory=2)
+        cache.put('a', self._result(1))
+        cache.put('b', self._result(2))
+        cache.get('a')
+        cache.put('c', self._result(3))
+        self.assertEqual(cache.get('a'), self._result(1))
+        self.assertIsNone(cache.get('b'))
+        # only final outcomes are kept
+        cache.put('d', {'state': 'cancelled', 'iters': 0, 'moves': []})
+        self.assertIsNone(cache.get('d'))
+
+    def test_disk(self):
+        cache = SolverCache(self.dirname, max_memory=1)
+        cache.put('a', self._result(1))
+        cache.put('b', self._result(2))
+        self.assertEqual(cache.get('a')['iters'], 1)
+        cache = SolverCache(self.dirname)
+        self.assertEqual(cache.get('b')['moves'], [[1, ['rows', 2], None]])
+        with open(os.path.join(self.dirname, 'c.json'), 'w') as fd:
+            fd.write('garbage')
+        self.assertIsNone(cache.get('c'))
+
+    def test_disk_eviction(self):
+        cache = SolverCache(self.dirname, max_files=10)
+        for i in range(25):
+            cache.put('k%d' % i, self._result(i))
+        files = os.listdir(self.dirname)
+        self.assertTrue(len(files) <= 10)
+
+    def test_disk_rewrite(self):
+        cache = SolverCache(self.dirname, max_files=10)
+        for i in range(25):
+            cache.put('a', self._result(i))
+        self.assertEqual(SolverCache(self.dirname).get('a')['iters'], 24)
+        # a file written again is not counted again
+        self.assertEqual(cache._files, 1)
+
+    def test_hints_from_cache(self):
+        self.assertEqual(run_headless(SCRIPT, self.dirname).strip(), "ok")
@@ -0,0 +1,53 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import random
+import unittest
+
+from pysollib.game.stackindex import StackGrid
+from pysollib.mfxutil import Struct
+
+
+def linear(stacks, cx, cy, accept=None):
+    closest, cdist = None, 999999999
+    for stack in stacks:
+        dist = (stack.x - cx)**2 + (stack.y - cy)**2
+        if dist < cdist and (accept is None or accept(stack, dist)):
+            closest, cdist = stack, dist
+    return closest
+
+
+class StackGridTests(unittest.TestCase):
+    def _check(self, stacks, accept=None):
+        grid = StackGrid(stacks)
+        rand = random.Random(1)
+        for i in range(500):
+            cx, cy = rand.randint(-300, 1300), rand.randint(-300, 1000)
+            self.assertIs(grid.closest(cx, cy, accept),
+                          linear(stacks, cx, cy, accept))
+        # on the stacks themselves
+        for s in stacks:
+            self.assertIs(grid.closest(s.x, s.y, accept),
+                          linear(stacks, s.x, s.y, accept))
+
+    def test_layouts(self):
+        self.assertIsNone(StackGrid(()).closest(0, 0))
+        self._check((Struct(x=10, y=10),))
+        # a row, a tableau and the same places twice
+        row = tuple(Struct(x=10 + 90 * i, y=10) for i in range(10))
+        self._check(row)
+        tableau = tuple(Struct(x=10 + 90 * i, y=10 + 120 * j)
+                        for i in range(10) for j in range(6))
+        self._check(tableau)
+        self._check(row + tableau)
+        rand = random.Random(2)
+        self._check(tuple(Struct(x=rand.randint(0, 1000),
+                                 y=rand.randint(0, 700))
+                          for i in range(144)))
+
+    def test_accept(self):
+        rand = random.Random(3)
+        stacks = tuple(Struct(x=rand.randint(0, 1000), y=rand.randint(0, 700),
+                              blocked=rand.random() < 0.7)
+                       for i in range(144))
+        self._check(stacks, lambda s, dist: dist > 400 or not s.blocked)
+        self._check(stacks, lambda s, dist: False)
@@ -0,0 +1,42 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import json
+import os
+import tempfile
+import unittest
+
+from pysollib.startupprofiler import StartupProfiler
+
+
+class StartupProfilerTests(unittest.TestCase):
+    def test_disabled(self):
+        profiler = StartupProfiler()
+        with profiler.phase('games'):
+            pass
+        self.assertEqual(profiler.phases, [])
+        profiler.finish()
+
+    def test_report(self):
+        filename = os.path.join(tempfile.mkdtemp(), "startup.json")
+        profiler = StartupProfiler()
+        profiler.start(filename)
+        with profiler.phase('games'):
+            data = [[i] for i in range(10000)]
+        try:
+            with profiler.phase('plugins'):
+                raise ValueError
+        except ValueError:
+            pass
+        profiler.finish()
+        # after the report nothing is timed
+        with profiler.phase('game'):
+            pass
+        with open(filename) as f:
+            report = json.load(f)
+        self.assertEqual([p['name'] for p in report['phases']],
+                         ['games', 'plugins'])
+        games = report['phases'][0]
+        self.assertGreaterEqual(games['live_blocks'], len(data))
+        for key in ('wall', 'cpu'):
+            self.assertGreaterEqual(games[key], 0)
+            self.assertGreaterEqual(report['total'][key], games[key])
@@ -0,0 +1,108 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import time
+import unittest
+from datetime import date
+
+from pysollib.app_statistics import Statistics
+from pysollib.mfxutil import Struct
+from pysollib.stats import ProgressionFormatter
+
+
+class MockGame:
+    GAME_VERSION = 1
+
+    def __init__(self, id, elapsed_time, moves, start_time=0):
+        self.id = id
+        self.gstats = Struct(start_time=start_time,
+                             total_elapsed_time=elapsed_time)
+        self.stats = Struct(elapsed_time=elapsed_time, total_moves=moves)
+        self.moves = Struct(index=moves)
+
+    def getGameNumber(self, format):
+        return "1"
+
+    def getGameScore(self):
+        return None
+
+    def getGameScoreCasino(self):
+        return None
+
+    def updateTime(self):
+        pass
+
+
+class StatisticsIndexTests(unittest.TestCase):
+    def _sorted(self, stats, player, games, key):
+        # the sorting of Application.getGamesIdSortedBy*() before the
+        # index was introduced
+        def _key(a):
+            won, lost, time, moves = stats.getFullStats(player, a)
+            return {'played': won + lost, 'won': won, 'lost': lost,
+                    'percent': float(won) / (1 if won + lost == 0
+                                             else won + lost),
+                    'time': time, 'moves': moves}[key]
+        return tuple(sorted(games, key=_key)[::-1])
+
+    def test_sorted_games(self):
+        stats = Statistics()
+        games = tuple(range(1, 21))
+        results = [(3, 1, 60, 100), (3, 0, 50, 80), (5, 2, 30, 90),
+                   (5, 0, 200, 120), (7, 0, 40, 110), (3, 1, 0, 0)]
+        for gameid, status, elapsed_time, moves in results:
+            stats.updateGameStat('alice', MockGame(gameid, elapsed_time,
+                                                   moves), status)
+        index = stats.getIndex('alice', games)
+        self.assertIs(stats.getIndex('alice', games), index)
+        keys = ('played', 'won', 'lost', 'percent', 'time', 'moves')
+        for key in keys:
+            self.assertEqual(index.getSorted(key),
+                             self._sorted(stats, 'alice', games, key))
+        self.assertEqual(index.getFullStats(5),
+                         stats.getFullStats('alice', 5))
+        # finishing a game updates the index
+        stats.updateGameStat('alice', MockGame(9, 10, 20), 1)
+        self.assertEqual(index.getFullStats(9), (1, 0, 10, 20))
+        for key in keys:
+            self.assertEqual(index.getSorted(key),
+                             self._sorted(stats, 'alice', games, key))
+        # a reset or another list of games makes a new one
+        stats.resetStats('alice', 9)
+        self.assertIsNot(stats.getIndex('alice', games), index)
+        index = stats.getIndex('alice', games)
+        self.assertEqual(index.getFullStats(9), (0, 0, 0, 0))
+        self.assertIsNot(stats.getIndex('alice', games[1:]), index)
+
+
+class ProgressionTests(unittest.TestCase):
+    def test_histogram(self):
+        stats = Statistics()
+        now = time.time()
+        day = 86400
+        for gameid, days, status in ((2, 0, 1), (2, 0, 0), (8, 1, 2),
+                                     (8, 3, 0), (2, 30, 1), (8, 400, 1)):
+            game = MockGame(gameid, 10, 10, now - days * day)
+            stats.updateStats('alice', game, status)
+        histogram = stats.getHistogram('alice')
+        today = date.today().toordinal()
+        self.assertEqual(histogram.all[today], [2, 1])
+        self.assertEqual(histogram.games[8][today - 1], [1, 1])
+        # a logged game is added to the histogram
+        stats.updateStats('alice', MockGame(8, 10, 10, now), 1)
+        self.assertIs(stats.getHistogram('alice'), histogram)
+        self.assertEqual(histogram.all[today], [3, 2])
+        self.assertEqual(histogram.games[8][today], [1, 1])
+        stats.histograms = {}
+        self.assertEqual(stats.getHistogram('alice').all, histogram.all)
+
+        formatter = ProgressionFormatter(Struct(stats=stats), 'alice', 8)
+        week = formatter.getResults('week')
+        self.assertEqual(len(week), 8)
+        self.assertEqual(week[-1][1:], (3, 2))
+        self.assertEqual(sum(r[1] for r in week), 5)
+        week = formatter.getResults('week', all_games=False)
+        self.assertEqual(sum(r[1] for r in week), 3)
+        self.assertEqual(sum(r[1] for r in formatter.getResults('month')),
+                         5 + (date.fromordinal(today - 30) >=
+                              formatter.monthsAgo(date.today(), 1)))
+        self.assertEqual(sum(r[1] for r in formatter.getResults('all')), 7)
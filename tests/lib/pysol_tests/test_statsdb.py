@@ -0,0 +1,140 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+import os
+import tempfile
+
+from pysollib.app_statistics import DailyHistogram, Statistics
+from pysollib.app_statsdb import StatisticsDB
+
+app = HeadlessApp()
+filename = os.path.join(tempfile.mkdtemp(), "statistics.sqlite")
+
+
+def finish(stats, gameid, seed, status):
+    game = app.startGame(gameid, seed, autoplay=0)
+    return stats.updateStats("alice", game, status)
+
+
+def fields(stat):
+    ret = dict(vars(stat))
+    for name, value in ret.items():
+        if name.endswith('_result'):
+            ret[name] = dict(vars(value), top=[vars(t) for t in value.top])
+    return ret
+
+
+# the pickled statistics of an old version
+legacy = Statistics()
+for seed, status in ((1, 0), (2, 1), (3, 0)):
+    finish(legacy, 2, seed, status)
+finish(legacy, 8, 4, 1)
+legacy.resetStats("alice", 8)
+legacy.prev_games["alice"].insert(0, (2, "123", 0, 1.0, 5))
+legacy.all_prev_games["alice"].insert(0, (2, "123", 0, 1.0, 5))
+legacy.total_balance[2] = 42
+
+db = StatisticsDB(filename)
+assert db.isNew()
+db.migrate(legacy)
+stats = Statistics()
+db.load(stats)
+stats.db = db
+assert not db.isNew()
+assert stats.getFullStats("alice", 2) == legacy.getFullStats("alice", 2)
+assert stats.getFullStats("alice", 8) == (0, 0, 0, 0)
+assert stats.getPrevGames("alice") == legacy.prev_games["alice"]
+assert stats.getPrevGames("bob") is None
+assert stats.total_balance == {2: 42}
+
+# every finished game is written at once
+finish(stats, 2, 5, 1)
+stats.updateBalance(2, -10)
+stats.resetStats("alice", 8)
+finish(stats, 8, 6, 0)
+assert not stats.prev_games and not stats.all_prev_games
+last = stats.getPrevGames("alice")[-1]
+# the days are counted by the database as by Python
+histogram = DailyHistogram()
+for log in stats.getPrevGames("alice"):
+    histogram.addGame(log)
+assert stats.getHistogram("alice").games == histogram.games
+assert last[:3] == (8, app.game.getGameNumber(format=0), 0)
+db.close()
+loaded = Statistics()
+StatisticsDB(filename).load(loaded)
+assert loaded.getFullStats("alice", 2)[:2] == (2, 2)
+assert loaded.getFullStats("alice", 8)[:2] == (0, 1)
+assert (loaded.games_stats["alice"]["all"].num_total ==
+        stats.games_stats["alice"]["all"].num_total == 6)
+assert loaded.total_balance == {2: 32}
+for gameid in (2, 8, 'all'):
+    assert (fields(loaded.games_stats["alice"][gameid]) ==
+            fields(stats.games_stats["alice"][gameid])), gameid
+assert loaded.games_stats["alice"][2].time_result.top
+prev = StatisticsDB(filename).getPrevGames("alice")
+assert len(prev) == 6 and prev[0] == (2, "123", 0, 1.0, 5)
+assert prev[-1] == last
+
+# the games of a player without a name
+db = StatisticsDB(filename)
+db.addGame(None, (2, "7", 1, 1.0, 5))
+assert db.getPrevGames(None) == [(2, "7", 1, 1.0, 5)]
+assert len(list(db.getDailyResults(None))) == 1
+db.resetStats(None, 0)
+assert db.getPrevGames(None) == []
+db.close()
+print("ok")
+'''
+
+# Application needs the tk toolkit, which works without a display until
+# the main window is built
+LOAD_SCRIPT = '''
+import os
+import sys
+
+from pysollib.app import Application
+
+app = Application()
+app.fn.stats = os.path.join(sys.argv[1], "statistics.dat")
+# the database cannot be opened
+app.fn.stats_db = sys.argv[1]
+try:
+    app.loadStatistics()
+except Exception:
+    pass
+assert app.stats.db is None
+app.saveStatistics()
+print("ok")
+'''
+
+
+class StatisticsDBTests(unittest.TestCase):
+    def test_migrate_and_update(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
+
+    def test_load_failure(self):
+        dirname = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(dirname, "statistics.dat")
+            with open(filename, "wb") as f:
+                f.write(b"old statistics")
+            o = subprocess.check_output(
+                [sys.executable, "-c", LOAD_SCRIPT, dirname],
+                stderr=subprocess.STDOUT)
+            self.assertEqual(o.decode('utf-8').split()[-1], "ok")
+            with open(filename, "rb") as f:
+                self.assertEqual(f.read(), b"old statistics")
+        finally:
+            shutil.rmtree(dirname)
@@ -0,0 +1,40 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib.null.headless import HeadlessApp
+
+app = HeadlessApp()
+# Golf
+game = app.startGame(36, 1, autoplay=0)
+stuck = game.Stuck_Class
+game.stuckEvent()
+assert not game.stuck
+game.stuck_timer = "pending"
+game.invalidateHints()
+assert game.stuck_timer is None
+# play until no move is left
+while True:
+    assert stuck.hasHints() == bool(stuck.getHints(None))
+    hints = game.getHints(0)
+    if hints:
+        game.moveMove(hints[0][2], hints[0][3], hints[0][4])
+    elif game.canDealCards():
+        game.dealCards()
+    else:
+        break
+    game.finishMove()
+# the null toolkit has no timers, so the move checked at once
+assert game.stuck != game.isGameWon()
+game.stuckEvent()
+assert game.stuck != game.isGameWon()
+print("ok")
+'''
+
+
+class StuckCheckTests(unittest.TestCase):
+    def test_stuck(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
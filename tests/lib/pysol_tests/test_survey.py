@@ -0,0 +1,37 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from .common_headless import run_headless
+
+SCRIPT = '''
+from pysollib import survey
+
+assert survey.parseSeeds("3-7") == (3, 7)
+assert survey.parseSeeds("42") == (42, 42)
+try:
+    survey.parseSeeds("7-3")
+    assert False
+except ValueError:
+    pass
+survey.loadGames()
+assert survey.findSolverGame("FreeCell") == 8
+assert survey.findSolverGame("8") == 8
+assert survey.findSolverGame("No Such Game") is None
+survey._initWorker(8, None, 1000)
+game = survey._worker.game
+progress = survey._SurveyProgress()
+boards = []
+for seed in (1, 2, 1):
+    game.newGame(random=survey.construct_random(str(seed)), autoplay=0)
+    boards.append(game.Solver_Class(game, progress).calcBoardString())
+assert boards[0] == boards[2] != boards[1]
+# Microsoft FreeCell deal #1
+assert boards[0].split("\\n")[1] == "JD KD 2S 4C 3S 6D 6S"
+print("ok")
+'''
+
+
+class SurveyTests(unittest.TestCase):
+    def test_deal_boards(self):
+        self.assertEqual(run_headless(SCRIPT).strip(), "ok")
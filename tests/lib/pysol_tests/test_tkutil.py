@@ -0,0 +1,32 @@
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import os
+import shutil
+import tempfile
+import unittest
+from multiprocessing.pool import ThreadPool
+
+from PIL import Image
+
+from pysollib.ui.tktile.tkutil import decodeImage
+
+
+class DecodeImageTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_threads(self):
+        files = []
+        for i in range(8):
+            f = os.path.join(self.dir, "%02d.png" % i)
+            Image.new('RGB', (10 + i, 20)).save(f)
+            files.append(f)
+        pool = ThreadPool(4)
+        images = pool.map(decodeImage, files)
+        pool.close()
+        self.assertEqual([im.size for im in images],
+                         [(10 + i, 20) for i in range(8)])
+        self.assertEqual(set(im.mode for im in images), set(['RGBA']))